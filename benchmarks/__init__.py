@@ -0,0 +1,10 @@
+"""Performance benchmarks; see `benchmarks.bench_suite`."""
+
+import sys
+from pathlib import Path
+
+# The app imports modules both as `engine.*` and `src.routes.*`.
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / 'src'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,5 @@
+import sys
+
+from benchmarks.bench_suite import main
+
+sys.exit(main())
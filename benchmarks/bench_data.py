@@ -0,0 +1,81 @@
+"""Synthetic datasets for the benchmarks, generated inside DuckDB.
+
+Rows are derived from `range()` with a fixed seed, so every run at the
+same scale sees identical data without shipping fixtures.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+
+# Rows of the features table per named scale.
+SCALES: dict[str, int] = {
+    'smoke': 2_000,
+    'small': 50_000,
+    'medium': 500_000,
+    'large': 5_000_000,
+}
+FEATURES = ('x1', 'x2', 'x3', 'x4')
+SEED = 0.42
+
+
+def features_query(rows: int) -> str:
+    """SELECT producing `rows` rows of features, a target and a label.
+
+    `y` is linear in the features plus noise; `label` thresholds it, so
+    both regression and classification have something to learn.
+    """
+    noise = ', '.join(f'random() AS {name}' for name in FEATURES)
+    return f"""
+        WITH base AS (
+            SELECT range AS id, {noise}, random() - 0.5 AS eps
+            FROM range({int(rows)})
+        )
+        SELECT
+            id, x1, x2, x3, x4,
+            1.5 * x1 - 2.0 * x2 + 0.5 * x3 + 0.1 * eps AS y,
+            (x1 - x2 + 0.2 * eps > 0)::INTEGER AS label,
+            ['a', 'b', 'c', 'd'][1 + id % 4] AS category
+        FROM base
+    """
+
+
+def create_features_table(
+    connection: duckdb.DuckDBPyConnection,
+    rows: int,
+    table: str = 'features',
+) -> None:
+    """(Re)create `table` with `rows` synthetic rows."""
+    connection.execute(f'SELECT setseed({SEED})')
+    connection.execute(
+        f'CREATE OR REPLACE TABLE {table} AS {features_query(rows)}'
+    )
+
+
+def write_files(
+    connection: duckdb.DuckDBPyConnection,
+    directory: Path,
+    rows: int,
+    *,
+    files: int = 4,
+    format: str = 'parquet',
+) -> list[Path]:
+    """Split `rows` synthetic rows over `files` files for ingestion."""
+    directory.mkdir(parents=True, exist_ok=True)
+    options = '(FORMAT parquet)' if format == 'parquet' else '(HEADER)'
+    connection.execute(f'SELECT setseed({SEED})')
+    connection.execute(
+        f'CREATE OR REPLACE TEMP TABLE _bench_rows AS {features_query(rows)}'
+    )
+    paths = []
+    for index in range(files):
+        path = directory / f'part-{index}.{format}'
+        connection.execute(
+            f'COPY (SELECT * FROM _bench_rows WHERE id % {files} = {index}) '
+            f"TO '{path}' {options}"
+        )
+        paths.append(path)
+    connection.execute('DROP TABLE _bench_rows')
+    return paths
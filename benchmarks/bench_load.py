@@ -0,0 +1,360 @@
+"""Load generator: N concurrent clients firing a weighted request mix.
+
+Each concurrency level runs for `--duration` seconds. Every client
+picks its next request from the mix at random, waits for the whole
+response, and records the latency. The report gives throughput and
+p50/p95/p99 latency per level and per operation, and the concurrency
+knee: the last level that still raised throughput by `KNEE_GAIN`.
+
+By default the app runs in this process behind `httpx.ASGITransport`
+(with its lifespan, against throwaway settings and models), which
+measures the app itself on one event loop. Pass `--url` to load a real
+server instead, e.g. several uvicorn workers:
+
+    python -m benchmarks.bench_load --concurrency 1 4 16 64
+    python -m benchmarks.bench_load --mix config_read=1 score=4
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000
+
+Against `--url`, config writes change the server's settings.json and
+the scoring model is saved to this user's model registry, which a
+server on the same machine and account shares (or pass `--model`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+import httpx
+
+from benchmarks.bench_suite import ROOT, isolate_user_dirs
+
+OUTPUT_PATH = ROOT / 'reports' / 'load.json'
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16, 32)
+DEFAULT_DURATION = 5.0
+# Unmeasured run first, so model loading and pool warmup don't count.
+WARMUP_SECONDS = 1.0
+DEFAULT_MIX = {
+    'config_read': 4,
+    'config_write': 1,
+    'query': 3,
+    'query_uncached': 1,
+    'score': 2,
+}
+# A level is past the knee once it adds less throughput than this.
+KNEE_GAIN = 0.10
+# Rows aggregated by the query operations.
+QUERY_ROWS = 200_000
+QUERY_SQL = (
+    'SELECT i % 100 AS k, count(*) AS n, avg(i) AS mean '
+    f'FROM range({QUERY_ROWS}) t(i) GROUP BY k'
+)
+REQUEST_TIMEOUT = 60.0
+# `engine_scheduler.CLIENT_HEADER`; each simulated client sends its own
+# name, so per-client limits apply per client rather than per address.
+CLIENT_HEADER = 'X-DuckLearn-Client'
+
+Operation = Callable[['Session', int], Awaitable[httpx.Response]]
+OPERATIONS: dict[str, Operation] = {}
+
+
+def operation(name: str) -> Callable[[Operation], Operation]:
+    def register(function: Operation) -> Operation:
+        OPERATIONS[name] = function
+        return function
+
+    return register
+
+
+@dataclass
+class Session:
+    """A client of the target and what the operations need from it."""
+
+    client: httpx.AsyncClient
+    model_id: str | None = None
+    name: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {CLIENT_HEADER: self.name} if self.name else {}
+
+
+@operation('config_read')
+async def config_read(session: Session, n: int) -> httpx.Response:
+    return await session.client.get('/api/config', headers=session.headers)
+
+
+@operation('config_write')
+async def config_write(session: Session, n: int) -> httpx.Response:
+    return await session.client.patch(
+        '/api/config',
+        json={'enable_progress_bar': n % 2 == 0},
+        headers=session.headers,
+    )
+
+
+@operation('query')
+async def query(session: Session, n: int) -> httpx.Response:
+    """The same SQL every time, so mostly served by the result cache."""
+    return await session.client.post(
+        '/api/query', json={'sql': QUERY_SQL}, headers=session.headers
+    )
+
+
+@operation('query_uncached')
+async def query_uncached(session: Session, n: int) -> httpx.Response:
+    """Unique SQL per request, so DuckDB runs every one."""
+    sql = f'{QUERY_SQL} HAVING k <> {n}'
+    return await session.client.post(
+        '/api/query', json={'sql': sql}, headers=session.headers
+    )
+
+
+@operation('score')
+async def score(session: Session, n: int) -> httpx.Response:
+    """Online prediction of one row (micro-batched by the server)."""
+    row = {'x1': (n % 97) / 97, 'x2': 0.5, 'x3': 0.25, 'x4': 0.1}
+    return await session.client.post(
+        f'/api/models/{session.model_id}/predict/online',
+        json={'rows': [row]},
+        headers=session.headers,
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (`q` in 0-100) of sorted `values`."""
+    if not values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+@dataclass
+class Stats:
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @classmethod
+    def of(cls, samples: list[tuple[float, int]], seconds: float) -> Stats:
+        latencies = sorted(latency for latency, _ in samples)
+        return cls(
+            requests=len(samples),
+            errors=sum(status >= 400 for _, status in samples),
+            throughput=len(samples) / seconds if seconds else 0.0,
+            p50_ms=percentile(latencies, 50) * 1e3,
+            p95_ms=percentile(latencies, 95) * 1e3,
+            p99_ms=percentile(latencies, 99) * 1e3,
+        )
+
+
+@dataclass
+class Level:
+    """Results of one concurrency level, overall and per operation."""
+
+    concurrency: int
+    seconds: float
+    total: Stats
+    operations: dict[str, Stats]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+async def run_level(
+    session: Session,
+    concurrency: int,
+    mix: dict[str, float],
+    duration: float,
+    seed: int = 0,
+) -> Level:
+    """Run `concurrency` clients for `duration` seconds."""
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[tuple[float, int]]] = {name: [] for name in mix}
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def client(index: int) -> None:
+        rng = random.Random(seed * 1_000 + index)
+        own = replace(session, name=f'load-{index}')
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await OPERATIONS[name](own, next(counter))
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 599
+            samples[name].append((time.perf_counter() - started, status))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    seconds = time.perf_counter() - started
+    return Level(
+        concurrency=concurrency,
+        seconds=seconds,
+        total=Stats.of(list(itertools.chain(*samples.values())), seconds),
+        operations={
+            name: Stats.of(values, seconds)
+            for name, values in samples.items()
+            if values
+        },
+    )
+
+
+def find_knee(levels: list[Level]) -> int | None:
+    """The last concurrency that raised throughput by `KNEE_GAIN`.
+
+    Beyond it more clients mostly add queueing latency. None if no
+    level was measured.
+    """
+    if not levels:
+        return None
+    knee = levels[0]
+    for previous, level in itertools.pairwise(levels):
+        gain = level.total.throughput / (previous.total.throughput or 1)
+        if gain - 1 < KNEE_GAIN:
+            break
+        knee = level
+    return knee.concurrency
+
+
+def fit_model() -> str:
+    """Fit and save the model the `score` operation predicts with."""
+    import duckdb
+
+    from benchmarks.bench_data import FEATURES, create_features_table
+    from learn.learn_linear import LinearRegression
+    from learn.learn_registry import Models
+
+    with duckdb.connect() as connection:
+        create_features_table(connection, 10_000)
+        model = LinearRegression('y', FEATURES).fit('features', connection)
+    return Models.save(model, name='load-test').id
+
+
+def parse_mix(items: list[str]) -> dict[str, float]:
+    """`['query=3', 'score=1']` -> `{'query': 3.0, 'score': 1.0}`."""
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(
+                f'Unknown operation {name!r}; choose from {list(OPERATIONS)}'
+            )
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('The mix needs at least one positive weight')
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+async def run_load(
+    concurrency: list[int],
+    mix: dict[str, float],
+    duration: float,
+    url: str | None = None,
+    model_id: str | None = None,
+) -> list[Level]:
+    """Run every concurrency level in turn against one target."""
+    async with AsyncExitStack() as stack:
+        limits = httpx.Limits(max_connections=max(concurrency))
+        if url is None:
+            from app import create_app
+
+            app = create_app('development')
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            url = 'http://load'
+        else:
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=transport, base_url=url, timeout=REQUEST_TIMEOUT
+            )
+        )
+        if 'score' in mix and model_id is None:
+            model_id = fit_model()
+        session = Session(client, model_id)
+        await run_level(session, 1, mix, WARMUP_SECONDS)
+
+        levels = []
+        for index, clients in enumerate(concurrency):
+            level = await run_level(session, clients, mix, duration, index)
+            levels.append(level)
+            print_level(level)
+        return levels
+
+
+def print_level(level: Level) -> None:
+    total = level.total
+    print(
+        f'  {level.concurrency:>5} clients  {total.throughput:>9,.1f} req/s  '
+        f'p50 {total.p50_ms:>8.1f}  p95 {total.p95_ms:>8.1f}  '
+        f'p99 {total.p99_ms:>8.1f} ms  errors {total.errors}'
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='benchmarks.bench_load', description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        '--concurrency', nargs='+', type=int, default=DEFAULT_CONCURRENCY
+    )
+    parser.add_argument(
+        '--mix',
+        nargs='+',
+        default=[f'{name}={weight}' for name, weight in DEFAULT_MIX.items()],
+        help=f'Operations with weights, from {", ".join(OPERATIONS)}.',
+    )
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--url', default=None, help='Load a running server.')
+    parser.add_argument('--model', default=None, help='Model id to score.')
+    parser.add_argument('--output', type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    concurrency = sorted(set(args.concurrency))
+
+    target = args.url or 'the app in-process'
+    print(f'🔥 Loading {target} for {args.duration:g}s per level...\n')
+    with tempfile.TemporaryDirectory(prefix='ducklearn-load-') as home:
+        if args.url is None:
+            isolate_user_dirs(Path(home))
+        levels = asyncio.run(
+            run_load(concurrency, mix, args.duration, args.url, args.model)
+        )
+
+    knee = find_knee(levels)
+    print(f'\n📈 Concurrency knee: {knee} clients')
+    report = {
+        'target': target,
+        'mix': mix,
+        'duration': args.duration,
+        'knee': knee,
+        'levels': [level.to_dict() for level in levels],
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + '\n')
+    print(f'📄 Results → {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
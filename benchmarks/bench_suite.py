@@ -0,0 +1,442 @@
+"""Benchmarks of the API and DuckDB hot paths.
+
+Run with `poe bench` (or `python -m benchmarks`). Every case is timed
+`--repeats` times after a warmup run and reported as items per second
+at the median. Results are written as JSON and compared with a stored
+baseline; a case slower than the baseline by more than `--tolerance`
+fails the run with exit code 1.
+
+    python -m benchmarks --scale small               # run and compare
+    python -m benchmarks --scale small --save-baseline
+    python -m benchmarks --cases query_arrow ingest_parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = ROOT / 'benchmarks' / 'baseline.json'
+OUTPUT_PATH = ROOT / 'reports' / 'bench.json'
+# Allowed throughput drop before a case counts as a regression.
+DEFAULT_TOLERANCE = 0.30
+DEFAULT_REPEATS = 5
+# Requests per timed run of the HTTP cases.
+HTTP_REQUESTS = 200
+# Acquire/release pairs per timed run of `pool_acquire`.
+POOL_ACQUIRES = 5_000
+
+if TYPE_CHECKING:
+    from engine.engine_pool import ConnectionManager
+
+Run = Callable[[], int]
+
+
+@dataclass
+class Context:
+    """What the cases share: the scale, a scratch directory, one engine."""
+
+    rows: int
+    workdir: Path
+    _manager: ConnectionManager | None = None
+    _cleanups: list[Callable[[], Any]] = field(default_factory=list)
+
+    @property
+    def manager(self) -> ConnectionManager:
+        """A memory database holding the `features` table."""
+        if self._manager is None:
+            from benchmarks.bench_data import create_features_table
+            from config.config_duckdb import DuckDBConfig
+            from engine.engine_pool import ConnectionManager
+
+            self._manager = ConnectionManager(
+                DuckDBConfig(enable_progress_bar=False)
+            )
+            with self._manager.cursor() as cursor:
+                create_features_table(cursor, self.rows)
+            self.defer(self._manager.close_all)
+        return self._manager
+
+    def defer(self, cleanup: Callable[[], Any]) -> None:
+        self._cleanups.append(cleanup)
+
+    def close(self) -> None:
+        while self._cleanups:
+            self._cleanups.pop()()
+
+
+@dataclass(frozen=True)
+class Case:
+    """A benchmark: `setup(context)` returns the run that is timed.
+
+    The run returns how many `unit`s it processed (rows, requests...).
+    """
+
+    name: str
+    unit: str
+    setup: Callable[[Context], Run]
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, unit: str) -> Callable:
+    """Register a setup function as the benchmark `name`."""
+
+    def register(setup: Callable[[Context], Run]) -> Callable:
+        CASES[name] = Case(name, unit, setup)
+        return setup
+
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    unit: str
+    items: int
+    repeats: int
+    median_s: float
+    min_s: float
+    throughput: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# --- HTTP ---
+def _http_client(context: Context):
+    """An in-process client of the app and the loop it runs on."""
+    import httpx
+
+    from app import create_app
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app('development')),
+        base_url='http://bench',
+    )
+    context.defer(loop.close)
+    context.defer(lambda: loop.run_until_complete(client.aclose()))
+    return loop, client
+
+
+@case('config_get', unit='requests')
+def config_get(context: Context) -> Run:
+    loop, client = _http_client(context)
+
+    async def requests() -> int:
+        for _ in range(HTTP_REQUESTS):
+            response = await client.get('/api/config')
+            response.raise_for_status()
+        return HTTP_REQUESTS
+
+    return lambda: loop.run_until_complete(requests())
+
+
+@case('config_put', unit='requests')
+def config_put(context: Context) -> Run:
+    from config.config_load_save import Config
+
+    loop, client = _http_client(context)
+    context.defer(Config.flush)
+
+    async def requests() -> int:
+        for index in range(HTTP_REQUESTS):
+            response = await client.put(
+                '/api/config', json={'enable_progress_bar': index % 2 == 0}
+            )
+            response.raise_for_status()
+        return HTTP_REQUESTS
+
+    return lambda: loop.run_until_complete(requests())
+
+
+# --- Engine ---
+@case('pool_acquire', unit='acquires')
+def pool_acquire(context: Context) -> Run:
+    manager = context.manager
+
+    def run() -> int:
+        for _ in range(POOL_ACQUIRES):
+            pool, cursor = manager.acquire()
+            pool.release(cursor)
+        return POOL_ACQUIRES
+
+    return run
+
+
+def _stream(context: Context, encode_name: str) -> Run:
+    from engine import engine_stream
+
+    manager = context.manager
+    encode = getattr(engine_stream, encode_name)
+
+    def run() -> int:
+        stream = engine_stream.QueryStream(manager)
+        try:
+            stream.execute('SELECT * FROM features')
+            for _ in encode(stream.reader):
+                pass
+            return stream.rows
+        finally:
+            stream.close()
+
+    return run
+
+
+@case('query_arrow', unit='rows')
+def query_arrow(context: Context) -> Run:
+    return _stream(context, 'arrow_ipc_chunks')
+
+
+@case('query_ndjson', unit='rows')
+def query_ndjson(context: Context) -> Run:
+    return _stream(context, 'ndjson_chunks')
+
+
+def _ingest(context: Context, format: str) -> Run:
+    from benchmarks.bench_data import write_files
+    from engine.engine_ingest import Ingestor
+
+    manager = context.manager
+    with manager.cursor() as cursor:
+        files = write_files(
+            cursor, context.workdir / format, context.rows, format=format
+        )
+    ingestor = Ingestor(manager)
+
+    def run() -> int:
+        result = ingestor.ingest('ingested', files, mode='replace')
+        return result.rows
+
+    return run
+
+
+@case('ingest_parquet', unit='rows')
+def ingest_parquet(context: Context) -> Run:
+    return _ingest(context, 'parquet')
+
+
+@case('ingest_csv', unit='rows')
+def ingest_csv(context: Context) -> Run:
+    return _ingest(context, 'csv')
+
+
+# --- Models ---
+@case('linear_fit', unit='rows')
+def linear_fit(context: Context) -> Run:
+    from benchmarks.bench_data import FEATURES
+    from learn.learn_linear import LinearRegression
+
+    manager = context.manager
+
+    def run() -> int:
+        with manager.cursor() as cursor:
+            model = LinearRegression('y', FEATURES).fit('features', cursor)
+        return model.n_samples_
+
+    return run
+
+
+@case('linear_score', unit='rows')
+def linear_score(context: Context) -> Run:
+    from benchmarks.bench_data import FEATURES
+    from learn.learn_linear import LinearRegression
+
+    manager = context.manager
+    with manager.cursor() as cursor:
+        model = LinearRegression('y', FEATURES).fit('features', cursor)
+
+    def run() -> int:
+        with manager.cursor() as cursor:
+            model.score('features', cursor)
+        return context.rows
+
+    return run
+
+
+@case('logistic_fit', unit='rows')
+def logistic_fit(context: Context) -> Run:
+    from benchmarks.bench_data import FEATURES
+    from learn.learn_linear import LogisticRegression
+
+    manager = context.manager
+
+    def run() -> int:
+        with manager.cursor() as cursor:
+            model = LogisticRegression('label', FEATURES).fit(
+                'features', cursor
+            )
+        return model.n_samples_
+
+    return run
+
+
+# --- Running and comparing ---
+def measure(case: Case, context: Context, repeats: int) -> Result:
+    """Warm up once, then time `repeats` runs of the case."""
+    run = case.setup(context)
+    items = run()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        items = run()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return Result(
+        name=case.name,
+        unit=case.unit,
+        items=items,
+        repeats=repeats,
+        median_s=median,
+        min_s=min(timings),
+        throughput=items / median if median else float('inf'),
+    )
+
+
+def machine() -> dict:
+    """What the numbers depend on besides the code."""
+    import duckdb
+
+    return {
+        'python': platform.python_version(),
+        'duckdb': duckdb.__version__,
+        'platform': platform.platform(),
+        'processor': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_suite(
+    scale: str, names: list[str] | None = None, repeats: int = 5
+) -> dict:
+    """Run the selected cases (all by default) at `scale`."""
+    from benchmarks.bench_data import SCALES
+
+    rows = SCALES[scale]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='ducklearn-bench-') as tmp:
+        context = Context(rows=rows, workdir=Path(tmp))
+        try:
+            for name in names or CASES:
+                result = measure(CASES[name], context, repeats)
+                results[name] = result.to_dict()
+                print(
+                    f'  {name:<16} {result.throughput:>14,.0f} '
+                    f'{result.unit}/s  (median {result.median_s * 1e3:.1f} ms)'
+                )
+        finally:
+            context.close()
+    return {
+        'scale': scale,
+        'rows': rows,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine(),
+        'results': results,
+    }
+
+
+def compare(
+    report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """Describe every case whose throughput fell by more than `tolerance`.
+
+    Cases missing from either side are skipped; reports of different
+    scales can't be compared and raise ValueError.
+    """
+    if report['scale'] != baseline['scale']:
+        raise ValueError(
+            f'Baseline is for scale {baseline["scale"]!r}, '
+            f'not {report["scale"]!r}'
+        )
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = result['throughput'] / before['throughput'] - 1
+        if change < -tolerance:
+            regressions.append(
+                f'{name}: {result["throughput"]:,.0f} {result["unit"]}/s, '
+                f'{-change:.0%} below the baseline '
+                f'{before["throughput"]:,.0f}'
+            )
+    return regressions
+
+
+def isolate_user_dirs(directory: Path) -> None:
+    """Keep the app away from the user's settings.json and models.
+
+    Must run before `config.config_load_save` or the model registry is
+    imported, as they resolve their directories on import.
+    """
+    os.environ['XDG_CONFIG_HOME'] = str(directory / 'config')
+    os.environ['XDG_CACHE_HOME'] = str(directory / 'cache')
+    os.environ['XDG_DATA_HOME'] = str(directory / 'data')
+
+
+def main(argv: list[str] | None = None) -> int:
+    from benchmarks.bench_data import SCALES
+
+    parser = argparse.ArgumentParser(
+        prog='benchmarks', description=__doc__.splitlines()[0]
+    )
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=None)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--output', type=Path, default=OUTPUT_PATH)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Write the results to --baseline instead of comparing.',
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='ducklearn-home-') as home:
+        isolate_user_dirs(Path(home))
+        print(f'⏱️  Benchmarking at scale {args.scale!r}...\n')
+        report = run_suite(args.scale, args.cases, args.repeats)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + '\n')
+    print(f'\n📄 Results → {args.output}')
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'📌 Baseline saved → {args.baseline}')
+        return 0
+    if not args.baseline.is_file():
+        print(f'⚠️ No baseline at {args.baseline}; nothing to compare.')
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline['machine'] != report['machine']:
+        print('⚠️ Baseline was recorded on a different machine or stack.')
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f'\n❌ {len(regressions)} PERFORMANCE REGRESSION(S):')
+        for line in regressions:
+            print(f'   - {line}')
+        return 1
+    print(f'\n✅ No case more than {args.tolerance:.0%} below the baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,8 @@ const config = {
 	// Consult https://svelte.dev/docs/kit/integrations
 	// for more information about preprocessors
 	preprocess: vitePreprocess(),
-	kit: { adapter: adapter() }
+	// precompress writes .br/.gz next to each asset for the backend to serve
+	kit: { adapter: adapter({ precompress: true }) }
 };
 
 export default config;
@@ -48,13 +48,23 @@ def run_backend() -> None:
             BIN['uv'],
             'run',
             BIN['uvicorn'],
-            'src.ducklearn.app:app',
+            'app:app',
+            '--app-dir',
+            'src',
             '--reload',
         ],
         cwd=ROOT,
     )
 
 
+def serve(workers: int | None = None) -> None:
+    """Run the production server: several workers, static frontend."""
+    command = [BIN['uv'], 'run', 'python', 'src/cli.py', 'serve']
+    if workers is not None:
+        command += ['--workers', str(workers)]
+    run_step('Serving DuckLearn (production workers)...', command, cwd=ROOT)
+
+
 def run_frontend() -> None:
     """Run SvelteKit frontend in dev mode."""
     run_step(
@@ -72,7 +82,9 @@ def run_both() -> None:
             BIN['uv'],
             'run',
             BIN['uvicorn'],
-            'src.ducklearn.app:app',
+            'app:app',
+            '--app-dir',
+            'src',
             '--reload',
         ],
         cwd=ROOT,
@@ -130,7 +142,8 @@ def package() -> None:
     build_backend()
     build_frontend()
 
-    static_target = ROOT / 'src' / 'ducklearn' / 'static'
+    # Served by `create_app(mode='production')` (see src/app.py).
+    static_target = BACKEND_DIR / 'static'
     dist_frontend = FRONTEND_DIR / 'build'
 
     if dist_frontend.exists():
@@ -140,7 +153,7 @@ def package() -> None:
         )
 
     print(
-        '\n🎁 Final package ready in /dist (wheel) and /src/ducklearn/static (frontend).'
+        '\n🎁 Final package ready in /dist (wheel) and /src/static (frontend).'
     )
 
 
@@ -158,6 +171,7 @@ if __name__ == '__main__':
     sub.add_parser('run_backend')
     sub.add_parser('run_frontend')
     sub.add_parser('run_both')
+    sub.add_parser('serve')
     sub.add_parser('build_backend')
     sub.add_parser('build_frontend')
     sub.add_parser('build_both')
@@ -172,6 +186,8 @@ if __name__ == '__main__':
             run_frontend()
         case 'run_both':
             run_both()
+        case 'serve':
+            serve()
         case 'build_backend':
             build_backend()
         case 'build_frontend':
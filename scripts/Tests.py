@@ -72,3 +72,23 @@ class Tests:
         print('\n📊 Reports generated:')
         print('   - 🧪 tests → reports/tests.html')
         print('   - 📈 coverage → reports/coverage/index.html')
+
+    @staticmethod
+    def bench(scale: str = 'small', save_baseline: bool = False):
+        """Run the benchmarks and compare them with the stored baseline."""
+        print(f'⏱️  Running benchmarks (scale: {scale})...\n')
+        command = ['uv', 'run', 'python', '-m', 'benchmarks', '--scale', scale]
+        if save_baseline:
+            command.append('--save-baseline')
+        subprocess.run(command, check=True)
+        print('\n✅ Benchmarks complete → reports/bench.json')
+
+    @staticmethod
+    def load(url: str | None = None):
+        """Sweep concurrency against the app and report its knee."""
+        print('🔥 Running the load generator...\n')
+        command = ['uv', 'run', 'python', '-m', 'benchmarks.bench_load']
+        if url:
+            command += ['--url', url]
+        subprocess.run(command, check=True)
+        print('\n✅ Load test complete → reports/load.json')
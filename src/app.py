@@ -1,17 +1,194 @@
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Literal, cast
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routes import routes_config_duckdb  # ✅ absolute import (always works)
+from starlette.middleware.gzip import (
+    DEFAULT_EXCLUDED_CONTENT_TYPES,
+    GZipMiddleware,
+)
+from starlette.types import ASGIApp
+
+from config.config_load_save import Config
+from config.config_serve import MODE_ENV, WRITER_ENV, worker_database
+from engine.engine_executor import Executor
+from engine.engine_metrics import (
+    SLOW_QUERIES_KEY,
+    MetricsMiddleware,
+    SlowQueries,
+)
+from engine.engine_pool import Engine
+from engine.engine_proxy import WriterProxy
+from engine.engine_stream import ARROW_STREAM_MEDIA_TYPE
+from engine.engine_tenants import DEFAULT_TENANT, TenantMiddleware, Tenants
+from src.routes import (  # ✅ absolute import (always works)
+    routes_config_duckdb,
+    routes_ingest,
+    routes_metrics,
+    routes_models,
+    routes_profile,
+    routes_query,
+    routes_statements,
+    routes_tenants,
+)
+from src.routes.routes_static import PrecompressedStaticFiles
 
-app = FastAPI(title="DuckLearn", version="1.0")
+Mode = Literal['development', 'production']
 
-app.include_router(routes_config_duckdb.router)
+# Where `scripts/Run_Build.py package` copies the SvelteKit build.
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+# Origins allowed by default; settings.json "cors_origins" overrides.
+DEFAULT_CORS_ORIGINS: dict[str, list[str]] = {
+    'development': ['http://localhost:5173'],
+    # The frontend is served from the API's own origin.
+    'production': [],
+}
+# Responses smaller than this aren't worth compressing.
+GZIP_MINIMUM_SIZE = 1000
+
+
+def _load_tenants(data: dict, prune: bool = False) -> None:
+    profiles = dict(data.get('tenants', {}))
+    database = worker_database()
+    if database:
+        # `ducklearn serve --db` wins over a database in settings.json.
+        stored = profiles.get(DEFAULT_TENANT, {})
+        profiles[DEFAULT_TENANT] = {**stored, **database}
+    Tenants.load(profiles, prune=prune)
+
+
+def _reload_settings(data: dict) -> None:
+    try:
+        _load_tenants(data, prune=True)
+        SlowQueries.configure(**data.get(SLOW_QUERIES_KEY, {}))
+    except Exception as exc:
+        print(f'⚠️ Could not apply reloaded settings: {exc}')
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Initialize everything importing the app deliberately skipped:
+    read settings.json, derive the DuckDB config, load tenant profiles
+    and follow settings.json changes made by other workers. On shutdown
+    save pending settings, stop executors and close pools.
+    Behind a writer process (`ducklearn serve`) this worker opens no
+    database at all; the writer loads the tenants."""
+    if app.state.mode == 'production':
+        static_dir = app.state.static_dir
+        print(f'🚀 Running in PRODUCTION mode (serving {static_dir}).')
+    else:
+        print('⚙️ Running in DEVELOPMENT mode (no static files mounted).')
+    Engine.config  # noqa: B018 — auto-tune now, not on the first request
+    settings = Config.data
+    if app.state.writer is None:
+        _load_tenants(settings)
+        SlowQueries.configure(**settings.get(SLOW_QUERIES_KEY, {}))
+        Config.subscribe(_reload_settings)
+        Config.watch()
+    yield
+    Config.unwatch()
+    Config.flush()
+    Tenants.close_all()
+    Executor.shutdown()
+    Engine.close_all()
+
+
+class ConfiguredCORSMiddleware(CORSMiddleware):
+    """CORS with origins from settings.json ("cors_origins").
+
+    Starlette builds middleware on the app's first call, so settings are
+    read at startup rather than when the app is created or imported.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        /,
+        mode: Mode,
+        origins: list[str] | None = None,
+        **options: Any,
+    ) -> None:
+        if origins is None:
+            default = DEFAULT_CORS_ORIGINS[mode]
+            origins = Config.data.get('cors_origins', default)
+        super().__init__(app, allow_origins=origins, **options)
+
+
+def create_app(
+    mode: Mode | None = None,
+    static_dir: str | Path | None = None,
+    cors_origins: list[str] | None = None,
+) -> FastAPI:
+    """
+    Build the DuckLearn app.
+    `mode` defaults to $DUCKLEARN_MODE, else "development", where the
+    SvelteKit dev server serves the frontend. "production" also serves
+    the static build from `static_dir` (precompressed, cached, with
+    ETags) and gzips API responses. `cors_origins` overrides the
+    "cors_origins" list in settings.json.
+    """
+    name = mode or os.environ.get(MODE_ENV, 'development')
+    if name not in DEFAULT_CORS_ORIGINS:
+        raise ValueError(f'Unknown mode {name!r}')
+    mode = cast(Mode, name)
+    static_dir = Path(static_dir or STATIC_DIR)
+    if mode == 'production' and not (static_dir / 'index.html').is_file():
+        raise RuntimeError(
+            f'No frontend build in {static_dir}; run '
+            '`python scripts/Run_Build.py package` first'
+        )
+
+    app = FastAPI(title='DuckLearn', version='1.0', lifespan=lifespan)
+    app.state.mode = mode
+    app.state.static_dir = static_dir if mode == 'production' else None
+    # Unix socket of the writer process that owns the databases, if any.
+    app.state.writer = os.environ.get(WRITER_ENV)
+
+    app.include_router(routes_config_duckdb.router)
+    app.include_router(routes_query.router)
+    app.include_router(routes_statements.router)
+    app.include_router(routes_ingest.router)
+    app.include_router(routes_models.router)
+    app.include_router(routes_profile.router)
+    app.include_router(routes_tenants.router)
+    app.include_router(routes_metrics.router)
+
+    app.add_middleware(
+        ConfiguredCORSMiddleware,
+        mode=mode,
+        origins=cors_origins,
+        allow_credentials=True,
+        allow_methods=['*'],
+        allow_headers=['*'],
+    )
+    if mode == 'production':
+        # Mounted last so every API route takes precedence.
+        app.mount(
+            '/',
+            PrecompressedStaticFiles(directory=static_dir, html=True),
+            name='static',
+        )
+        # Static files carry their own encoding and are left alone; Arrow
+        # streams are binary and cost more CPU than they would save.
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=GZIP_MINIMUM_SIZE,
+            exclude_content_types=(
+                *DEFAULT_EXCLUDED_CONTENT_TYPES,
+                ARROW_STREAM_MEDIA_TYPE,
+            ),
+        )
+    # Times whole requests, including compression and streaming.
+    app.add_middleware(MetricsMiddleware)
+    # Outermost, so /t/<tenant>/... is rewritten before anything routes it.
+    app.add_middleware(TenantMiddleware)
+    if app.state.writer is not None:
+        # In front of everything: the writer routes the original request.
+        app.add_middleware(WriterProxy, socket=app.state.writer)
+    return app
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-print("⚙️ Running in DEVELOPMENT mode (no static files mounted).")
\ No newline at end of file
+app = create_app()
@@ -0,0 +1,213 @@
+"""DuckLearn command line: `python src/cli.py <command> ...`."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import TYPE_CHECKING
+
+# duckdb, sqlglot and pyarrow are imported by the commands that need
+# them, so `--help` and argument errors come back instantly.
+if TYPE_CHECKING:
+    import subprocess
+
+    from config.config_duckdb import DuckDBConfig
+    from config.config_serve import ServePlan
+    from engine.engine_ingest import FileProgress
+
+# Seconds `serve` waits for the writer process to listen on its socket.
+WRITER_STARTUP_TIMEOUT = 60.0
+
+
+def _config_from_args(args: argparse.Namespace) -> DuckDBConfig:
+    """Build a DuckDBConfig from the shared --db/--memory/--threads flags."""
+    from config.config_duckdb import DuckDBConfig
+
+    return DuckDBConfig(
+        db_type='persistent' if args.db else 'memory',
+        db_path=args.db,
+        memory_limit=args.memory_limit,
+        threads=args.threads,
+    )
+
+
+def _print_progress(progress: FileProgress) -> None:
+    mib = progress.bytes / (1024 * 1024)
+    print(
+        f'  [{progress.index}/{progress.total}] {progress.path} — '
+        f'{progress.rows:,} rows, {mib:.1f} MiB, {progress.seconds:.2f}s'
+    )
+
+
+def ingest(args: argparse.Namespace) -> int:
+    """Load files into a table of a persistent database."""
+    import duckdb
+
+    from engine.engine_ingest import IngestError, Ingestor
+    from engine.engine_pool import ConnectionManager
+
+    manager = ConnectionManager(_config_from_args(args))
+    print(f'📥 Loading into {args.table} ({manager.config.connection_uri})')
+    try:
+        result = Ingestor(manager).ingest(
+            args.table,
+            args.sources,
+            format=args.format,
+            mode=args.mode,
+            on_progress=_print_progress,
+        )
+    except (IngestError, duckdb.Error) as exc:
+        print(f'❌ {exc}')
+        return 2
+    finally:
+        manager.close_all()
+    print(
+        f'✅ {result.rows:,} rows from {len(result.files)} files '
+        f'in {result.seconds:.2f}s'
+    )
+    return 0
+
+
+def _start(
+    plan: ServePlan,
+    args: argparse.Namespace,
+    processes: list[subprocess.Popen],
+) -> None:
+    """Start the uvicorn processes of `plan`; the writer first.
+
+    Each process is appended to `processes` as soon as it exists, so the
+    caller can stop those already started when a later one fails.
+    """
+    import subprocess
+
+    from config.config_serve import MODE_ENV, PROJECT_DIR
+
+    for name, command, env in plan.processes(args.host, args.port):
+        process = subprocess.Popen(  # noqa: S603
+            command,
+            cwd=PROJECT_DIR,
+            env={**os.environ, MODE_ENV: args.mode, **env},
+        )
+        processes.append(process)
+        if name != 'writer':
+            continue
+        deadline = time.monotonic() + WRITER_STARTUP_TIMEOUT
+        while not plan.socket.exists():
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('The writer process did not start')
+            time.sleep(0.1)
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Run the API in several uvicorn worker processes."""
+    from config.config_serve import plan_serve
+
+    try:
+        plan = plan_serve(
+            args.workers,
+            args.db,
+            read_only=args.read_only,
+            threads=args.threads,
+            memory_limit=args.memory_limit,
+        )
+    except ValueError as exc:
+        print(f'❌ {exc}')
+        return 2
+    print(
+        f'🚀 Serving on http://{args.host}:{args.port} with '
+        f'{plan.workers} workers ({plan.coordination})'
+    )
+    processes: list[subprocess.Popen] = []
+    try:
+        _start(plan, args, processes)
+        # Stop everything as soon as one process exits.
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+        return next(p.returncode for p in processes if p.poll() is not None)
+    except RuntimeError as exc:
+        print(f'❌ {exc}')
+        return 1
+    except KeyboardInterrupt:
+        print('\n🛑 Stopping workers...')
+        return 0
+    finally:
+        # The public workers first, so nothing is forwarded to a dead writer.
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+        if plan.socket is not None:
+            plan.socket.unlink(missing_ok=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='ducklearn', description='DuckLearn command line.'
+    )
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p_ingest = sub.add_parser(
+        'ingest', help='Load CSV/Parquet/JSON files into a DuckDB table.'
+    )
+    p_ingest.add_argument('table', help='Target table (schema.table ok).')
+    p_ingest.add_argument('sources', nargs='+', help='Files or globs.')
+    p_ingest.add_argument('--db', required=True, help='DuckDB file path.')
+    p_ingest.add_argument(
+        '--format', choices=['parquet', 'csv', 'json'], default=None
+    )
+    p_ingest.add_argument(
+        '--mode', choices=['append', 'replace'], default='append'
+    )
+    p_ingest.add_argument('--memory-limit', default=None)
+    p_ingest.add_argument('--threads', type=int, default=None)
+
+    p_serve = sub.add_parser(
+        'serve', help='Run the API with several worker processes.'
+    )
+    p_serve.add_argument('--host', default='127.0.0.1')
+    p_serve.add_argument('--port', type=int, default=8000)
+    p_serve.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Worker processes (default: one per CPU).',
+    )
+    p_serve.add_argument(
+        '--db', default=None, help='Persistent DuckDB file to serve.'
+    )
+    p_serve.add_argument(
+        '--read-only',
+        action='store_true',
+        help='Open --db read-only in every worker instead of one writer.',
+    )
+    p_serve.add_argument(
+        '--threads',
+        type=int,
+        default=None,
+        help='DuckDB threads for all workers (default: auto-detected).',
+    )
+    p_serve.add_argument(
+        '--memory-limit',
+        default=None,
+        help='DuckDB memory for all workers, e.g. 16GB (default: auto).',
+    )
+    p_serve.add_argument(
+        '--mode', choices=['production', 'development'], default='production'
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    match args.cmd:
+        case 'ingest':
+            return ingest(args)
+        case 'serve':
+            return serve(args)
+        case _:
+            return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
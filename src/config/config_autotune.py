@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import psutil
+from platformdirs import user_cache_dir
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+PROC_CGROUP = Path('/proc/self/cgroup')
+
+# Share of the memory available to this container given to DuckDB.
+MEMORY_FRACTION = 0.25
+# Share of the free disk space DuckDB may fill when spilling.
+SPILL_DISK_FRACTION = 0.5
+# uvicorn reads its default --workers from this variable too.
+WORKERS_ENV = 'WEB_CONCURRENCY'
+# DuckDB threads and memory for the whole server, split between its
+# workers; set by `ducklearn serve --threads/--memory-limit`.
+SERVER_THREADS_ENV = 'DUCKLEARN_THREADS'
+SERVER_MEMORY_ENV = 'DUCKLEARN_MEMORY_LIMIT'
+
+# cgroup v1 reports "no limit" as a huge page-aligned number.
+_UNLIMITED = 2**62
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """What this process may use, and where each number came from."""
+
+    memory_bytes: int
+    memory_source: str
+    cpus: float
+    cpu_source: str
+    workers: int
+    workers_source: str
+    # Server-wide totals from the environment, if set.
+    server_threads: int | None = None
+    server_memory: int | None = None
+
+    @property
+    def memory_budget(self) -> int:
+        """Bytes every database of one worker may use together."""
+        if self.server_memory is not None:
+            return self.server_memory // self.workers
+        return int(self.memory_bytes * MEMORY_FRACTION / self.workers)
+
+
+@dataclass(frozen=True)
+class AutoTune:
+    """DuckDB settings derived from `ResourceLimits` for one worker."""
+
+    memory_limit: str
+    threads: int
+    temp_directory: str
+    max_temp_directory_size: str
+    limits: ResourceLimits
+    steps: dict[str, str]
+
+    def to_dict(self) -> dict:
+        return {
+            'memory_limit': self.memory_limit,
+            'threads': self.threads,
+            'temp_directory': self.temp_directory,
+            'max_temp_directory_size': self.max_temp_directory_size,
+            'limits': asdict(self.limits),
+            'steps': self.steps,
+        }
+
+
+# --- cgroup parsing ---
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(proc_cgroup: Path) -> dict[str, str]:
+    """Map controller name ('' for cgroup v2) to this process's cgroup."""
+    paths: dict[str, str] = {}
+    for line in (_read(proc_cgroup) or '').splitlines():
+        _, controllers, path = line.split(':', 2)
+        for controller in controllers.split(','):
+            paths[controller] = path
+    return paths
+
+
+def _candidates(base: Path, path: str) -> list[Path]:
+    """The process's cgroup directory and its ancestors, deepest first.
+
+    Inside a container the cgroup namespace usually makes `base` itself
+    the process's cgroup, so `base` is always included.
+    """
+    parts = [p for p in path.split('/') if p]
+    dirs = [base.joinpath(*parts[:n]) for n in range(len(parts), 0, -1)]
+    return [d for d in dirs if d.is_dir()] + [base]
+
+
+def _limit(value: str | None) -> int | None:
+    if value is None or value == 'max':
+        return None
+    number = int(value)
+    return number if 0 < number < _UNLIMITED else None
+
+
+def cgroup_memory_limit(
+    root: Path = CGROUP_ROOT, proc_cgroup: Path = PROC_CGROUP
+) -> tuple[int, str] | None:
+    """Tightest cgroup memory limit in bytes and the file it came from."""
+    paths = _cgroup_paths(proc_cgroup)
+    if (root / 'cgroup.controllers').exists():
+        names = [('v2', root, paths.get('', '/'), 'memory.max')]
+        names.append(('v2', root, paths.get('', '/'), 'memory.high'))
+    else:
+        names = [
+            (
+                'v1',
+                root / 'memory',
+                paths.get('memory', '/'),
+                'memory.limit_in_bytes',
+            )
+        ]
+    found: tuple[int, str] | None = None
+    for version, base, path, name in names:
+        for directory in _candidates(base, path):
+            limit = _limit(_read(directory / name))
+            if limit is not None and (found is None or limit < found[0]):
+                found = (limit, f'cgroup {version} {directory / name}')
+    return found
+
+
+def cgroup_cpu_limit(
+    root: Path = CGROUP_ROOT, proc_cgroup: Path = PROC_CGROUP
+) -> tuple[float, str] | None:
+    """Tightest CFS quota as a number of CPUs and the file it came from."""
+    paths = _cgroup_paths(proc_cgroup)
+    found: tuple[float, str] | None = None
+    if (root / 'cgroup.controllers').exists():
+        for directory in _candidates(root, paths.get('', '/')):
+            fields = (_read(directory / 'cpu.max') or 'max').split()
+            if fields[0] == 'max':
+                continue
+            period = int(fields[1]) if len(fields) > 1 else 100_000
+            cpus = int(fields[0]) / period
+            if found is None or cpus < found[0]:
+                found = (cpus, f'cgroup v2 {directory / "cpu.max"}')
+        return found
+
+    path = paths.get('cpu', '/')
+    for name in ('cpu', 'cpu,cpuacct'):
+        for directory in _candidates(root / name, path):
+            quota = _read(directory / 'cpu.cfs_quota_us')
+            period_us = _read(directory / 'cpu.cfs_period_us')
+            if quota is None or period_us is None or int(quota) <= 0:
+                continue
+            cpus = int(quota) / int(period_us)
+            if found is None or cpus < found[0]:
+                found = (cpus, f'cgroup v1 {directory / "cpu.cfs_quota_us"}')
+    return found
+
+
+def cpu_affinity() -> int:
+    """CPUs this process is allowed to run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    try:
+        return len(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        return os.cpu_count() or 1
+
+
+def worker_count() -> tuple[int, str]:
+    """Number of server processes sharing this machine's resources."""
+    value = os.environ.get(WORKERS_ENV)
+    if value and value.isdigit() and int(value) > 0:
+        return int(value), f'${WORKERS_ENV}'
+    return 1, 'default (single process)'
+
+
+def server_totals() -> tuple[int | None, int | None]:
+    """DuckDB (threads, memory bytes) for all workers, if configured."""
+    # config_duckdb imports this module, so it can't be imported above.
+    from config.config_duckdb import parse_memory_size
+
+    threads = os.environ.get(SERVER_THREADS_ENV)
+    memory = os.environ.get(SERVER_MEMORY_ENV)
+    return (
+        int(threads) if threads else None,
+        parse_memory_size(memory) if memory else None,
+    )
+
+
+def detect_limits(
+    root: Path = CGROUP_ROOT, proc_cgroup: Path = PROC_CGROUP
+) -> ResourceLimits:
+    """Combine host, cgroup, affinity and worker information."""
+    memory = psutil.virtual_memory().total
+    memory_source = 'host RAM (psutil)'
+    cgroup_memory = cgroup_memory_limit(root, proc_cgroup)
+    if cgroup_memory is not None and cgroup_memory[0] < memory:
+        memory, memory_source = cgroup_memory
+
+    cpus: float = cpu_affinity()
+    cpu_source = 'CPU affinity'
+    cgroup_cpus = cgroup_cpu_limit(root, proc_cgroup)
+    if cgroup_cpus is not None and cgroup_cpus[0] < cpus:
+        cpus, cpu_source = cgroup_cpus
+
+    workers, workers_source = worker_count()
+    server_threads, server_memory = server_totals()
+    return ResourceLimits(
+        memory_bytes=memory,
+        memory_source=memory_source,
+        cpus=cpus,
+        cpu_source=cpu_source,
+        workers=workers,
+        workers_source=workers_source,
+        server_threads=server_threads,
+        server_memory=server_memory,
+    )
+
+
+# --- Derivation ---
+def default_temp_directory(db_path: Path | None = None) -> Path:
+    """Where a database spills: next to its file, else a private dir.
+
+    In-memory databases get a directory of their own so tenants and
+    workers never share temp files.
+    """
+    if db_path is not None:
+        return Path(f'{db_path}.tmp')
+    spill = Path(user_cache_dir('DuckLearn')) / 'spill'
+    return spill / f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+
+def _free_disk(path: Path) -> int:
+    for parent in (path, *path.parents):
+        if parent.exists():
+            return shutil.disk_usage(parent).free
+    return 0
+
+
+def autotune(
+    db_path: Path | None = None,
+    limits: ResourceLimits | None = None,
+) -> AutoTune:
+    """Derive memory_limit, threads and spill settings for one worker."""
+    limits = limits or detect_limits()
+    workers = limits.workers
+
+    memory = limits.memory_budget
+    if limits.server_threads is not None:
+        threads = max(1, limits.server_threads // workers)
+        threads_step = f'${SERVER_THREADS_ENV} ({limits.server_threads})'
+    else:
+        threads = max(1, math.floor(limits.cpus / workers))
+        threads_step = f'{limits.cpus:g} CPUs ({limits.cpu_source})'
+    if limits.server_memory is not None:
+        memory_step = f'${SERVER_MEMORY_ENV} ({limits.server_memory} bytes)'
+    else:
+        memory_step = (
+            f'{limits.memory_bytes} bytes ({limits.memory_source}) '
+            f'x {MEMORY_FRACTION}'
+        )
+    temp_directory = default_temp_directory(db_path)
+    spill = int(_free_disk(temp_directory) * SPILL_DISK_FRACTION / workers)
+
+    return AutoTune(
+        memory_limit=f'{memory // 1000**2}MB',
+        threads=threads,
+        temp_directory=str(temp_directory),
+        max_temp_directory_size=f'{spill // 1000**2}MB',
+        limits=limits,
+        steps={
+            'memory_limit': f'{memory_step} / {workers} workers',
+            'threads': (
+                f'floor({threads_step} / {workers} workers), at least 1'
+            ),
+            'temp_directory': (
+                'next to the database file'
+                if db_path is not None
+                else 'private directory under the user cache dir'
+            ),
+            'max_temp_directory_size': (
+                f'free disk space x {SPILL_DISK_FRACTION} / {workers} workers'
+            ),
+        },
+    )
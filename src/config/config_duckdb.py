@@ -1,59 +1,200 @@
+import hashlib
+import re
 from pathlib import Path
-from typing import Literal
-import os
-import psutil
-
-class DuckDBConfig:
-    """Holds configuration settings specific to DuckDB."""
-
-    def __init__(
-        self,
-        db_type: Literal["memory", "persistent"] = "memory",
-        db_path: str | None = None,
-        memory_limit: str | None = None,  # auto-detect if None
-        threads: int | None = None,       # auto-detect if None
-        enable_progress_bar: bool = True,
-        read_only: bool = False,
-        default_null_order: Literal["nulls_first", "nulls_last"] = "nulls_last",
-        access_mode: Literal["automatic", "read_only", "read_write"] = "automatic",
-    ) -> None:
-        """Initialize DuckDB configuration."""
-        self.db_type = db_type
-        self.db_path = (
-            Path(db_path).expanduser().resolve()
-            if db_type == "persistent" and db_path
-            else None
-        )
-
-        # --- Auto detection ---
-        total_ram = psutil.virtual_memory().total
-        default_mem = f"{int(total_ram * 0.25 / (1024**3))}GB"
-        self.memory_limit = memory_limit or default_mem
-        self.threads = threads or os.cpu_count() or 1
-
-        # --- Misc flags ---
-        self.enable_progress_bar = enable_progress_bar
-        self.read_only = read_only
-        self.default_null_order = default_null_order
-        self.access_mode = access_mode
+from typing import Annotated, Any, Literal
+
+import orjson
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    ValidationInfo,
+    field_validator,
+)
+
+from config.config_autotune import AutoTune, autotune, detect_limits
+
+# DuckDB memory units: decimal (KB, MB, ...) and binary (KiB, MiB, ...).
+_MEMORY_UNITS = {
+    'b': 1,
+    'byte': 1,
+    'bytes': 1,
+    'kb': 1000,
+    'mb': 1000**2,
+    'gb': 1000**3,
+    'tb': 1000**4,
+    'kib': 1024,
+    'mib': 1024**2,
+    'gib': 1024**3,
+    'tib': 1024**4,
+    'k': 1000,
+    'm': 1000**2,
+    'g': 1000**3,
+    't': 1000**4,
+}
+_MEMORY_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$', re.IGNORECASE)
+
+
+def parse_memory_size(value: str | int) -> int:
+    """Convert a DuckDB memory size such as "8GB" or "953.6 MiB" to bytes."""
+    if isinstance(value, int):
+        return value
+    match = _MEMORY_RE.match(value)
+    unit = match.group(2).lower() if match else ''
+    if not match or (unit and unit not in _MEMORY_UNITS):
+        raise ValueError(f'Invalid memory size: {value!r}')
+    return int(float(match.group(1)) * _MEMORY_UNITS.get(unit, 1))
+
+
+def _check_memory_size(value: str) -> str:
+    parse_memory_size(value)
+    return value.strip()
+
+
+def memory_budget() -> int:
+    """Bytes all DuckDB databases of this process may use together.
+
+    25% of the RAM available to the container (host RAM capped by the
+    cgroup limit), split evenly between server workers.
+    """
+    return detect_limits().memory_budget
+
+
+# Upper bound for `threads`; DuckDB itself accepts more, but beyond
+# this a typo is far more likely than a real machine.
+MAX_THREADS = 1024
+
+MemorySize = Annotated[str, AfterValidator(_check_memory_size)]
+# Fields derived by `autotune` unless set explicitly.
+AUTO_FIELDS = (
+    'memory_limit',
+    'threads',
+    'temp_directory',
+    'max_temp_directory_size',
+)
+
+
+class DuckDBConfig(BaseModel):
+    """Holds configuration settings specific to DuckDB.
+
+    Every field is validated on construction and on assignment, so a
+    live change can't leave an unchecked value behind. Fields left as
+    None are auto-detected (cgroup-aware, see `config_autotune`).
+    """
+
+    model_config = ConfigDict(validate_assignment=True, extra='forbid')
+
+    db_type: Literal['memory', 'persistent'] = 'memory'
+    db_path: Path | None = None
+    memory_limit: MemorySize | None = None  # auto-detect if None
+    threads: int | None = Field(None, ge=1, le=MAX_THREADS)  # auto if None
+    enable_progress_bar: bool = True
+    read_only: bool = False
+    default_null_order: Literal['nulls_first', 'nulls_last'] = 'nulls_last'
+    access_mode: Literal['automatic', 'read_only', 'read_write'] = 'automatic'
+    temp_directory: str | None = None  # auto-detect if None
+    max_temp_directory_size: MemorySize | None = None  # auto-detect if None
+
+    _tuning: AutoTune = PrivateAttr()
+
+    def __init__(self, *args: Any, **values: Any) -> None:
+        """Accept fields positionally too, in declaration order."""
+        values.update(zip(type(self).model_fields, args, strict=False))
+        super().__init__(**values)
+
+    @field_validator('db_path')
+    @classmethod
+    def _resolve_db_path(
+        cls, value: Path | None, info: ValidationInfo
+    ) -> Path | None:
+        if info.data.get('db_type') != 'persistent' or not value:
+            return None
+        return value.expanduser().resolve()
+
+    def model_post_init(self, _context: Any) -> None:
+        """Fill auto-detected fields from the derived settings."""
+        self._tuning = autotune(self.db_path)
+        for name in AUTO_FIELDS:
+            if getattr(self, name) is None:
+                setattr(self, name, getattr(self._tuning, name))
+
+    @property
+    def tuning(self) -> AutoTune:
+        """How the auto-detected values were derived."""
+        return self._tuning
+
+    @property
+    def etag(self) -> str:
+        """Strong HTTP entity tag of the current settings."""
+        payload = orjson.dumps(self.to_dict(), option=orjson.OPT_SORT_KEYS)
+        return f'"{hashlib.sha256(payload).hexdigest()[:16]}"'
+
+    def defaults(self) -> dict:
+        """Settings of a fresh config, reusing this one's auto-detection."""
+        values = {
+            name: field.default
+            for name, field in type(self).model_fields.items()
+        }
+        for name in AUTO_FIELDS:
+            values[name] = getattr(self._tuning, name)
+        return values
 
     @property
     def connection_uri(self) -> str:
-        if self.db_type == "memory":
-            return ":memory:"
+        if self.db_type == 'memory':
+            return ':memory:'
         if not self.db_path:
             raise ValueError("db_path must be set when db_type='persistent'")
         return str(self.db_path)
 
     def to_dict(self) -> dict:
+        return self.model_dump(mode='json')
+
+    def effective_access_mode(self) -> str:
+        """Resolve `read_only` and `access_mode` into a DuckDB access mode."""
+        if self.db_type == 'memory':
+            # DuckDB refuses to open in-memory databases read-only.
+            return 'automatic'
+        if self.read_only:
+            return 'read_only'
+        return self.access_mode
+
+    def database_settings(self) -> dict:
+        """Return database-wide settings passed to `duckdb.connect`."""
+        return {
+            'memory_limit': self.memory_limit,
+            'threads': self.threads,
+            'access_mode': self.effective_access_mode(),
+            'default_null_order': self.default_null_order,
+            'temp_directory': self.temp_directory,
+            'max_temp_directory_size': self.max_temp_directory_size,
+        }
+
+    def cursor_settings(self) -> dict:
+        """Return connection-local settings applied to each new cursor."""
         return {
-            "db_type": self.db_type,
-            "db_path": str(self.db_path) if self.db_path else None,
-            "memory_limit": self.memory_limit,
-            "threads": self.threads,
-            "enable_progress_bar": self.enable_progress_bar,
-            "read_only": self.read_only,
-            "default_null_order": self.default_null_order,
-            "access_mode": self.access_mode,
+            'enable_progress_bar': self.enable_progress_bar,
         }
 
+
+class DuckDBConfigUpdate(BaseModel):
+    """Some `DuckDBConfig` fields; null or missing ones stay unchanged."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    db_type: Literal['memory', 'persistent'] | None = None
+    db_path: str | None = None
+    memory_limit: MemorySize | None = None
+    threads: int | None = Field(None, ge=1, le=MAX_THREADS)
+    enable_progress_bar: bool | None = None
+    read_only: bool | None = None
+    default_null_order: Literal['nulls_first', 'nulls_last'] | None = None
+    access_mode: Literal['automatic', 'read_only', 'read_write'] | None = None
+    temp_directory: str | None = None
+    max_temp_directory_size: MemorySize | None = None
+
+    def changes(self) -> dict:
+        """The fields that were sent with a value."""
+        return self.model_dump(exclude_unset=True, exclude_none=True)
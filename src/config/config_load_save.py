@@ -1,24 +1,76 @@
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import orjson
 from platformdirs import user_config_dir
 
+from config.config_watch import FileWatcher
+
+if sys.platform != 'win32':
+    import fcntl
+
+# Writes requested within this window are coalesced into one.
+SAVE_DELAY_SECONDS = 0.5
+
 
 class ConfigManager:
-    """Handles only loading and saving JSON configuration."""
+    """Handles loading and saving JSON configuration.
+
+    Nothing touches the disk until `data` is first used, so importing
+    the module (and the global `Config`) is free. Writes are atomic
+    (temp file, fsync, rename), so readers and other workers never see
+    a half-written file. Saving re-reads the file under an exclusive
+    lock and merges in what other workers wrote since this one last
+    read it, so concurrent writers don't drop each other's changes.
+    `version` is bumped whenever `data` changes, locally or by a reload.
+    `watch()` reloads the file when another process replaces it and
+    tells `subscribe`rs.
+    """
 
     def __init__(
         self, app_name: str = 'DuckLearn', filename: str = 'settings.json'
     ):
-        """Initialize configuration paths and load existing data if available."""
+        """Initialize configuration paths; data is loaded on first use."""
         self.app_name: str = app_name
         self.filename: str = filename
         self._config_dir: Path = Path(user_config_dir(self.app_name))
         self._config_path: Path = self._config_dir / self.filename
-        self.data: dict = {}
+        self._data: dict | None = None
+        # The file as last read or written, to tell local changes apart.
+        self._base: dict = {}
+        self.version: int = 0
 
-        self._config_dir.mkdir(parents=True, exist_ok=True)
-        self.data = self.load()
+        self._lock = threading.RLock()
+        self._timer: threading.Timer | None = None
+        self._watcher: FileWatcher | None = None
+        self._subscribers: list[Callable[[dict], None]] = []
+
+    @property
+    def data(self) -> dict:
+        """Settings, read from (or created on) disk the first time."""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    data = self.load()
+                    self._base = copy.deepcopy(data)
+                    self._data = data
+        return self._data
+
+    @data.setter
+    def data(self, value: dict) -> None:
+        self._data = value
+
+    @property
+    def loaded(self) -> bool:
+        """Whether `data` has been read yet."""
+        return self._data is not None
 
     def load(self) -> dict:
         """Load settings from JSON file, or return empty dict if not found."""
@@ -27,20 +79,184 @@ class ConfigManager:
             try:
                 return orjson.loads(config_path.read_bytes())
             except (OSError, orjson.JSONDecodeError):
-                print('⚠️ Failed to load config. Returning empty config.')
+                # Keep the unreadable file for inspection; the next save
+                # would otherwise overwrite it.
+                backup = config_path.with_name(config_path.name + '.corrupt')
+                try:
+                    shutil.copyfile(config_path, backup)
+                except OSError:
+                    pass
+                print(
+                    '⚠️ Failed to load config. Returning empty config '
+                    f'(unreadable file kept as {backup.name}).'
+                )
                 return {}
         else:
-            self.save({})
+            with self._file_lock():
+                if not config_path.exists():
+                    self._write_atomic(b'{}')
             return {}
 
     def save(self, data: dict | None = None) -> None:
-        """Save provided data (or current self.data) to JSON."""
-        payload: dict = data if data is not None else self.data
-        json_bytes: bytes = orjson.dumps(
-            payload,
-            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+        """Save provided data (or current self.data) to JSON, atomically.
+
+        Keys changed here since the file was last read win; everything
+        else is taken from the file as it is now. If that brings in
+        other workers' changes, subscribers are told as by `reload`.
+        """
+        with self._lock:
+            self._cancel_pending()
+            # Data saved without reading the file first replaces it.
+            known = self._data is not None
+            payload: dict = data if data is not None else self.data
+            with self._file_lock():
+                current = self._read()
+                if current is None or not known:
+                    merged = payload
+                else:
+                    merged = _merge(self._base, payload, current)
+                json_bytes: bytes = orjson.dumps(
+                    merged,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+                )
+                self._write_atomic(json_bytes)
+            if merged != self._data:
+                self._data = merged
+                self.version += 1
+            self._base = copy.deepcopy(merged)
+        if merged != payload:
+            self._notify(merged)
+
+    def _read(self) -> dict | None:
+        """The file's current content, or None if it can't be read."""
+        try:
+            return orjson.loads(self._config_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock shared by every process using the file."""
+        self._config_dir.mkdir(parents=True, exist_ok=True)
+        if sys.platform == 'win32':
+            yield  # no flock; only this process's lock applies
+            return
+        lock_path = self._config_dir / f'.{self.filename}.lock'
+        with lock_path.open('a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _write_atomic(self, json_bytes: bytes) -> None:
+        self._config_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(
+            prefix=f'.{self.filename}.', suffix='.tmp', dir=self._config_dir
         )
-        self._config_path.write_bytes(json_bytes)
+        os.close(fd)
+        tmp = Path(name)
+        try:
+            tmp.write_bytes(json_bytes)
+            with tmp.open('rb') as written:
+                os.fsync(written.fileno())
+            os.replace(tmp, self._config_path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        # Make the rename itself durable.
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self._config_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    # --- Debounced writes ---
+    @contextmanager
+    def modify(self) -> Iterator[dict]:
+        """Edit `data` in place; the change is saved shortly after.
+
+        Bursts of edits within `SAVE_DELAY_SECONDS` share one write.
+        """
+        with self._lock:
+            before = orjson.dumps(self.data, option=orjson.OPT_SORT_KEYS)
+            yield self.data
+            after = orjson.dumps(self.data, option=orjson.OPT_SORT_KEYS)
+            if after != before:
+                self.version += 1
+                self.save_later()
+
+    def save_later(self, delay: float = SAVE_DELAY_SECONDS) -> None:
+        """Write `data` after `delay` seconds unless asked again before."""
+        with self._lock:
+            self._cancel_pending()
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether a debounced write has not happened yet."""
+        return self._timer is not None
+
+    def flush(self) -> None:
+        """Write a pending debounced save now."""
+        with self._lock:
+            pending = self._timer is not None
+        if pending:
+            self.save()
+
+    # --- Reloading ---
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        """Call `callback(data)` whenever a reload changes the data."""
+        self._subscribers.append(callback)
+
+    def reload(self) -> bool:
+        """Re-read the file; returns True if the data changed.
+
+        A file that can't be parsed (e.g. written non-atomically by hand
+        and caught mid-write) leaves the current data in place.
+        """
+        with self._lock:
+            if self._data is None or self._timer is not None:
+                # Not read yet (first use reads the file anyway), or
+                # there are local changes still to be written.
+                return False
+            data = self._read()
+            if data is None:
+                return False
+            self._base = copy.deepcopy(data)
+            if data == self.data:
+                return False
+            self.data = data
+            self.version += 1
+        self._notify(data)
+        return True
+
+    def _notify(self, data: dict) -> None:
+        for callback in self._subscribers:
+            callback(data)
+
+    def watch(self) -> FileWatcher:
+        """Start hot-reloading the file when it changes on disk."""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = FileWatcher(self._config_path, self.reload)
+                self._watcher.start()
+            return self._watcher
+
+    def unwatch(self) -> None:
+        """Stop the file watcher, if running."""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
 
     @property
     def path(self) -> Path:
@@ -48,5 +264,23 @@ class ConfigManager:
         return self._config_path
 
 
+def _merge(base: dict, ours: dict, theirs: dict) -> dict:
+    """Three-way merge of JSON objects: keys changed in `ours` since
+    `base` take our value (or stay deleted), the rest keep `theirs`.
+    Objects changed on both sides are merged key by key."""
+    merged = dict(theirs)
+    for key in base.keys() | ours.keys():
+        if key not in ours:
+            merged.pop(key, None)
+        elif key not in base or ours[key] != base[key]:
+            old, new, other = base.get(key), ours[key], theirs.get(key)
+            if isinstance(new, dict) and isinstance(other, dict):
+                old = old if isinstance(old, dict) else {}
+                merged[key] = _merge(old, new, other)
+            else:
+                merged[key] = new
+    return merged
+
+
 # --- Global instance (optional) ---
 Config: ConfigManager = ConfigManager()
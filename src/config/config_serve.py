@@ -0,0 +1,167 @@
+"""How `ducklearn serve` splits a machine between server processes.
+
+Each uvicorn worker is a separate process with its own DuckDB
+databases. `WEB_CONCURRENCY` tells every worker how many there are, so
+auto-tuning (see `config_autotune`) gives each an even share of the
+threads and memory; `--threads`/`--memory-limit` set the totals.
+
+DuckDB lets one process open a database file read-write, or any number
+of processes open it read-only, never both. A persistent database is
+therefore served in one of three ways:
+
+- `independent`: one worker, or in-memory databases (one per worker).
+- `read_only`: every worker opens the file read-only.
+- `writer_proxy`: a single writer process opens the file read-write and
+  the public workers forward `/api` requests to it over a Unix socket.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from config.config_autotune import (
+    SERVER_MEMORY_ENV,
+    SERVER_THREADS_ENV,
+    WORKERS_ENV,
+    default_temp_directory,
+)
+
+# `src/`, the uvicorn --app-dir, and the project root it runs from
+# (app.py imports `src.routes`).
+APP_DIR = Path(__file__).resolve().parents[1]
+PROJECT_DIR = APP_DIR.parent
+
+# Environment variable picking the mode of the module-level `app`.
+MODE_ENV = 'DUCKLEARN_MODE'
+# Persistent database of the default tenant, set by `serve --db`.
+DATABASE_ENV = 'DUCKLEARN_DATABASE'
+# "1" opens DATABASE_ENV read-only, so many workers can share it.
+READ_ONLY_ENV = 'DUCKLEARN_READ_ONLY'
+# Unix socket of the writer process; set, workers forward /api to it.
+WRITER_ENV = 'DUCKLEARN_WRITER'
+
+Coordination = Literal['independent', 'read_only', 'writer_proxy']
+Process = tuple[str, list[str], dict[str, str]]
+
+
+@dataclass(frozen=True)
+class ServePlan:
+    """The processes `serve` starts and the environment of each."""
+
+    workers: int
+    coordination: Coordination
+    database: Path | None = None
+    threads: int | None = None
+    memory_limit: str | None = None
+    socket: Path | None = None
+
+    def _totals(self) -> dict[str, str]:
+        env = {}
+        if self.threads is not None:
+            env[SERVER_THREADS_ENV] = str(self.threads)
+        if self.memory_limit is not None:
+            env[SERVER_MEMORY_ENV] = self.memory_limit
+        return env
+
+    def worker_env(self) -> dict[str, str]:
+        """Environment of the public workers."""
+        env = {WORKERS_ENV: str(self.workers), **self._totals()}
+        if self.coordination == 'writer_proxy':
+            env[WRITER_ENV] = str(self.socket)
+        elif self.database is not None:
+            env[DATABASE_ENV] = str(self.database)
+            if self.coordination == 'read_only':
+                env[READ_ONLY_ENV] = '1'
+        return env
+
+    def writer_env(self) -> dict[str, str]:
+        """Environment of the writer, which runs every query alone."""
+        return {
+            WORKERS_ENV: '1',
+            **self._totals(),
+            DATABASE_ENV: str(self.database),
+        }
+
+    def processes(self, host: str, port: int) -> list[Process]:
+        """(name, command, environment) of each uvicorn to start, in order."""
+        uvicorn = [
+            sys.executable, '-m', 'uvicorn', 'app:app',
+            '--app-dir', str(APP_DIR),
+        ]  # fmt: skip
+        public = [
+            *uvicorn,
+            '--host', host,
+            '--port', str(port),
+            '--workers', str(self.workers),
+        ]  # fmt: skip
+        if self.coordination != 'writer_proxy':
+            return [('workers', public, self.worker_env())]
+        writer = [*uvicorn, '--uds', str(self.socket), '--workers', '1']
+        return [
+            ('writer', writer, self.writer_env()),
+            ('workers', public, self.worker_env()),
+        ]
+
+
+def plan_serve(
+    workers: int,
+    database: str | Path | None = None,
+    *,
+    read_only: bool = False,
+    threads: int | None = None,
+    memory_limit: str | None = None,
+    socket_dir: str | Path | None = None,
+) -> ServePlan:
+    """Choose how `workers` processes share `database` and resources."""
+    from config.config_duckdb import parse_memory_size
+
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    if threads is not None and threads < workers:
+        raise ValueError(
+            f'{threads} threads cannot be shared by {workers} workers'
+        )
+    if memory_limit is not None:
+        parse_memory_size(memory_limit)
+
+    path = Path(database).expanduser().resolve() if database else None
+    socket = None
+    if path is None or (workers == 1 and not read_only):
+        coordination: Coordination = 'independent'
+    elif read_only:
+        coordination = 'read_only'
+    else:
+        coordination = 'writer_proxy'
+        directory = Path(socket_dir or tempfile.gettempdir())
+        socket = directory / f'ducklearn-writer-{os.getpid()}.sock'
+    return ServePlan(
+        workers=workers,
+        coordination=coordination,
+        database=path,
+        threads=threads,
+        memory_limit=memory_limit,
+        socket=socket,
+    )
+
+
+@functools.cache
+def worker_database() -> dict:
+    """Default tenant settings `serve` gave this worker (empty if none).
+
+    Read-only workers never write the file, so each spills to a private
+    directory instead of the shared one next to it.
+    """
+    path = os.environ.get(DATABASE_ENV)
+    if not path:
+        return {}
+    settings: dict = {'db_type': 'persistent', 'db_path': path}
+    if os.environ.get(READ_ONLY_ENV) == '1':
+        settings['read_only'] = True
+        settings['temp_directory'] = str(default_temp_directory())
+    return settings
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+# Seconds between stat() calls when inotify is unavailable.
+POLL_INTERVAL_SECONDS = 1.0
+
+# inotify(7) constants.
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _signature(path: Path) -> tuple[int, int, int] | None:
+    """What changes when a file is rewritten or replaced."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Calls `callback()` from a daemon thread whenever `path` changes.
+
+    On Linux the parent directory is watched with inotify, which also
+    catches atomic replacements (rename over the file). Elsewhere, or if
+    inotify can't be set up, the file is polled with stat().
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        callback: Callable[[], None],
+        interval: float = POLL_INTERVAL_SECONDS,
+    ) -> None:
+        """Watch `path`; `interval` is the polling (and stop-check) period."""
+        self.path: Path = Path(path)
+        self.callback: Callable[[], None] = callback
+        self.interval: float = interval
+        self.backend: str = 'stopped'
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start watching; a no-op if already started."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        fd = self._inotify_fd()
+        self.backend = 'inotify' if fd is not None else 'polling'
+        target = self._run_inotify if fd is not None else self._run_polling
+        self._thread = threading.Thread(
+            target=target,
+            args=(fd,) if fd is not None else (),
+            name=f'watch-{self.path.name}',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the thread to exit."""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(self.interval * 2)
+        self.backend = 'stopped'
+
+    def _notify(self) -> None:
+        try:
+            self.callback()
+        except Exception as exc:  # never let the watcher thread die
+            print(f'⚠️ Reloading {self.path} failed: {exc}')
+
+    # --- Polling ---
+    def _run_polling(self) -> None:
+        last = _signature(self.path)
+        while not self._stop.wait(self.interval):
+            current = _signature(self.path)
+            if current != last:
+                last = current
+                self._notify()
+
+    # --- inotify ---
+    def _inotify_fd(self) -> int | None:
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+            directory = os.fsencode(self.path.parent)
+            if libc.inotify_add_watch(fd, directory, mask) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return fd
+
+    def _run_inotify(self, fd: int) -> None:
+        name = os.fsencode(self.path.name)
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.interval)
+                if not ready:
+                    continue
+                try:
+                    buffer = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if name in _event_names(buffer):
+                    self._notify()
+        finally:
+            os.close(fd)
+
+
+def _event_names(buffer: bytes) -> set[bytes]:
+    """File names in a buffer of inotify_event structs."""
+    names = set()
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(buffer):
+        _, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+        start = offset + _EVENT_HEADER.size
+        names.add(buffer[start : start + length].rstrip(b'\0'))
+        offset = start + length
+    return names
@@ -0,0 +1,3 @@
+from .engine_pool import ConnectionManager, ConnectionPool, Engine
+
+__all__ = ['ConnectionManager', 'ConnectionPool', 'Engine']
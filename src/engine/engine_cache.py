@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import duckdb
+import pyarrow as pa
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+from config.config_duckdb import parse_memory_size
+from engine.engine_pool import ConnectionManager, Engine, PoolClosedError
+
+# Share of DuckDB's memory_limit the result cache may hold.
+CACHE_MEMORY_FRACTION = 0.1
+# A single result may use at most this share of the cache budget.
+MAX_ENTRY_FRACTION = 0.25
+
+# Functions whose result changes between calls, or that read files
+# (prefix `READ_`, suffix `_SCAN`) the cache cannot watch for writes.
+_VOLATILE_FUNCTIONS = frozenset(
+    {
+        'RAND',
+        'RANDOM',
+        'SETSEED',
+        'NOW',
+        'TODAY',
+        'CURRENT_DATE',
+        'CURRENT_TIME',
+        'CURRENT_TIMESTAMP',
+        'CURRENT_LOCALTIMESTAMP',
+        'GET_CURRENT_TIME',
+        'GET_CURRENT_TIMESTAMP',
+        'CURRENT_SETTING',
+        'UUID',
+        'GEN_RANDOM_UUID',
+        'NEXTVAL',
+        'CURRVAL',
+        'GLOB',
+    }
+)
+_WRITE_STATEMENTS = (
+    exp.Insert,
+    exp.Update,
+    exp.Delete,
+    exp.Merge,
+    exp.Create,
+    exp.Drop,
+    exp.Alter,
+    exp.Copy,
+    exp.TruncateTable,
+)
+# A table name with any of these is a file path or glob DuckDB scans
+# (`FROM 'data/*.csv'`), not a table the cache can watch.
+_FILE_PATH_CHARS = frozenset('./\\*?:')
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """What the cache needs to know about one SQL statement."""
+
+    key: str | None
+    tables: frozenset[str]
+    is_write: bool
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether results of this statement may be cached."""
+        return self.key is not None
+
+
+def _function_name(node: exp.Func) -> str:
+    if isinstance(node, exp.Anonymous):
+        return node.name.upper()
+    return node.sql_name().upper()
+
+
+def _canonical_table_aliases(tree: exp.Expr) -> exp.Expr:
+    """Rename table aliases to positional names so they don't affect keys."""
+    mapping: dict[str, str] = {}
+    for table in tree.find_all(exp.Table):
+        alias = table.alias
+        if alias and alias not in mapping:
+            mapping[alias] = f'_q{len(mapping)}'
+    if not mapping:
+        return tree
+
+    def rename(node: exp.Expr) -> exp.Expr:
+        if isinstance(node, exp.Table) and node.alias in mapping:
+            alias = exp.to_identifier(mapping[node.alias])
+            node.set('alias', exp.TableAlias(this=alias))
+        elif isinstance(node, exp.Column) and node.table in mapping:
+            node.set('table', exp.to_identifier(mapping[node.table]))
+        return node
+
+    return tree.transform(rename, copy=False)
+
+
+def analyze_sql(sql: str) -> QueryShape:
+    """Parse `sql` with sqlglot and derive its cache key and tables.
+
+    The key is a hash of the canonical DuckDB rendering, so whitespace,
+    keyword/identifier casing and table alias names do not matter.
+    Table names are lower-cased, as DuckDB resolves them
+    case-insensitively.
+    Statements that fail to parse, or hold several statements, are
+    treated as uncacheable writes to every table. Reads of files are
+    not cacheable; neither are reads of views, which `ResultCache.put`
+    refuses since only the database knows which names are views.
+    """
+    try:
+        statements = sqlglot.parse(sql, dialect='duckdb')
+    except SqlglotError:
+        return QueryShape(None, frozenset(), True)
+    if len(statements) != 1 or statements[0] is None:
+        return QueryShape(None, frozenset(), True)
+
+    tree = normalize_identifiers(statements[0], dialect='duckdb')
+    ctes = {cte.alias for cte in tree.find_all(exp.CTE)}
+    tables = frozenset(
+        table.name.lower()
+        for table in tree.find_all(exp.Table)
+        if table.name and table.name not in ctes
+    )
+
+    if isinstance(tree, _WRITE_STATEMENTS):
+        return QueryShape(None, tables, True)
+    if not isinstance(tree, exp.Query):
+        # PRAGMA, SET, ATTACH, CALL ... may change anything.
+        return QueryShape(None, frozenset(), True)
+
+    for func in tree.find_all(exp.Func):
+        name = _function_name(func)
+        if (
+            name in _VOLATILE_FUNCTIONS
+            or name.startswith('READ_')
+            or name.endswith('_SCAN')
+        ):
+            return QueryShape(None, tables, False)
+    if any(_FILE_PATH_CHARS.intersection(table) for table in tables):
+        return QueryShape(None, tables, False)
+
+    canonical = _canonical_table_aliases(tree).sql(dialect='duckdb')
+    key = hashlib.sha256(canonical.encode()).hexdigest()
+    return QueryShape(key, tables, False)
+
+
+@dataclass
+class _Entry:
+    table: pa.Table
+    tables: frozenset[str]
+    nbytes: int
+
+
+class ResultCache:
+    """LRU cache of Arrow results bounded by a share of `memory_limit`.
+
+    Entries are keyed by connection URI plus the normalized SQL hash,
+    and dropped when any table they read is written through
+    `invalidate`. Results reading a view are not kept: writes name the
+    view's tables, not the view.
+    """
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        memory_fraction: float = CACHE_MEMORY_FRACTION,
+    ) -> None:
+        """Bind to a connection manager for the URI and memory budget."""
+        self.manager: ConnectionManager = manager
+        self.memory_fraction: float = memory_fraction
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._epoch: int = 0
+        # View names per connection URI, re-read from the catalog after
+        # any write; `_catalog` is bumped so a racing read isn't kept.
+        self._views: dict[str, frozenset[str]] = {}
+        self._catalog: int = 0
+        self._nbytes: int = 0
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    # --- Budget ---
+    @property
+    def budget(self) -> int:
+        """Bytes the cache may hold, derived from the live memory_limit."""
+        limit = parse_memory_size(self.manager.config.memory_limit)
+        return int(limit * self.memory_fraction)
+
+    @property
+    def max_entry_bytes(self) -> int:
+        """Largest single result the cache will keep."""
+        return int(self.budget * MAX_ENTRY_FRACTION)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- Lookup / store ---
+    def _full_key(self, key: str) -> tuple[str, str]:
+        return self.manager.config.connection_uri, key
+
+    def get(self, shape: QueryShape) -> pa.Table | None:
+        """Return the cached result for `shape`, counting hits/misses."""
+        if shape.key is None:
+            return None
+        full_key = self._full_key(shape.key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            return entry.table
+
+    def snapshot(self, shape: QueryShape) -> tuple[int, tuple[int, ...]]:
+        """Table versions to compare against when the result is stored."""
+        with self._lock:
+            return self._epoch, tuple(
+                self._versions.get(t, 0) for t in sorted(shape.tables)
+            )
+
+    def _view_names(self) -> frozenset[str] | None:
+        """Views of the active database (None if it can't be asked)."""
+        uri = self.manager.config.connection_uri
+        with self._lock:
+            views = self._views.get(uri)
+            catalog = self._catalog
+        if views is not None:
+            return views
+        try:
+            with self.manager.pool().planner() as cursor:
+                rows = cursor.execute(
+                    'SELECT lower(view_name) FROM duckdb_views() '
+                    'WHERE NOT internal'
+                ).fetchall()
+        except (duckdb.Error, PoolClosedError):
+            return None
+        views = frozenset(name for (name,) in rows)
+        with self._lock:
+            if catalog == self._catalog:
+                self._views[uri] = views
+        return views
+
+    def put(
+        self,
+        shape: QueryShape,
+        table: pa.Table,
+        snapshot: tuple[int, tuple[int, ...]] | None = None,
+    ) -> bool:
+        """Store a result unless it is too big, stale or reads a view."""
+        if shape.key is None:
+            return False
+        nbytes = table.nbytes
+        if nbytes > self.max_entry_bytes:
+            return False
+        views = self._view_names()
+        if views is None or shape.tables & views:
+            return False
+        full_key = self._full_key(shape.key)
+        with self._lock:
+            if snapshot is not None and snapshot != (
+                self._epoch,
+                tuple(self._versions.get(t, 0) for t in sorted(shape.tables)),
+            ):
+                # A write landed while the query ran; result may be stale.
+                return False
+            old = self._entries.pop(full_key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._entries[full_key] = _Entry(table, shape.tables, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        budget = self.budget
+        while self._nbytes > budget and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._nbytes -= entry.nbytes
+
+    def capture(
+        self,
+        shape: QueryShape,
+        reader: pa.RecordBatchReader,
+        snapshot: tuple[int, tuple[int, ...]],
+    ) -> pa.RecordBatchReader:
+        """Wrap `reader` so its batches are cached once fully streamed.
+
+        `snapshot` must be taken before the query started executing, so
+        a write landing meanwhile keeps the result out of the cache.
+        Batches are kept (as Arrow buffers, not Python rows) only while
+        their total stays under `max_entry_bytes`; larger results just
+        pass through.
+        """
+        if not shape.cacheable:
+            return reader
+        limit = self.max_entry_bytes
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            kept: list[pa.RecordBatch] | None = []
+            size = 0
+            for batch in reader:
+                if kept is not None:
+                    size += batch.nbytes
+                    if size > limit:
+                        kept = None
+                    else:
+                        kept.append(batch)
+                yield batch
+            if kept is not None:
+                self.put(
+                    shape,
+                    pa.Table.from_batches(kept, schema=reader.schema),
+                    snapshot,
+                )
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    # --- Invalidation ---
+    def invalidate(self, tables: Iterable[str] | None = None) -> int:
+        """Drop entries reading any of `tables` (all if None)."""
+        with self._lock:
+            # The write may have created or dropped a view.
+            self._views.clear()
+            self._catalog += 1
+            if tables is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._nbytes = 0
+                self._epoch += 1
+                return dropped
+            written = {t.lower() for t in tables}
+            for table in written:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if entry.tables & written
+            ]
+            for key in stale:
+                self._nbytes -= self._entries.pop(key).nbytes
+            return len(stale)
+
+    def invalidate_for(self, shape: QueryShape) -> None:
+        """Invalidate whatever a statement of this shape may have written."""
+        if not shape.is_write:
+            return
+        self.invalidate(shape.tables or None)
+
+
+# --- Global instance (optional) ---
+Cache: ResultCache = ResultCache(Engine)
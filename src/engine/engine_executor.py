@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Protocol, TypeVar
+
+from engine.engine_pool import ConnectionManager, Engine
+
+T = TypeVar('T')
+
+DISCONNECT_POLL_SECONDS = 0.1
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the admission queue is full; maps to HTTP 429."""
+
+
+class Disconnectable(Protocol):
+    """Anything with Starlette's `Request.is_disconnected` coroutine."""
+
+    async def is_disconnected(self) -> bool: ...
+
+
+class Interruptible(Protocol):
+    """Anything whose running query can be interrupted, like a cursor."""
+
+    def interrupt(self) -> None: ...
+
+
+class Releasable(Protocol):
+    """Anything holding a slot until `release`, like an `Admission`."""
+
+    def release(self) -> None: ...
+
+
+class Admission:
+    """A slot held by one query from admission until it finishes."""
+
+    def __init__(self, executor: QueryExecutor) -> None:
+        self._executor: QueryExecutor | None = executor
+
+    def release(self) -> None:
+        """Give the slot back; safe to call more than once."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor._release_slot()
+
+    def __enter__(self) -> Admission:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+
+class QueryExecutor:
+    """Runs blocking DuckDB calls on a dedicated thread pool.
+
+    The pool is sized from the active `DuckDBConfig.threads` and resized
+    when that changes. At most `threads + max_queue` queries are
+    admitted at once; beyond that `admit` raises `QueueFullError`.
+    """
+
+    def __init__(
+        self, manager: ConnectionManager, max_queue: int = 64
+    ) -> None:
+        """Bind to a connection manager; threads start on first use."""
+        self.manager: ConnectionManager = manager
+        self.max_queue: int = max_queue
+        self._threads: ThreadPoolExecutor | None = None
+        self._workers: int = 0
+        self._admitted: int = 0
+        self._lock = threading.Lock()
+
+    # --- Thread pool ---
+    def _pool(self) -> ThreadPoolExecutor:
+        """Return the thread pool, rebuilding it if `threads` changed."""
+        workers = max(1, self.manager.config.threads)
+        with self._lock:
+            if self._threads is None or workers != self._workers:
+                old = self._threads
+                self._threads = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix='duckdb-query'
+                )
+                self._workers = workers
+                if old is not None:
+                    # Queued work on the old pool still runs to completion.
+                    old.shutdown(wait=False)
+            return self._threads
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of queries admitted at the same time."""
+        return max(1, self.manager.config.threads) + self.max_queue
+
+    @property
+    def admitted(self) -> int:
+        """Number of queries currently running or queued."""
+        return self._admitted
+
+    # --- Admission ---
+    def admit(self) -> Admission:
+        """Reserve a slot for one query or raise `QueueFullError`."""
+        with self._lock:
+            if self._admitted >= self.capacity:
+                raise QueueFullError(
+                    f'Query queue is full ({self._admitted} admitted)'
+                )
+            self._admitted += 1
+        return Admission(self)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    # --- Execution ---
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        cursor: Interruptible | None = None,
+        request: Disconnectable | None = None,
+    ) -> T:
+        """Run `fn(*args)` on the query pool without blocking the loop.
+
+        If `cursor` is given it is interrupted when the awaiting task is
+        cancelled or, when `request` is given, the client disconnects.
+        If the task is cancelled, whatever `fn` still returns is closed
+        (when it has a `close` method), as no caller will receive it.
+        """
+        pending = self._pool().submit(fn, *args)
+        future = asyncio.wrap_future(pending)
+        watcher = None
+        if cursor is not None and request is not None:
+            watcher = asyncio.create_task(
+                _interrupt_on_disconnect(request, cursor, future)
+            )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if cursor is not None:
+                cursor.interrupt()
+            pending.add_done_callback(_close_result)
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def iterate(
+        self,
+        chunks: Iterator[T],
+        *,
+        cursor: Interruptible | None = None,
+        request: Disconnectable | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> AsyncIterator[T]:
+        """Drive a blocking iterator from the query pool, one item a step.
+
+        Once iteration ends the iterator is closed, and `on_close` called,
+        on a worker thread after any in-flight step has returned. Cleanup
+        such as releasing a cursor therefore runs even when the client
+        goes away mid-stream, but never under a running fetch.
+        """
+        sentinel = object()
+        guard = threading.Lock()
+
+        def step() -> Any:
+            with guard:
+                return next(chunks, sentinel)
+
+        def close() -> None:
+            with guard:
+                close_fn = getattr(chunks, 'close', None)
+                try:
+                    if close_fn is not None:
+                        close_fn()
+                finally:
+                    if on_close is not None:
+                        on_close()
+
+        finished = False
+        try:
+            while True:
+                item = await self.run(step, cursor=cursor, request=request)
+                if item is sentinel:
+                    finished = True
+                    break
+                yield item
+        finally:
+            if not finished:
+                # Abandoned or failed: clean up without awaiting.
+                self._pool().submit(close)
+        await self.run(close)
+
+    def shutdown(self) -> None:
+        """Stop the thread pool; running calls finish in the background."""
+        with self._lock:
+            threads, self._threads = self._threads, None
+        if threads is not None:
+            threads.shutdown(wait=False, cancel_futures=True)
+
+
+async def release_after(
+    chunks: AsyncIterator[T], *admissions: Releasable
+) -> AsyncIterator[T]:
+    """Yield `chunks`, then free the query's slots, last taken first."""
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        for admission in reversed(admissions):
+            admission.release()
+
+
+def _close_result(future: Future) -> None:
+    """Close the result of a call whose caller was cancelled."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), 'close', None)
+    if callable(close):
+        close()
+
+
+async def _interrupt_on_disconnect(
+    request: Disconnectable,
+    cursor: Interruptible,
+    future: asyncio.Future,
+) -> None:
+    """Interrupt `cursor` if the client disconnects before `future` is done.
+
+    Checking `future` matters: Starlette polls for a disconnect inside a
+    cancelled anyio scope, which can swallow this task's cancellation,
+    and the cursor may serve another query by then.
+    """
+    while not future.done():
+        if await request.is_disconnected():
+            if not future.done():
+                cursor.interrupt()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+# --- Global instance (optional) ---
+Executor: QueryExecutor = QueryExecutor(Engine)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import glob
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import duckdb
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from engine.engine_cache import Cache, ResultCache
+from engine.engine_pool import ConnectionManager, Engine
+
+IngestFormat = Literal['parquet', 'csv', 'json']
+IngestMode = Literal['append', 'replace']
+
+# DuckDB table functions used for each format.
+READERS: dict[str, str] = {
+    'parquet': 'read_parquet',
+    'csv': 'read_csv_auto',
+    'json': 'read_json_auto',
+}
+_EXTENSIONS: dict[str, str] = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.txt': 'csv',
+    '.json': 'json',
+    '.ndjson': 'json',
+    '.jsonl': 'json',
+}
+_COMPRESSION_SUFFIXES = frozenset({'.gz', '.zst'})
+
+
+class IngestError(ValueError):
+    """Raised for bad ingestion input (no files, unknown format, ...)."""
+
+
+def detect_format(path: str | Path) -> str:
+    """Infer the reader format from a file name, ignoring .gz/.zst."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    while suffixes and suffixes[-1] in _COMPRESSION_SUFFIXES:
+        suffixes.pop()
+    fmt = _EXTENSIONS.get(suffixes[-1]) if suffixes else None
+    if fmt is None:
+        raise IngestError(f'Cannot infer format of {str(path)!r}')
+    return fmt
+
+
+def expand_sources(sources: Iterable[str | Path]) -> list[Path]:
+    """Expand globs into a sorted, de-duplicated list of existing files.
+
+    Strings are glob patterns; `Path`s name one file literally, so the
+    result can be expanded again even if names contain `*?[`.
+    """
+    files: dict[Path, None] = {}
+    for source in sources:
+        if isinstance(source, Path):
+            matches = [str(source.expanduser())] if source.exists() else []
+        else:
+            pattern = str(Path(source).expanduser())
+            matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise IngestError(f'No files match {str(source)!r}')
+        for match in matches:
+            path = Path(match).resolve()
+            if path.is_file():
+                files[path] = None
+    if not files:
+        raise IngestError('No files to ingest')
+    return list(files)
+
+
+def quote_table(name: str) -> str:
+    """Quote a (possibly schema-qualified) table name for DuckDB."""
+    try:
+        return exp.to_table(name, dialect='duckdb').sql(
+            dialect='duckdb', identify=True
+        )
+    except SqlglotError as exc:
+        raise IngestError(f'Invalid table name {name!r}') from exc
+
+
+@dataclass
+class FileProgress:
+    """Progress event emitted after each file is loaded."""
+
+    path: str
+    format: str
+    rows: int
+    bytes: int
+    seconds: float
+    index: int
+    total: int
+
+    def to_dict(self) -> dict:
+        return {'event': 'file', **asdict(self)}
+
+
+@dataclass
+class IngestResult:
+    """Summary of one ingestion run."""
+
+    table: str
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    files: list[FileProgress] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            'event': 'done',
+            'table': self.table,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'seconds': self.seconds,
+            'files': len(self.files),
+        }
+
+
+class Ingestor:
+    """Streams files from disk into DuckDB tables with native readers.
+
+    Each file is loaded with one `INSERT ... BY NAME SELECT * FROM
+    read_*(path)` statement, so DuckDB reads it in parallel on the
+    configured `threads` and spills within `memory_limit`. Only
+    `max_concurrent` loads run at once so parallel jobs don't multiply
+    the thread and memory budget of a shared node. Results of
+    `cache` reading a loaded table are invalidated.
+    """
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        cache: ResultCache | None = None,
+        max_concurrent: int = 1,
+    ) -> None:
+        """Bind to a connection manager; loads use its pooled cursors."""
+        self.manager: ConnectionManager = manager
+        self.cache: ResultCache | None = cache
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def iter_ingest(
+        self,
+        table: str,
+        sources: Iterable[str | Path],
+        *,
+        format: IngestFormat | None = None,
+        mode: IngestMode = 'append',
+        cursor: duckdb.DuckDBPyConnection | None = None,
+    ) -> Generator[FileProgress, None, IngestResult]:
+        """Load files one by one, yielding progress; returns the summary.
+
+        The whole run is a single transaction: if any file fails the
+        table is left as it was. `mode='replace'` recreates the table
+        from the first file's schema; `append` creates it if missing.
+        Loads run on `cursor` when given (one of the manager's).
+        """
+        files = expand_sources(sources)
+        formats = [format or detect_format(path) for path in files]
+        for fmt in formats:
+            if fmt not in READERS:
+                raise IngestError(f'Unsupported format {fmt!r}')
+        target = quote_table(table)
+        result = IngestResult(table=table)
+        started = time.perf_counter()
+
+        checkout = (
+            self.manager.cursor() if cursor is None else nullcontext(cursor)
+        )
+        with self._slots, checkout as cursor:
+            cursor.execute('BEGIN TRANSACTION')
+            try:
+                first = f'{READERS[formats[0]]}(?)'
+                create = (
+                    'CREATE OR REPLACE TABLE'
+                    if mode == 'replace'
+                    else 'CREATE TABLE IF NOT EXISTS'
+                )
+                cursor.execute(
+                    f'{create} {target} AS SELECT * FROM {first} LIMIT 0',
+                    [str(files[0])],
+                )
+                pairs = zip(files, formats, strict=True)
+                for index, (path, fmt) in enumerate(pairs):
+                    file_started = time.perf_counter()
+                    [(rows,)] = cursor.execute(
+                        f'INSERT INTO {target} BY NAME '
+                        f'SELECT * FROM {READERS[fmt]}(?)',
+                        [str(path)],
+                    ).fetchall()
+                    progress = FileProgress(
+                        path=str(path),
+                        format=fmt,
+                        rows=rows,
+                        bytes=path.stat().st_size,
+                        seconds=time.perf_counter() - file_started,
+                        index=index + 1,
+                        total=len(files),
+                    )
+                    result.files.append(progress)
+                    result.rows += progress.rows
+                    result.bytes += progress.bytes
+                    yield progress
+                cursor.execute('COMMIT')
+            except BaseException:
+                _rollback(cursor)
+                raise
+            finally:
+                if self.cache is not None:
+                    written = exp.to_table(table, dialect='duckdb').name
+                    self.cache.invalidate([written])
+
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def ingest(
+        self,
+        table: str,
+        sources: Iterable[str | Path],
+        *,
+        format: IngestFormat | None = None,
+        mode: IngestMode = 'append',
+        on_progress: Callable[[FileProgress], None] | None = None,
+    ) -> IngestResult:
+        """Run `iter_ingest` to completion, calling `on_progress` per file."""
+        run = self.iter_ingest(table, sources, format=format, mode=mode)
+        while True:
+            try:
+                progress = next(run)
+            except StopIteration as done:
+                return done.value
+            if on_progress is not None:
+                on_progress(progress)
+
+
+def _rollback(cursor: duckdb.DuckDBPyConnection) -> None:
+    """Roll back, without masking the error that caused it."""
+    try:
+        cursor.execute('ROLLBACK')
+    except duckdb.Error:
+        pass
+
+
+# --- Global instance (optional) ---
+Ingest: Ingestor = Ingestor(Engine, Cache)
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, MutableMapping
+from dataclasses import asdict, dataclass
+from typing import Any
+
+# Prometheus text exposition format, version 0.0.4.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; spans cached lookups up to long analytical queries.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    60.0,
+)  # fmt: skip
+
+# Key of the slow query log settings in settings.json.
+SLOW_QUERIES_KEY = 'slow_queries'
+
+Labels = tuple[str, ...]
+Sample = tuple[dict[str, str], float]
+Scope = MutableMapping[str, Any]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [
+        f'{n}="{_escape(str(v))}"' for n, v in zip(names, values, strict=True)
+    ]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """One named metric family with a fixed set of label names."""
+
+    type: str = 'untyped'
+
+    def __init__(
+        self, name: str, description: str, labels: Labels = ()
+    ) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: Labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f'{self.name} takes labels {self.labels}, got {tuple(labels)}'
+            )
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> list[str]:
+        return [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+    def lines(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up, per label combination."""
+
+    type = 'counter'
+
+    def __init__(
+        self, name: str, description: str, labels: Labels = ()
+    ) -> None:
+        super().__init__(name, description, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labels, key)} '
+            f'{_format_value(value)}'
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative `le` buckets."""
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Labels = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labels)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # Per label key: [count per bucket (+Inf last), sum].
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]]
+        self._values = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        lines = []
+        bounds = [*map(_format_value, self.buckets), '+Inf']
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts, strict=True):
+                cumulative += count
+                labels = _format_labels((*self.labels, 'le'), (*key, bound))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Collected(_Metric):
+    """A metric read from `collect()` whenever the metrics are scraped.
+
+    For values something else already keeps, such as pool occupancy
+    (a gauge) or the result cache's hit count (a counter).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Labels,
+        collect: Callable[[], Iterable[Sample]],
+        type: str = 'gauge',
+    ) -> None:
+        super().__init__(name, description, labels)
+        self.collect: Callable[[], Iterable[Sample]] = collect
+        self.type = type
+
+    def lines(self) -> list[str]:
+        lines = []
+        for labels, value in self.collect():
+            values = [labels[name] for name in self.labels]
+            lines.append(
+                f'{self.name}{_format_labels(self.labels, values)} '
+                f'{_format_value(value)}'
+            )
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in Prometheus text format.
+
+    Every worker process keeps its own registry; scrape each worker (or
+    aggregate by instance) when running several.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name!r} already exists')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, description: str, labels: Labels = ()
+    ) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Labels = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def collected(
+        self,
+        name: str,
+        description: str,
+        labels: Labels,
+        collect: Callable[[], Iterable[Sample]],
+        type: str = 'gauge',
+    ) -> Collected:
+        return self._register(
+            Collected(name, description, labels, collect, type)
+        )
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines += metric.header() + metric.lines()
+        return '\n'.join(lines) + '\n'
+
+
+# --- Slow query log ---
+@dataclass(frozen=True)
+class SlowQuery:
+    """One query that took longer than the slow query threshold."""
+
+    tenant: str
+    sql: str
+    seconds: float
+    rows: int
+    finished_at: float
+    profile: dict
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SlowQueryLog:
+    """Ring buffer of DuckDB profiles of slow queries (opt-in).
+
+    While `enabled`, cursors run with `enable_profiling = 'no_output'`
+    and queries taking at least `threshold_ms` keep DuckDB's JSON
+    profile (the data behind `EXPLAIN ANALYZE`). Only the newest
+    `capacity` entries are kept.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        threshold_ms: float = 1000,
+        capacity: int = 100,
+    ) -> None:
+        self.enabled: bool = enabled
+        self.threshold_ms: float = threshold_ms
+        self._entries: deque[SlowQuery] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen or 0
+
+    def configure(
+        self,
+        enabled: bool | None = None,
+        threshold_ms: float | None = None,
+        capacity: int | None = None,
+    ) -> None:
+        """Change the settings; shrinking `capacity` drops the oldest."""
+        if threshold_ms is not None and threshold_ms < 0:
+            raise ValueError('threshold_ms must be >= 0')
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be >= 1')
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if threshold_ms is not None:
+                self.threshold_ms = threshold_ms
+            if capacity is not None and capacity != self.capacity:
+                self._entries = deque(self._entries, maxlen=capacity)
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.enabled and seconds * 1000 >= self.threshold_ms
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, tenant: str | None = None) -> list[SlowQuery]:
+        """Logged queries, newest first."""
+        with self._lock:
+            entries = list(self._entries)
+        return [e for e in reversed(entries) if tenant in (None, e.tenant)]
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+        return dropped
+
+    def settings(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'threshold_ms': self.threshold_ms,
+            'capacity': self.capacity,
+        }
+
+
+# --- Request timing ---
+class MetricsMiddleware:
+    """Times every HTTP request into `REQUEST_SECONDS`.
+
+    Requests are labelled with the route template (`/api/statements/
+    {statement_id}`), not the raw path, so the number of series stays
+    bounded. Streaming responses are timed until their last chunk.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app: Callable = app
+
+    async def __call__(
+        self, scope: Scope, receive: Callable, send: Callable
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get('route'), 'path', None)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope['method'],
+                route=route if route is not None else 'unmatched',
+                status=status,
+            )
+
+
+# --- Global instance (optional) ---
+Metrics: MetricsRegistry = MetricsRegistry()
+SlowQueries: SlowQueryLog = SlowQueryLog()
+
+REQUEST_SECONDS = Metrics.histogram(
+    'ducklearn_http_request_duration_seconds',
+    'HTTP request latency until the last byte was sent.',
+    ('method', 'route', 'status'),
+)
+QUERIES = Metrics.counter(
+    'ducklearn_queries_total',
+    'Queries run on DuckDB, by outcome (ok, error, abandoned).',
+    ('tenant', 'outcome'),
+)
+QUERY_SECONDS = Metrics.histogram(
+    'ducklearn_query_duration_seconds',
+    'Time from executing a query to streaming its last batch.',
+    ('tenant',),
+)
+ROWS_STREAMED = Metrics.counter(
+    'ducklearn_rows_streamed_total',
+    'Result rows sent to clients.',
+    ('tenant', 'format'),
+)
+BYTES_STREAMED = Metrics.counter(
+    'ducklearn_bytes_streamed_total',
+    'Encoded result bytes sent to clients (before HTTP compression).',
+    ('tenant', 'format'),
+)
+QUERY_TIMEOUTS = Metrics.counter(
+    'ducklearn_query_timeouts_total',
+    "Queries interrupted for running past their lane's timeout.",
+    ('lane',),
+)
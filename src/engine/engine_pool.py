@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import duckdb
+
+from config.config_duckdb import DuckDBConfig
+
+# Settings DuckDB can change on a running database with `SET`.
+LIVE_SETTINGS: frozenset[str] = frozenset(
+    {
+        'memory_limit',
+        'threads',
+        'default_null_order',
+        'enable_progress_bar',
+        # DuckDB refuses a new temp_directory once the old one was used.
+        'temp_directory',
+        'max_temp_directory_size',
+    }
+)
+# Settings that pick a different database file or open mode.
+REOPEN_SETTINGS: frozenset[str] = frozenset(
+    {'db_type', 'db_path', 'access_mode', 'read_only'}
+)
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled cursor becomes free within the timeout."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when acquiring from a pool that has been closed."""
+
+
+class DrainTimeoutError(TimeoutError):
+    """Raised when in-flight queries don't finish before a reconnect."""
+
+
+class ConnectionPool:
+    """Owns one DuckDB database and a bounded pool of cursors on it."""
+
+    def __init__(
+        self,
+        config: DuckDBConfig,
+        size: int | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        """Open the database and apply the configured settings once."""
+        self.config: DuckDBConfig = config
+        self.uri: str = config.connection_uri
+        self.size: int = max(1, size or config.threads)
+        self.timeout: float = timeout
+
+        self._database: duckdb.DuckDBPyConnection = duckdb.connect(
+            self.uri, config=config.database_settings()
+        )
+        # Idle cursors, most recently released last; guarded by `_lock`.
+        self._idle: list[duckdb.DuckDBPyConnection] = []
+        self._created: int = 0
+        self._busy: set[duckdb.DuckDBPyConnection] = set()
+        self._lock = threading.Lock()
+        self._idle_cond = threading.Condition(self._lock)
+        self._closed: bool = False
+        self._draining: bool = False
+        # Bumped on every live change; stale cursors re-apply on acquire.
+        self._generation: int = 0
+        self._cursor_generation: dict[int, int] = {}
+        # Extra cursor for EXPLAIN, outside the bound; see `planner`.
+        self._planner: duckdb.DuckDBPyConnection | None = None
+        self._planner_lock = threading.Lock()
+
+    # --- Cursor lifecycle ---
+    def _apply_cursor_settings(
+        self, cursor: duckdb.DuckDBPyConnection
+    ) -> None:
+        """Apply connection-local settings and mark the cursor current."""
+        for key, value in self.config.cursor_settings().items():
+            cursor.execute(f'SET {key} = {_sql_literal(value)}')
+        self._cursor_generation[id(cursor)] = self._generation
+
+    def _new_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Create a cursor and apply connection-local settings to it."""
+        cursor = self._database.cursor()
+        self._apply_cursor_settings(cursor)
+        return cursor
+
+    def acquire(
+        self, timeout: float | None = None
+    ) -> duckdb.DuckDBPyConnection:
+        """Take a cursor from the pool, creating one if under the bound.
+
+        Otherwise wait until a cursor is released, or one is discarded
+        (or the bound raised) so that a new one may be created.
+        """
+        wait = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + wait
+        cursor: duckdb.DuckDBPyConnection | None = None
+        with self._idle_cond:
+            while True:
+                if self._closed or self._draining:
+                    raise PoolClosedError(f'Pool for {self.uri!r} is closed')
+                if self._idle:
+                    cursor = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f'No DuckDB cursor free within {wait}s '
+                        f'(pool size {self.size})'
+                    )
+                self._idle_cond.wait(remaining)
+
+        if cursor is None:
+            try:
+                cursor = self._new_cursor()
+            except Exception:
+                with self._idle_cond:
+                    self._created -= 1
+                    self._idle_cond.notify()
+                raise
+
+        if self._cursor_generation.get(id(cursor)) != self._generation:
+            self._apply_cursor_settings(cursor)
+        with self._lock:
+            self._busy.add(cursor)
+        return cursor
+
+    def release(
+        self, cursor: duckdb.DuckDBPyConnection, *, discard: bool = False
+    ) -> None:
+        """Return a cursor to the pool, or drop it if `discard` is set."""
+        with self._lock:
+            self._busy.discard(cursor)
+            # Shrink lazily when `threads` (and so `size`) was lowered.
+            drop = (
+                discard
+                or self._closed
+                or self._draining
+                or self._created > self.size
+            )
+            if drop:
+                self._created -= 1
+                self._cursor_generation.pop(id(cursor), None)
+            else:
+                self._idle.append(cursor)
+            self._idle_cond.notify_all()
+        if drop:
+            cursor.close()
+
+    @contextmanager
+    def cursor(
+        self, timeout: float | None = None
+    ) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Context manager that acquires and releases a pooled cursor."""
+        cursor = self.acquire(timeout)
+        discard = False
+        try:
+            yield cursor
+        except duckdb.FatalException:
+            discard = True
+            raise
+        finally:
+            self.release(cursor, discard=discard)
+
+    @contextmanager
+    def planner(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """A cursor outside the pool's bound, for planning (EXPLAIN) only.
+
+        It never waits for a pooled cursor, so queries can be costed
+        while every pooled cursor is busy. Callers are serialized.
+        """
+        if self._closed:
+            raise PoolClosedError(f'Pool for {self.uri!r} is closed')
+        with self._planner_lock:
+            if self._planner is None:
+                self._planner = self._database.cursor()
+            yield self._planner
+
+    # --- Reconfiguration ---
+    def apply_live(self, changes: dict) -> None:
+        """Push `LIVE_SETTINGS` changes to the running database.
+
+        Database-wide settings are changed with `SET GLOBAL` right away;
+        connection-local ones are re-applied to each cursor on its next
+        acquire, so queries already running are left untouched.
+        """
+        database_keys = self.config.database_settings().keys()
+        for key, value in changes.items():
+            if key not in LIVE_SETTINGS:
+                raise ValueError(f'{key!r} cannot be changed live')
+            if key in database_keys:
+                self._database.execute(
+                    f'SET GLOBAL {key} = {_sql_literal(value)}'
+                )
+            setattr(self.config, key, value)
+        if 'threads' in changes:
+            with self._idle_cond:
+                self.size = max(1, self.config.threads)
+                # Waiters may now create the cursors a larger bound allows.
+                self._idle_cond.notify_all()
+        self._generation += 1
+
+    def drain(self, timeout: float = 30.0) -> None:
+        """Stop handing out cursors and wait for in-flight ones to return.
+
+        Queries still running after `timeout` are interrupted; if they
+        are not released shortly afterwards `DrainTimeoutError` is raised
+        and the pool is left usable.
+        """
+        deadline = time.monotonic() + timeout
+        with self._idle_cond:
+            self._draining = True
+            self._idle_cond.notify_all()  # waiters retry elsewhere
+            while self._busy and time.monotonic() < deadline:
+                self._idle_cond.wait(deadline - time.monotonic())
+            if self._busy:
+                for cursor in self._busy:
+                    cursor.interrupt()
+                self._idle_cond.wait_for(lambda: not self._busy, 1.0)
+            if self._busy:
+                self._draining = False
+                raise DrainTimeoutError(
+                    f'{len(self._busy)} queries still running on '
+                    f'{self.uri!r} after {timeout}s'
+                )
+
+    # --- Introspection ---
+    @property
+    def in_use(self) -> int:
+        """Number of cursors currently handed out."""
+        return len(self._busy)
+
+    @property
+    def created(self) -> int:
+        """Number of cursors currently open (idle or in use)."""
+        return self._created
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed."""
+        return self._closed
+
+    def close(self) -> None:
+        """Close idle cursors and the underlying database."""
+        with self._idle_cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._idle_cond.notify_all()
+        for cursor in idle:
+            cursor.close()
+        with self._planner_lock:
+            if self._planner is not None:
+                self._planner.close()
+                self._planner = None
+        self._database.close()
+
+
+class ConnectionManager:
+    """Keeps one `ConnectionPool` per DuckDB `connection_uri`."""
+
+    def __init__(self, config: DuckDBConfig | None = None) -> None:
+        """Store the active config; pools are opened on first use.
+
+        Without `config`, the auto-tuned default (which probes RAM, CPUs
+        and cgroups) is only derived when `config` is first read.
+        """
+        self._config: DuckDBConfig | None = config
+        self._config_lock = threading.Lock()
+        self._pools: dict[str, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> DuckDBConfig:
+        """The active config."""
+        if self._config is None:
+            with self._config_lock:
+                if self._config is None:
+                    self._config = DuckDBConfig()
+        return self._config
+
+    @config.setter
+    def config(self, value: DuckDBConfig) -> None:
+        self._config = value
+
+    def pool(self, config: DuckDBConfig | None = None) -> ConnectionPool:
+        """Return the pool for `config` (default: active), opening it once."""
+        with self._lock:
+            cfg = config or self.config
+            uri = cfg.connection_uri
+            pool = self._pools.get(uri)
+            if pool is None or pool.closed:
+                pool = ConnectionPool(cfg)
+                self._pools[uri] = pool
+            return pool
+
+    def acquire(
+        self, timeout: float | None = None
+    ) -> tuple[ConnectionPool, duckdb.DuckDBPyConnection]:
+        """Acquire a cursor from the active pool; returns both.
+
+        While a reconnect is in progress the manager lock is held, so
+        callers wait here and then pick up the freshly opened pool.
+        """
+        while True:
+            pool = self.pool()
+            try:
+                return pool, pool.acquire(timeout)
+            except PoolClosedError:
+                continue
+
+    @contextmanager
+    def cursor(
+        self, timeout: float | None = None
+    ) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Context manager around `acquire` that releases the cursor."""
+        pool, cursor = self.acquire(timeout)
+        discard = False
+        try:
+            yield cursor
+        except duckdb.FatalException:
+            discard = True
+            raise
+        finally:
+            pool.release(cursor, discard=discard)
+
+    @contextmanager
+    def planner(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """The active pool's planning cursor (see `ConnectionPool.planner`)."""
+        with self.pool().planner() as cursor:
+            yield cursor
+
+    def reconfigure(
+        self, new_values: dict, drain_timeout: float = 30.0
+    ) -> dict[str, list[str]]:
+        """Apply changed settings to the active config and its database.
+
+        Keys in `LIVE_SETTINGS` are pushed to the running database with
+        `SET`. Keys in `REOPEN_SETTINGS` trigger a controlled reconnect:
+        new requests wait, in-flight queries are drained, the old
+        database is closed and the new one opened. Unknown keys are
+        ignored; invalid values raise pydantic's `ValidationError` (a
+        `ValueError`) before anything is applied. Returns which changed
+        keys were applied live and which were applied by reopening.
+        """
+        current = self.config.to_dict()
+        # Validate everything before touching the database; fields are
+        # assigned in declaration order so db_type precedes db_path.
+        candidate = self.config.model_copy()
+        for key in current:
+            if key in new_values:
+                setattr(candidate, key, new_values[key])
+        changes = {
+            key: value
+            for key, value in candidate.to_dict().items()
+            if current[key] != value
+        }
+        live = {k: v for k, v in changes.items() if k in LIVE_SETTINGS}
+        reopen = {k: v for k, v in changes.items() if k in REOPEN_SETTINGS}
+
+        if reopen:
+            self._reopen({**current, **changes}, drain_timeout)
+            return {'live': [], 'reopened': sorted(changes)}
+        if live:
+            with self._lock:
+                pool = self._pools.get(self.config.connection_uri)
+            if pool is not None and not pool.closed:
+                pool.apply_live(live)
+            else:
+                for key, value in live.items():
+                    setattr(self.config, key, value)
+
+        return {'live': sorted(live), 'reopened': sorted(reopen)}
+
+    def _reopen(self, settings: dict, drain_timeout: float) -> None:
+        """Swap the active config, draining and closing its old pool."""
+        candidate = DuckDBConfig(**settings)
+        candidate.connection_uri  # noqa: B018 — validate before draining
+        with self._lock:
+            old = self._pools.get(self.config.connection_uri)
+            if old is not None and not old.closed:
+                old.drain(drain_timeout)
+                old.close()
+                del self._pools[old.uri]
+            previous = self.config
+            self.config = candidate
+            try:
+                self._pools[candidate.connection_uri] = ConnectionPool(
+                    candidate
+                )
+            except Exception:
+                # Keep serving with the previous settings.
+                self.config = previous
+                raise
+
+    @property
+    def pools(self) -> dict[str, ConnectionPool]:
+        """Return a snapshot of the open pools keyed by URI."""
+        with self._lock:
+            return dict(self._pools)
+
+    def close_all(self) -> None:
+        """Close every pool; safe to call more than once."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+def _sql_literal(value: object) -> str:
+    """Render a Python setting value as a SQL literal for `SET`."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int | float):
+        return str(value)
+    text = str(value).replace("'", "''")
+    return f"'{text}'"
+
+
+def get_cursor() -> Iterator[duckdb.DuckDBPyConnection]:
+    """FastAPI dependency yielding a pooled cursor for one request."""
+    with Engine.cursor() as cursor:
+        yield cursor
+
+
+# --- Global instance (optional) ---
+Engine: ConnectionManager = ConnectionManager()
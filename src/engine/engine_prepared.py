@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import math
+import threading
+import uuid
+import weakref
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+
+import duckdb
+import pyarrow as pa
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from engine.engine_cache import QueryShape, analyze_sql
+from engine.engine_pool import ConnectionManager, Engine
+from engine.engine_scheduler import check_allowed
+
+# Arrow table registered on the cursor while a bulk insert runs.
+_BULK_RELATION = '__ducklearn_bulk_params'
+
+
+class StatementNotFoundError(KeyError):
+    """Raised for an unknown prepared statement id."""
+
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    """A parameterized statement parsed once and prepared per cursor."""
+
+    id: str
+    sql: str
+    param_count: int
+    shape: QueryShape
+    # `INSERT ... SELECT` over a registered Arrow batch of parameters,
+    # set when the statement is a single-row `INSERT ... VALUES (?, ...)`.
+    bulk_sql: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'sql': self.sql,
+            'param_count': self.param_count,
+            'bulk_insert': self.bulk_sql is not None,
+        }
+
+
+def _param_columns(count: int) -> list[str]:
+    return [f'p{i}' for i in range(1, count + 1)]
+
+
+def _count_params(tree: exp.Expr) -> int:
+    """Count positional parameters (`?` or `$n`); reject named ones."""
+    anonymous = 0
+    numbered: set[int] = set()
+    for node in tree.find_all(exp.Placeholder):
+        if node.this is None:
+            anonymous += 1
+        elif str(node.this).isdigit():
+            numbered.add(int(node.this))
+        else:
+            raise ValueError(
+                f'Named parameter ${node.this} is not supported; '
+                'use ? or $1, $2, ...'
+            )
+    if anonymous and numbered:
+        raise ValueError('Cannot mix ? and $n parameters')
+    return anonymous or max(numbered, default=0)
+
+
+def _bulk_insert_sql(tree: exp.Expr, param_count: int) -> str | None:
+    """Rewrite `INSERT ... VALUES (<params>)` to read an Arrow batch."""
+    if not isinstance(tree, exp.Insert) or param_count == 0:
+        return None
+    values = tree.expression
+    if not isinstance(values, exp.Values) or len(values.expressions) != 1:
+        return None
+    row = values.expressions[0]
+    if any(p.find(exp.Subquery, exp.Select) for p in row.expressions):
+        return None
+
+    columns = _param_columns(param_count)
+    anonymous = iter(columns)
+
+    def to_column(node: exp.Expr) -> exp.Expr:
+        if isinstance(node, exp.Placeholder):
+            name = next(anonymous) if node.this is None else f'p{node.this}'
+            return exp.column(name)
+        return node
+
+    projections = [p.copy().transform(to_column) for p in row.expressions]
+    select = exp.select(*projections).from_(_BULK_RELATION)
+    rewritten = tree.copy()
+    rewritten.set('expression', select)
+    return rewritten.sql(dialect='duckdb')
+
+
+def sql_literal(value: object) -> str:
+    """Render a bound parameter as a DuckDB SQL literal.
+
+    `EXECUTE` cannot take `?` parameters itself, so values are rendered
+    here; only the types listed below are accepted and strings are
+    always quoted, so values can never change the statement.
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        if math.isfinite(value):
+            return repr(value)
+        return f"'{value}'::DOUBLE"
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError(f'Cannot bind non-finite decimal {value}')
+        return str(value)
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    if isinstance(value, bytes | bytearray | memoryview):
+        hex_bytes = ''.join(f'\\x{b:02X}' for b in bytes(value))
+        return f"'{hex_bytes}'::BLOB"
+    if isinstance(value, uuid.UUID):
+        return f"'{value}'::UUID"
+    if isinstance(value, dt.datetime):
+        kind = 'TIMESTAMPTZ' if value.tzinfo else 'TIMESTAMP'
+        return f"'{value.isoformat(sep=' ')}'::{kind}"
+    if isinstance(value, dt.date):
+        return f"'{value.isoformat()}'::DATE"
+    if isinstance(value, dt.time):
+        return f"'{value.isoformat()}'::TIME"
+    raise TypeError(f'Cannot bind parameter of type {type(value).__name__}')
+
+
+def _params_table(
+    statement: PreparedStatement, rows: list[tuple[object, ...]]
+) -> pa.Table | None:
+    """Column-wise Arrow table of parameter sets, if bulk-insertable."""
+    if statement.bulk_sql is None:
+        return None
+    columns = zip(*rows, strict=True)
+    try:
+        return pa.table(
+            {
+                name: pa.array(values)
+                for name, values in zip(
+                    _param_columns(statement.param_count), columns, strict=True
+                )
+            }
+        )
+    except (pa.ArrowException, TypeError):
+        # Mixed or unsupported types: fall back to per-row EXECUTE.
+        return None
+
+
+class StatementRegistry:
+    """Registry of parameterized statements prepared lazily per cursor.
+
+    `register` parses the SQL once and returns a stable id (a hash of
+    the SQL). The first time a pooled cursor runs the statement it is
+    `PREPARE`d on that cursor; later runs only `EXECUTE` it.
+    """
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        """Bind to the connection manager whose cursors run statements."""
+        self.manager: ConnectionManager = manager
+        self._statements: dict[str, PreparedStatement] = {}
+        self._prepared: weakref.WeakKeyDictionary[
+            duckdb.DuckDBPyConnection, set[str]
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    # --- Registration ---
+    def register(self, sql: str) -> PreparedStatement:
+        """Parse `sql` once and return its prepared statement handle."""
+        try:
+            statements = sqlglot.parse(sql, dialect='duckdb')
+        except SqlglotError as exc:
+            raise ValueError(f'Cannot parse statement: {exc}') from exc
+        if len(statements) != 1 or statements[0] is None:
+            raise ValueError('Exactly one SQL statement is required')
+
+        tree = statements[0]
+        param_count = _count_params(tree)
+        digest = hashlib.sha256(sql.strip().encode()).hexdigest()[:16]
+        statement = PreparedStatement(
+            id=f's_{digest}',
+            sql=sql.strip().rstrip(';'),
+            param_count=param_count,
+            shape=analyze_sql(sql),
+            bulk_sql=_bulk_insert_sql(tree, param_count),
+        )
+        with self._lock:
+            return self._statements.setdefault(statement.id, statement)
+
+    def get(self, statement_id: str) -> PreparedStatement:
+        """Return a registered statement or raise StatementNotFoundError."""
+        try:
+            return self._statements[statement_id]
+        except KeyError:
+            raise StatementNotFoundError(statement_id) from None
+
+    def forget(self, statement_id: str) -> None:
+        """Drop a statement; cursors keep their copy until they close."""
+        with self._lock:
+            self._statements.pop(statement_id, None)
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    # --- Execution ---
+    def _ensure_prepared(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        statement: PreparedStatement,
+    ) -> None:
+        with self._lock:
+            prepared = self._prepared.setdefault(cursor, set())
+        if statement.id not in prepared:
+            check_allowed(cursor, statement.sql)
+            cursor.execute(f'PREPARE {statement.id} AS {statement.sql}')
+            prepared.add(statement.id)
+
+    def _check_params(
+        self, statement: PreparedStatement, params: Sequence[object]
+    ) -> None:
+        if len(params) != statement.param_count:
+            raise ValueError(
+                f'Statement {statement.id} takes {statement.param_count} '
+                f'parameters, got {len(params)}'
+            )
+
+    def execute(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        statement_id: str,
+        params: Sequence[object] = (),
+    ) -> duckdb.DuckDBPyConnection:
+        """Run the statement once; the result stays pending on `cursor`."""
+        statement = self.get(statement_id)
+        self._check_params(statement, params)
+        self._ensure_prepared(cursor, statement)
+        if not params:
+            return cursor.execute(f'EXECUTE {statement.id}')
+        args = ', '.join(sql_literal(value) for value in params)
+        return cursor.execute(f'EXECUTE {statement.id}({args})')
+
+    def execute_many(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        statement_id: str,
+        batches: Iterable[Sequence[object]],
+    ) -> int:
+        """Run the statement for every parameter set in one transaction.
+
+        Single-row `INSERT ... VALUES` statements bind the whole batch as
+        one Arrow table and insert it set-wise; anything else executes
+        the prepared statement once per parameter set. Returns the
+        number of parameter sets applied.
+        """
+        statement = self.get(statement_id)
+        rows = [tuple(params) for params in batches]
+        for params in rows:
+            self._check_params(statement, params)
+        if not rows:
+            return 0
+
+        cursor.execute('BEGIN TRANSACTION')
+        try:
+            batch = _params_table(statement, rows)
+            if batch is not None and statement.bulk_sql is not None:
+                cursor.register(_BULK_RELATION, batch)
+                try:
+                    cursor.execute(statement.bulk_sql)
+                finally:
+                    cursor.unregister(_BULK_RELATION)
+            else:
+                for params in rows:
+                    self.execute(cursor, statement_id, params)
+            cursor.execute('COMMIT')
+        except BaseException:
+            try:
+                cursor.execute('ROLLBACK')
+            except duckdb.Error:
+                pass  # Keep the error that caused the rollback.
+            raise
+        return len(rows)
+
+
+# --- Global instance (optional) ---
+Statements: StatementRegistry = StatementRegistry(Engine)
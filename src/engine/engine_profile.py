@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import copy
+import heapq
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from typing import Any, Literal
+
+import duckdb
+from sqlglot import exp
+
+from engine.engine_ingest import quote_table
+from engine.engine_pool import ConnectionManager, Engine
+
+# Quantiles reported for numeric and temporal columns.
+QUANTILES: tuple[float, ...] = (0.25, 0.5, 0.75)
+# Smallest hashes kept per column (KMV sketch for distinct counts).
+DISTINCT_SKETCH_SIZE = 1024
+# Rows kept per column in the bottom-k sample used for merged quantiles.
+QUANTILE_SAMPLE_SIZE = 1024
+# Alias of the profiled table, whose rows are hashed for the checksum.
+_ROW = 'profiled_row'
+# XOR of every row's hash (with its rowid), so in-place UPDATEs are seen.
+_CHECKSUM = f'bit_xor(hash({_ROW}, rowid))'
+
+_NUMERIC_TYPES = frozenset(
+    {
+        'TINYINT',
+        'SMALLINT',
+        'INTEGER',
+        'BIGINT',
+        'HUGEINT',
+        'UTINYINT',
+        'USMALLINT',
+        'UINTEGER',
+        'UBIGINT',
+        'UHUGEINT',
+        'FLOAT',
+        'DOUBLE',
+        'DECIMAL',
+    }
+)
+_TEMPORAL_TYPES = frozenset(
+    {
+        'DATE',
+        'TIME',
+        'TIMESTAMP',
+        'TIMESTAMP WITH TIME ZONE',
+        'TIMESTAMP_S',
+        'TIMESTAMP_MS',
+        'TIMESTAMP_NS',
+        'TIME WITH TIME ZONE',
+    }
+)
+_HASH_SPACE = 2**64
+
+ColumnKind = Literal['numeric', 'temporal', 'scalar', 'nested']
+RefreshMode = Literal['full', 'incremental', 'cached']
+
+
+def column_kind(type_name: str) -> ColumnKind:
+    """Classify a DuckDB type by which statistics apply to it."""
+    upper = type_name.upper()
+    if upper.split('(')[0] in _NUMERIC_TYPES:
+        return 'numeric'
+    if upper in _TEMPORAL_TYPES:
+        return 'temporal'
+    if any(mark in upper for mark in ('[', 'STRUCT', 'MAP', 'UNION')):
+        return 'nested'
+    return 'scalar'
+
+
+def _quote(name: str) -> str:
+    return exp.to_identifier(name, quoted=True).sql(dialect='duckdb')
+
+
+def _kmv_estimate(hashes: list[int]) -> int:
+    """Distinct count from the k smallest distinct hashes (KMV)."""
+    if len(hashes) < DISTINCT_SKETCH_SIZE:
+        return len(hashes)
+    kth = hashes[DISTINCT_SKETCH_SIZE - 1]
+    return round((DISTINCT_SKETCH_SIZE - 1) * _HASH_SPACE / (kth + 1))
+
+
+def _xor(left: int | None, right: int | None) -> int | None:
+    """Combine `bit_xor` checksums, where NULL means no rows."""
+    if left is None or right is None:
+        return right if left is None else left
+    return left ^ right
+
+
+def _sample_quantiles(values: list) -> dict[str, object]:
+    """Nearest-rank quantiles of a (sorted) uniform sample."""
+    if not values:
+        return {str(q): None for q in QUANTILES}
+    last = len(values) - 1
+    return {str(q): values[round(q * last)] for q in QUANTILES}
+
+
+@dataclass
+class ColumnProfile:
+    """Summary statistics of one column, plus its mergeable sketches."""
+
+    name: str
+    type: str
+    kind: ColumnKind
+    count: int = 0
+    nulls: int = 0
+    min: Any = None
+    max: Any = None
+    mean: float | None = None
+    variance: float | None = None
+    distinct: int | None = None
+    quantiles: dict[str, object] | None = None
+    # Mergeable state: sum of squared deviations, sorted smallest
+    # distinct hashes, and (priority, value) bottom-k sample.
+    m2: float = field(default=0.0, repr=False)
+    hashes: list[int] = field(default_factory=list, repr=False)
+    sample: list[tuple[float, object]] = field(
+        default_factory=list, repr=False
+    )
+
+    def merge(self, other: ColumnProfile) -> None:
+        """Fold in the profile of appended rows, without rescanning."""
+        if self.kind == 'numeric' and other.mean is not None:
+            total = self.count + other.count
+            if self.mean is not None:
+                delta = other.mean - self.mean
+                shift = delta**2 * self.count * other.count / total
+                self.m2 += other.m2 + shift
+                self.mean += delta * other.count / total
+            else:
+                self.mean, self.m2 = other.mean, other.m2
+            self.variance = self.m2 / total
+        self.nulls += other.nulls
+        if self.kind == 'nested':
+            self.count += other.count
+            return
+        if other.count and self.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        elif other.count:
+            self.min, self.max = other.min, other.max
+        self.count += other.count
+
+        self.hashes = heapq.nsmallest(
+            DISTINCT_SKETCH_SIZE, set(self.hashes) | set(other.hashes)
+        )
+        self.distinct = _kmv_estimate(self.hashes)
+        if self.kind in ('numeric', 'temporal'):
+            self.sample = heapq.nsmallest(
+                QUANTILE_SAMPLE_SIZE, self.sample + other.sample
+            )
+            self.quantiles = _sample_quantiles(
+                sorted(value for _, value in self.sample)
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'type': self.type,
+            'count': self.count,
+            'nulls': self.nulls,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'variance': self.variance,
+            'distinct': self.distinct,
+            'quantiles': self.quantiles,
+        }
+
+
+@dataclass
+class TableProfile:
+    """Per-column profile of a table as of its last refresh."""
+
+    table: str
+    rows: int
+    columns: list[ColumnProfile]
+    max_rowid: int | None
+    checksum: int | None = None
+    refresh: RefreshMode = 'full'
+    seconds: float = 0.0
+
+    @property
+    def schema(self) -> list[tuple[str, str]]:
+        return [(c.name, c.type) for c in self.columns]
+
+    def to_dict(self) -> dict:
+        return {
+            'table': self.table,
+            'rows': self.rows,
+            'refresh': self.refresh,
+            'seconds': self.seconds,
+            'columns': [c.to_dict() for c in self.columns],
+        }
+
+
+def profile_sql(
+    target: str, schema: list[tuple[str, str]], after_rowid: int | None
+) -> str:
+    """One fused aggregate computing every column's statistics.
+
+    Rendered as plain SQL since wide tables need several aggregates per
+    column. With `after_rowid`, only rows appended after it are read.
+    """
+    parts = [
+        'count(*) AS "rows"',
+        'max(rowid) AS "max_rowid"',
+        f'{_CHECKSUM} AS "checksum"',
+    ]
+    quantiles = ', '.join(str(q) for q in QUANTILES)
+    for i, (name, type_name) in enumerate(schema):
+        col = _quote(name)
+        kind = column_kind(type_name)
+        not_null = f'FILTER (WHERE {col} IS NOT NULL)'
+        parts.append(f'count({col}) AS c{i}_count')
+        if kind == 'nested':
+            continue
+        parts += [
+            f'min({col}) AS c{i}_min',
+            f'max({col}) AS c{i}_max',
+            f'min(DISTINCT hash({col}), {DISTINCT_SKETCH_SIZE}) {not_null} '
+            f'AS c{i}_hashes',
+        ]
+        value = f'{col}::DOUBLE' if kind == 'numeric' else col
+        if kind == 'numeric':
+            parts += [
+                f'avg({value}) AS c{i}_mean',
+                f'var_pop({value}) AS c{i}_variance',
+            ]
+        if kind in ('numeric', 'temporal'):
+            parts += [
+                f'approx_quantile({value}, [{quantiles}]) AS c{i}_quantiles',
+                f'min(struct_pack(p := random(), v := {value}), '
+                f'{QUANTILE_SAMPLE_SIZE}) {not_null} AS c{i}_sample',
+            ]
+    where = ''
+    if after_rowid is not None:
+        where = f' WHERE rowid > {int(after_rowid)}'
+    return f'SELECT {", ".join(parts)} FROM {target} AS {_ROW}{where}'
+
+
+def _column_from_row(
+    index: int, name: str, type_name: str, row: dict, rows: int
+) -> ColumnProfile:
+    kind = column_kind(type_name)
+    count = row[f'c{index}_count']
+    column = ColumnProfile(
+        name=name, type=type_name, kind=kind, count=count, nulls=rows - count
+    )
+    if kind == 'nested':
+        return column
+    column.min = row[f'c{index}_min']
+    column.max = row[f'c{index}_max']
+    # KMV for full scans too, so merges don't change the estimator.
+    column.hashes = sorted(row[f'c{index}_hashes'] or [])
+    column.distinct = _kmv_estimate(column.hashes)
+    if kind == 'numeric':
+        column.mean = row[f'c{index}_mean']
+        column.variance = row[f'c{index}_variance']
+        column.m2 = (column.variance or 0.0) * count
+    if kind in ('numeric', 'temporal'):
+        values = row[f'c{index}_quantiles'] or [None] * len(QUANTILES)
+        column.quantiles = {
+            str(q): value for q, value in zip(QUANTILES, values, strict=True)
+        }
+        column.sample = [
+            (item['p'], item['v']) for item in row[f'c{index}_sample'] or []
+        ]
+    return column
+
+
+class Profiler:
+    """Profiles tables with one fused aggregate and keeps results.
+
+    A repeat `profile` call first checks the table's row count, highest
+    rowid and a checksum of its row hashes. Unchanged tables are served
+    from memory; when the rows already profiled are intact and others
+    were appended, just the new rows are aggregated and merged into the
+    cached sketches (moments exactly, distinct counts via KMV and
+    quantiles via a bottom-k sample). Anything else triggers a rescan.
+    """
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        """Bind to the connection manager whose tables are profiled."""
+        self.manager: ConnectionManager = manager
+        self._profiles: dict[tuple[str, str], TableProfile] = {}
+        self._lock = threading.Lock()
+
+    def _scan(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        table: str,
+        schema: list[tuple[str, str]],
+        after_rowid: int | None = None,
+    ) -> TableProfile:
+        sql = profile_sql(quote_table(table), schema, after_rowid)
+        result = cursor.execute(sql)
+        names = [col[0] for col in result.description]
+        (values,) = result.fetchall()
+        row = dict(zip(names, values, strict=True))
+        rows = row['rows']
+        return TableProfile(
+            table=table,
+            rows=rows,
+            columns=[
+                _column_from_row(i, name, type_name, row, rows)
+                for i, (name, type_name) in enumerate(schema)
+            ],
+            max_rowid=row['max_rowid'],
+            checksum=row['checksum'],
+        )
+
+    def profile(
+        self,
+        table: str,
+        *,
+        force: bool = False,
+        cursor: duckdb.DuckDBPyConnection | None = None,
+    ) -> TableProfile:
+        """Profile `table`, reusing or incrementally updating the cache.
+
+        Runs on `cursor` when given (one of the manager's), else on a
+        cursor checked out for the call.
+        """
+        target = quote_table(table)
+        key = (self.manager.config.connection_uri, table.lower())
+        started = time.perf_counter()
+        with self._lock:
+            cached = None if force else self._profiles.get(key)
+
+        checkout = (
+            self.manager.cursor() if cursor is None else nullcontext(cursor)
+        )
+        with checkout as cursor:
+            schema = [
+                (row[0], row[1])
+                for row in cursor.execute(f'DESCRIBE {target}').fetchall()
+            ]
+            if cached is None or cached.schema != schema:
+                result = self._scan(cursor, table, schema)
+            else:
+                result = self._refresh(cursor, cached)
+
+        result.seconds = time.perf_counter() - started
+        with self._lock:
+            self._profiles[key] = result
+        return result
+
+    def _refresh(
+        self, cursor: duckdb.DuckDBPyConnection, cached: TableProfile
+    ) -> TableProfile:
+        """Serve, extend or redo `cached`, whichever the table needs."""
+        # Rows up to the cached max_rowid, to tell appends from rewrites.
+        before = int(cached.max_rowid) if cached.max_rowid is not None else -1
+        [(rows, max_rowid, checksum, kept_rows, kept_checksum)] = (
+            cursor.execute(
+                f'SELECT count(*), max(rowid), {_CHECKSUM}, '
+                f'count(*) FILTER (WHERE rowid <= {before}), '
+                f'{_CHECKSUM} FILTER (WHERE rowid <= {before}) '
+                f'FROM {quote_table(cached.table)} AS {_ROW}'
+            ).fetchall()
+        )
+        if (
+            rows == cached.rows
+            and max_rowid == cached.max_rowid
+            and checksum == cached.checksum
+        ):
+            return replace(cached, refresh='cached')
+        if (
+            cached.max_rowid is not None
+            and max_rowid is not None
+            and max_rowid > cached.max_rowid
+            and kept_rows == cached.rows
+            and kept_checksum == cached.checksum
+        ):
+            added = self._scan(cursor, cached.table, cached.schema, before)
+            merged = self._merge(cached, added)
+            # Rows that changed while the appended ones were scanned
+            # leave the checksums apart: rescan rather than mix them.
+            if (merged.rows, merged.checksum) == (rows, checksum):
+                return merged
+        return self._scan(cursor, cached.table, cached.schema)
+
+    @staticmethod
+    def _merge(cached: TableProfile, added: TableProfile) -> TableProfile:
+        # Merge into a copy: callers may still hold the cached profile.
+        merged = TableProfile(
+            table=cached.table,
+            rows=cached.rows + added.rows,
+            columns=copy.deepcopy(cached.columns),
+            max_rowid=added.max_rowid,
+            checksum=_xor(cached.checksum, added.checksum),
+            refresh='incremental',
+        )
+        for column, extra in zip(merged.columns, added.columns, strict=True):
+            column.merge(extra)
+        return merged
+
+    def forget(self, table: str | None = None) -> None:
+        """Drop cached profiles of `table` (all tables if None)."""
+        with self._lock:
+            if table is None:
+                self._profiles.clear()
+                return
+            for key in [k for k in self._profiles if k[1] == table.lower()]:
+                del self._profiles[key]
+
+
+# --- Global instance (optional) ---
+Profiles: Profiler = Profiler(Engine)
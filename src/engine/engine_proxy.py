@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable, MutableMapping
+from typing import Any
+
+import httpx
+import orjson
+
+from engine.engine_scheduler import ADDRESS_HEADER
+
+# Requests that may touch a database, so only the writer can serve them.
+PROXIED_PREFIXES = ('/api/', '/t/')
+# Per-connection headers, never forwarded (RFC 9110, section 7.6.1).
+HOP_BY_HOP = frozenset(
+    {
+        b'connection',
+        b'keep-alive',
+        b'proxy-connection',
+        b'te',
+        b'trailer',
+        b'transfer-encoding',
+        b'upgrade',
+    }
+)
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable, Callable], Awaitable[None]]
+
+
+def _forwarded(headers: Any) -> list[tuple[bytes, bytes]]:
+    return [(k, v) for k, v in headers if k.lower() not in HOP_BY_HOP]
+
+
+def _with_address(
+    headers: list[tuple[bytes, bytes]], client: tuple[str, int] | None
+) -> list[tuple[bytes, bytes]]:
+    """`headers` with `ADDRESS_HEADER` set to the client's host.
+
+    Any value sent by the client itself is dropped, so the writer can
+    trust the header.
+    """
+    name = ADDRESS_HEADER.lower().encode()
+    headers = [(k, v) for k, v in headers if k.lower() != name]
+    if client is not None:
+        headers.append((name, client[0].encode('latin-1')))
+    return headers
+
+
+class WriterProxy:
+    """Forwards database requests to the writer process.
+
+    With a read-write persistent database and several workers (see
+    `config.config_serve`), only the writer may open the file. Requests
+    under `PROXIED_PREFIXES` are streamed to it over its Unix socket,
+    both ways, so uploads and Arrow results are never buffered here;
+    everything else (the frontend, `/metrics`) is served locally. The
+    client's address travels in `ADDRESS_HEADER`, for per-client limits.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        socket: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """Forward to the writer on `socket` (or through `transport`)."""
+        self.app: ASGIApp = app
+        self._transport = transport or httpx.AsyncHTTPTransport(uds=socket)
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                base_url='http://writer',
+                timeout=None,
+            )
+        return self._client
+
+    async def __call__(
+        self, scope: Scope, receive: Callable, send: Callable
+    ) -> None:
+        if scope['type'] != 'http' or not scope['path'].startswith(
+            PROXIED_PREFIXES
+        ):
+            await self.app(scope, receive, send)
+            return
+        await self._forward(scope, receive, send)
+
+    async def _forward(
+        self, scope: Scope, receive: Callable, send: Callable
+    ) -> None:
+        async def body() -> AsyncIterator[bytes]:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                yield message.get('body', b'')
+                if not message.get('more_body', False):
+                    return
+
+        target = scope.get('raw_path') or scope['path'].encode()
+        if scope.get('query_string'):
+            target += b'?' + scope['query_string']
+        request = self.client.build_request(
+            scope['method'],
+            target.decode('latin-1'),
+            headers=_with_address(
+                _forwarded(scope['headers']), scope.get('client')
+            ),
+            content=body(),
+        )
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.TransportError as exc:
+            await _error(send, 502, f'Writer process unavailable: {exc}')
+            return
+        try:
+            await send(
+                {
+                    'type': 'http.response.start',
+                    'status': response.status_code,
+                    'headers': _forwarded(response.headers.raw),
+                }
+            )
+            async for chunk in response.aiter_raw():
+                await send(
+                    {
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    }
+                )
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Closing early (client gone) also cancels the writer's work.
+            await response.aclose()
+
+
+async def _error(send: Callable, status: int, detail: str) -> None:
+    body = orjson.dumps({'detail': detail})
+    await send(
+        {
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,450 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Literal
+
+import duckdb
+import orjson
+import sqlglot
+from fastapi import Request
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from config.config_duckdb import parse_memory_size
+from engine.engine_executor import QueueFullError
+from engine.engine_metrics import QUERY_TIMEOUTS
+from engine.engine_pool import ConnectionManager, Engine, PoolTimeoutError
+
+Lane = Literal['interactive', 'batch']
+LANES: tuple[Lane, ...] = ('interactive', 'batch')
+
+# Request header naming the client that per-client limits count against;
+# without it the client's address is used.
+CLIENT_HEADER = 'X-DuckLearn-Client'
+# Address of the client, set by the `WriterProxy` of a serving worker.
+# Only honoured on requests without a peer address (the writer's Unix
+# socket), which only the workers can connect to.
+ADDRESS_HEADER = 'X-DuckLearn-Client-Address'
+# Queries planned to read or produce more rows than this run as batch...
+BATCH_ROWS = 10_000_000
+# ... as do queries with more joins than this.
+BATCH_JOINS = 3
+# Queries one client may have running or waiting at once.
+DEFAULT_CLIENT_LIMIT = 8
+# Share of the memory_limit budgeted to each running batch query.
+BATCH_MEMORY_FRACTION = 0.5
+# Seconds a query may run before it is interrupted (None: no limit).
+DEFAULT_TIMEOUTS: dict[Lane, float | None] = {
+    'interactive': 60.0,
+    'batch': 3600.0,
+}
+# Seconds a query may wait for a slot before giving up.
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+# Plan operators that stop pulling from their input early.
+_LIMIT_OPERATORS = frozenset({'LIMIT', 'STREAMING_LIMIT'})
+# Statements EXPLAIN can plan without running anything.
+_PLANNABLE = frozenset(
+    {
+        duckdb.StatementType.SELECT,
+        duckdb.StatementType.INSERT,
+        duckdb.StatementType.UPDATE,
+        duckdb.StatementType.DELETE,
+        duckdb.StatementType.CREATE,
+        duckdb.StatementType.COPY,
+    }
+)
+# Statements client SQL may not run: they change the settings a tenant's
+# quota is enforced with (SET, RESET, PRAGMA x = ...) or reach past its
+# database. COPY ... TO is refused too; COPY ... FROM is a plain write.
+_RESTRICTED = frozenset(
+    {
+        duckdb.StatementType.SET,
+        duckdb.StatementType.ATTACH,
+        duckdb.StatementType.DETACH,
+        duckdb.StatementType.EXPORT,
+        duckdb.StatementType.COPY_DATABASE,
+    }
+)
+
+
+class ClientLimitError(QueueFullError):
+    """Raised when a client already has its limit of queries; HTTP 429."""
+
+
+class SlotTimeoutError(PoolTimeoutError):
+    """Raised when no query slot frees up within the wait timeout."""
+
+
+class RestrictedStatementError(ValueError):
+    """Raised for client SQL `check_allowed` refuses; HTTP 403."""
+
+
+@dataclass(frozen=True)
+class QueryCost:
+    """What a query is expected to cost and the lane it runs in."""
+
+    lane: Lane
+    estimated_rows: int | None = None
+    joins: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'lane': self.lane,
+            'estimated_rows': self.estimated_rows,
+            'joins': self.joins,
+        }
+
+
+def count_joins(sql: str) -> int:
+    """Number of joins in `sql` per sqlglot (0 if it does not parse)."""
+    try:
+        statements = sqlglot.parse(sql, dialect='duckdb')
+    except SqlglotError:
+        return 0
+    return sum(
+        len(list(statement.find_all(exp.Join)))
+        for statement in statements
+        if statement is not None
+    )
+
+
+def _copies_out(sql: str) -> bool:
+    """Whether a COPY statement writes to a file (True if unsure)."""
+    try:
+        tree = sqlglot.parse_one(sql, dialect='duckdb')
+    except SqlglotError:
+        return True
+    # `kind` is True for COPY ... FROM.
+    return not (isinstance(tree, exp.Copy) and tree.args.get('kind'))
+
+
+def check_allowed(cursor: duckdb.DuckDBPyConnection, sql: str) -> None:
+    """Refuse `sql` if any of its statements is restricted.
+
+    Raises `RestrictedStatementError`; SQL DuckDB can't parse is left to
+    fail when it runs.
+    """
+    try:
+        statements = cursor.extract_statements(sql)
+    except duckdb.Error:
+        return
+    for statement in statements:
+        kind = statement.type
+        if kind in _RESTRICTED or (
+            kind == duckdb.StatementType.COPY and _copies_out(statement.query)
+        ):
+            raise RestrictedStatementError(
+                f'{kind.name} statements are not allowed'
+            )
+
+
+def _cardinality(value: object) -> int:
+    try:
+        return int(str(value).lstrip('~'))
+    except ValueError:
+        return 0
+
+
+def _plan_rows(node: dict) -> int:
+    own = _cardinality(node.get('extra_info', {}).get('Estimated Cardinality'))
+    if node.get('name') in _LIMIT_OPERATORS:
+        return own
+    return max([own, *map(_plan_rows, node.get('children', []))])
+
+
+def estimate_rows(cursor: duckdb.DuckDBPyConnection, sql: str) -> int | None:
+    """Most rows any operator in DuckDB's plan for `sql` expects.
+
+    Taken from `EXPLAIN (FORMAT json)`; inputs of a LIMIT are skipped,
+    as they stop early. None when `sql` is not one plannable statement
+    (scripts are never sent to EXPLAIN) or fails to plan.
+    """
+    try:
+        statements = cursor.extract_statements(sql)
+    except duckdb.Error:
+        return None
+    if len(statements) != 1 or statements[0].type not in _PLANNABLE:
+        return None
+    try:
+        rows = cursor.execute(
+            f'EXPLAIN (FORMAT json) {statements[0].query}'
+        ).fetchall()
+    except duckdb.Error:
+        return None
+    plan = orjson.loads(rows[0][1])
+    return max(map(_plan_rows, plan), default=None)
+
+
+def classify(
+    sql: str,
+    cursor: duckdb.DuckDBPyConnection | None = None,
+    batch_rows: int = BATCH_ROWS,
+    batch_joins: int = BATCH_JOINS,
+) -> QueryCost:
+    """Put `sql` in the batch lane if it is planned to be expensive.
+
+    Joins are counted from the sqlglot parse; with a `cursor`, DuckDB's
+    row estimates are checked too. SQL that can't be costed runs as
+    interactive, as it usually fails fast.
+    """
+    joins = count_joins(sql)
+    rows = estimate_rows(cursor, sql) if cursor is not None else None
+    heavy = joins > batch_joins or (rows is not None and rows > batch_rows)
+    return QueryCost(
+        lane='batch' if heavy else 'interactive',
+        estimated_rows=rows,
+        joins=joins,
+    )
+
+
+def client_id(request: Request) -> str | None:
+    """The client a request counts against: `CLIENT_HEADER` or address."""
+    header = request.headers.get(CLIENT_HEADER)
+    if header:
+        return header
+    if request.client is not None:
+        return request.client.host
+    return request.headers.get(ADDRESS_HEADER) or None
+
+
+class Slot:
+    """A query's place in the scheduler, from waiting until it finishes.
+
+    The lane's timeout starts when the slot is granted. The cursor
+    attached with `watch` is interrupted once it runs out, and
+    `timed_out` is set so the caller can tell it from a disconnect.
+    """
+
+    def __init__(
+        self,
+        scheduler: QueryScheduler,
+        lane: Lane,
+        client: str | None,
+        timeout: float | None,
+    ) -> None:
+        self.lane: Lane = lane
+        self.client: str | None = client
+        self.timeout: float | None = timeout
+        self.timed_out: bool = False
+        self.running: bool = False
+        self._scheduler: QueryScheduler | None = scheduler
+        self._granted: asyncio.Future = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._timer: asyncio.TimerHandle | None = None
+        self._cursor: duckdb.DuckDBPyConnection | None = None
+        # `unwatch` may run on a query thread while the timer fires.
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        self.running = True
+        if self.timeout is not None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.timeout, self._expire
+            )
+        if not self._granted.done():
+            self._granted.set_result(None)
+
+    def _expire(self) -> None:
+        with self._lock:
+            self.timed_out = True
+            QUERY_TIMEOUTS.inc(lane=self.lane)
+            if self._cursor is not None:
+                self._cursor.interrupt()
+
+    def watch(self, cursor: duckdb.DuckDBPyConnection | None) -> None:
+        """Interrupt `cursor` when the timeout expires (or already has)."""
+        with self._lock:
+            self._cursor = cursor
+            if self.timed_out and cursor is not None:
+                cursor.interrupt()
+
+    def interrupt(self) -> None:
+        """Interrupt the watched cursor's query, if there is one."""
+        with self._lock:
+            if self._cursor is not None:
+                self._cursor.interrupt()
+
+    def unwatch(self) -> None:
+        """Stop watching the cursor; call before it goes back to the pool."""
+        with self._lock:
+            self._cursor = None
+
+    @contextmanager
+    def watching(
+        self, cursor: duckdb.DuckDBPyConnection
+    ) -> Iterator[duckdb.DuckDBPyConnection]:
+        """`watch` `cursor` for the block, for work on a pooled cursor."""
+        self.watch(cursor)
+        try:
+            yield cursor
+        finally:
+            self.unwatch()
+
+    def release(self) -> None:
+        """Leave the queue or free the slot; safe to call more than once."""
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self.unwatch()
+        scheduler._release(self)
+
+    def __enter__(self) -> Slot:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+
+class QueryScheduler:
+    """Decides which queries may take a DuckDB cursor, in lane order.
+
+    At most `capacity` queries (the cursor pool's size) hold a slot at
+    once. The rest wait on the event loop rather than on a query thread,
+    so a query streaming its result over many executor steps always
+    finds a thread for the next one. Free slots go to interactive
+    queries first. Batch queries never take the last slot, and only as
+    many run together as fit `batch_memory` into the memory_limit, so
+    dashboards keep moving while a full-table join runs.
+
+    Each client may have `client_limit` queries running or waiting;
+    more raise `ClientLimitError`. Use from one event loop only.
+    """
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        *,
+        client_limit: int = DEFAULT_CLIENT_LIMIT,
+        batch_memory_fraction: float = BATCH_MEMORY_FRACTION,
+        timeouts: dict[Lane, float | None] | None = None,
+        wait_timeout: float | None = DEFAULT_WAIT_TIMEOUT,
+        batch_rows: int = BATCH_ROWS,
+        batch_joins: int = BATCH_JOINS,
+    ) -> None:
+        """Schedule queries on `manager`'s cursors."""
+        self.manager: ConnectionManager = manager
+        self.client_limit: int = client_limit
+        self.batch_memory_fraction: float = batch_memory_fraction
+        self.timeouts: dict[Lane, float | None] = {
+            **DEFAULT_TIMEOUTS,
+            **(timeouts or {}),
+        }
+        self.wait_timeout: float | None = wait_timeout
+        self.batch_rows: int = batch_rows
+        self.batch_joins: int = batch_joins
+        self._running: dict[Lane, int] = dict.fromkeys(LANES, 0)
+        self._waiting: dict[Lane, deque[Slot]] = {
+            lane: deque() for lane in LANES
+        }
+        self._clients: Counter[str] = Counter()
+
+    # --- Capacity ---
+    @property
+    def capacity(self) -> int:
+        """Queries that may hold a cursor at once (the pool size)."""
+        return max(1, self.manager.config.threads)
+
+    @property
+    def batch_memory(self) -> int:
+        """Bytes of the memory_limit budgeted to each batch query."""
+        limit = parse_memory_size(self.manager.config.memory_limit)
+        return int(limit * self.batch_memory_fraction)
+
+    @property
+    def batch_capacity(self) -> int:
+        """Batch queries that may run at once."""
+        by_memory = int(1 / self.batch_memory_fraction)
+        # One slot stays free for interactive queries.
+        by_slots = self.capacity - 1 if self.capacity > 1 else 1
+        return max(1, min(by_memory, by_slots))
+
+    def running(self, lane: Lane) -> int:
+        return self._running[lane]
+
+    def waiting(self, lane: Lane) -> int:
+        return len(self._waiting[lane])
+
+    # --- Classification ---
+    def classify(self, sql: str) -> QueryCost:
+        """`classify` on the pool's planning cursor (blocking).
+
+        Raises `RestrictedStatementError` first if `check_allowed`
+        refuses the SQL.
+        """
+        with self.manager.planner() as cursor:
+            check_allowed(cursor, sql)
+            return classify(sql, cursor, self.batch_rows, self.batch_joins)
+
+    # --- Slots ---
+    async def acquire(
+        self, lane: Lane = 'interactive', client: str | None = None
+    ) -> Slot:
+        """Wait for a slot in `lane`; `client` None is not limited.
+
+        Raises `ClientLimitError` at once when the client is at its
+        limit, and `SlotTimeoutError` after `wait_timeout` seconds.
+        """
+        if client is not None:
+            if self._clients[client] >= self.client_limit:
+                raise ClientLimitError(
+                    f'Client {client!r} already has {self.client_limit} '
+                    'queries running or queued'
+                )
+            self._clients[client] += 1
+        slot = Slot(self, lane, client, self.timeouts[lane])
+        self._waiting[lane].append(slot)
+        self._dispatch()
+        try:
+            async with asyncio.timeout(self.wait_timeout):
+                await slot._granted
+        except TimeoutError as exc:
+            slot.release()
+            raise SlotTimeoutError(
+                f'No {lane} query slot free within {self.wait_timeout}s '
+                f'({self.capacity} slots)'
+            ) from exc
+        except BaseException:
+            slot.release()
+            raise
+        return slot
+
+    def _release(self, slot: Slot) -> None:
+        if slot.running:
+            self._running[slot.lane] -= 1
+        else:
+            self._waiting[slot.lane].remove(slot)
+        if slot.client is not None:
+            self._clients[slot.client] -= 1
+            if not self._clients[slot.client]:
+                del self._clients[slot.client]
+        self._dispatch()
+
+    def _next(self) -> Slot | None:
+        if self._waiting['interactive']:
+            return self._waiting['interactive'].popleft()
+        batch = self._waiting['batch']
+        if batch and self._running['batch'] < self.batch_capacity:
+            return batch.popleft()
+        return None
+
+    def _dispatch(self) -> None:
+        """Start waiting queries while slots are free, interactive first."""
+        while sum(self._running.values()) < self.capacity:
+            slot = self._next()
+            if slot is None:
+                return
+            self._running[slot.lane] += 1
+            slot._start()
+
+
+# --- Global instance (optional) ---
+Scheduler: QueryScheduler = QueryScheduler(Engine)
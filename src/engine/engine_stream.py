@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+
+import duckdb
+import orjson
+import pyarrow as pa
+
+from engine.engine_metrics import (
+    BYTES_STREAMED,
+    QUERIES,
+    QUERY_SECONDS,
+    ROWS_STREAMED,
+    SlowQueries,
+    SlowQuery,
+)
+from engine.engine_pool import ConnectionManager
+
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+DEFAULT_BATCH_ROWS = 65_536
+# Label of queries not attributed to a named tenant.
+DEFAULT_LABEL = 'default'
+
+
+class _ChunkSink:
+    """File-like sink that collects what the IPC writer emits."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self.parts: list[bytes | pa.Buffer] = []
+
+    def write(self, data: bytes | pa.Buffer) -> int:
+        """Keep a reference to `data`; pyarrow buffers are not copied."""
+        self.parts.append(data)
+        return len(data) if isinstance(data, bytes) else data.size
+
+    def flush(self) -> None:
+        """Nothing to flush; chunks are drained by `take`."""
+
+    def take(self) -> bytes:
+        """Return everything written since the last call as one chunk."""
+        chunk = b''.join(self.parts)
+        self.parts.clear()
+        return chunk
+
+
+def record_batch_reader(
+    cursor: duckdb.DuckDBPyConnection, batch_rows: int = DEFAULT_BATCH_ROWS
+) -> pa.RecordBatchReader:
+    """Return a streaming Arrow reader over the cursor's pending result."""
+    if hasattr(cursor, 'to_arrow_reader'):
+        return cursor.to_arrow_reader(batch_rows)
+    return cursor.fetch_record_batch(batch_rows)
+
+
+def _streamed(chunk: bytes, rows: int, tenant: str, fmt: str) -> bytes:
+    ROWS_STREAMED.inc(rows, tenant=tenant, format=fmt)
+    BYTES_STREAMED.inc(len(chunk), tenant=tenant, format=fmt)
+    return chunk
+
+
+def arrow_ipc_chunks(
+    reader: pa.RecordBatchReader, tenant: str = DEFAULT_LABEL
+) -> Iterator[bytes]:
+    """Encode a record batch reader as an Arrow IPC stream, batch by batch."""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        yield _streamed(sink.take(), 0, tenant, 'arrow')
+        for batch in reader:
+            writer.write_batch(batch)
+            yield _streamed(sink.take(), batch.num_rows, tenant, 'arrow')
+    yield _streamed(sink.take(), 0, tenant, 'arrow')
+
+
+def ndjson_chunks(
+    reader: pa.RecordBatchReader, tenant: str = DEFAULT_LABEL
+) -> Iterator[bytes]:
+    """Encode a record batch reader as newline-delimited JSON."""
+    for batch in reader:
+        # Only one batch of rows is turned into Python objects at a time.
+        chunk = b''.join(
+            orjson.dumps(row, default=str) + b'\n' for row in batch.to_pylist()
+        )
+        yield _streamed(chunk, batch.num_rows, tenant, 'ndjson')
+
+
+class QueryStream:
+    """A query holding a pooled cursor until its result is exhausted.
+
+    The query is timed from execution until the cursor is released and
+    counted in `QUERIES` as ok, error or abandoned (closed before its
+    last batch). With the slow query log enabled its DuckDB profile is
+    kept when it was slow.
+    """
+
+    def __init__(
+        self, manager: ConnectionManager, tenant: str = DEFAULT_LABEL
+    ) -> None:
+        """Acquire the cursor the query will run on (may block)."""
+        self._pool, cursor = manager.acquire()
+        self.cursor: duckdb.DuckDBPyConnection | None = cursor
+        self.reader: pa.RecordBatchReader | None = None
+        self.tenant: str = tenant
+        self.rows: int = 0
+        self._started: float = 0.0
+        self._outcome: str = 'abandoned'
+        self._profiling: bool = False
+
+    def execute(self, sql: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> None:
+        """Run `sql` and open a batch reader; releases the cursor on error."""
+        self.run(lambda cursor: cursor.execute(sql), batch_rows)
+
+    def run(
+        self,
+        statement: Callable[[duckdb.DuckDBPyConnection], object],
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+    ) -> None:
+        """Run `statement(cursor)` and open a reader on its result."""
+        cursor = self.cursor
+        if cursor is None:
+            raise ValueError('Query stream is closed')
+        try:
+            if SlowQueries.enabled:
+                cursor.execute("SET enable_profiling = 'no_output'")
+                self._profiling = True
+            self._started = time.perf_counter()
+            statement(cursor)
+            reader = record_batch_reader(cursor, batch_rows)
+            self.reader = pa.RecordBatchReader.from_batches(
+                reader.schema, self._count(reader)
+            )
+        except BaseException:
+            self._outcome = 'error'
+            self.close()
+            raise
+
+    def _count(self, reader: pa.RecordBatchReader) -> Iterator[pa.RecordBatch]:
+        for batch in reader:
+            self.rows += batch.num_rows
+            yield batch
+        self._outcome = 'ok'
+
+    def close(self) -> None:
+        """Return the cursor to its pool; safe to call more than once."""
+        cursor, self.cursor = self.cursor, None
+        if cursor is None:
+            return
+        try:
+            self._record(cursor)
+        finally:
+            self._pool.release(cursor)
+
+    def _record(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        seconds = time.perf_counter() - self._started
+        QUERIES.inc(tenant=self.tenant, outcome=self._outcome)
+        QUERY_SECONDS.observe(seconds, tenant=self.tenant)
+        if not self._profiling:
+            return
+        try:
+            if self._outcome == 'ok' and SlowQueries.is_slow(seconds):
+                self._keep_profile(cursor, seconds)
+            cursor.execute('RESET enable_profiling')
+        except duckdb.Error:
+            pass  # profiling is best effort; the cursor is still usable
+
+    def _keep_profile(
+        self, cursor: duckdb.DuckDBPyConnection, seconds: float
+    ) -> None:
+        profile = orjson.loads(cursor.get_profiling_information(format='json'))
+        SlowQueries.add(
+            SlowQuery(
+                tenant=self.tenant,
+                sql=profile.get('query_name', ''),
+                seconds=seconds,
+                rows=self.rows,
+                finished_at=time.time(),
+                profile=profile,
+            )
+        )
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Awaitable, Callable, Iterator, MutableMapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import HTTPException, Request
+
+from config.config_duckdb import (
+    DuckDBConfig,
+    memory_budget,
+    parse_memory_size,
+)
+from engine.engine_cache import Cache, ResultCache
+from engine.engine_executor import Executor, QueryExecutor
+from engine.engine_ingest import Ingest, Ingestor
+from engine.engine_metrics import Metrics, Sample
+from engine.engine_pool import ConnectionManager, Engine
+from engine.engine_prepared import StatementRegistry, Statements
+from engine.engine_profile import Profiler, Profiles
+from engine.engine_scheduler import LANES, QueryScheduler, Scheduler
+
+DEFAULT_TENANT = 'default'
+# Request header naming the tenant; `/t/<name>/...` paths also work.
+TENANT_HEADER = 'X-DuckLearn-Tenant'
+# Least memory a tenant created from the leftover budget may get; DuckDB
+# fails every query with much less.
+MIN_TENANT_MEMORY = 64 * 1000**2
+
+_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+_PATH_RE = re.compile(r'^/t/(?P<name>[^/]+)(?P<rest>/.*)?$')
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable, Callable], Awaitable[None]]
+
+
+class TenantNotFoundError(KeyError):
+    """Raised for an unknown tenant name."""
+
+
+class QuotaExceededError(ValueError):
+    """Raised when memory limits would exceed the machine budget."""
+
+
+class StaleConfigError(RuntimeError):
+    """Raised when a config write names an ETag that is no longer current."""
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """One isolated database profile and the services bound to it.
+
+    Every tenant owns its DuckDB database (with its own memory_limit and
+    threads), its cursor pool, query threads, admission queue and
+    scheduler, so a heavy query in one tenant can only exhaust that
+    tenant's quota.
+    """
+
+    name: str
+    engine: ConnectionManager
+    executor: QueryExecutor
+    scheduler: QueryScheduler
+    cache: ResultCache
+    statements: StatementRegistry
+    ingest: Ingestor
+    profiles: Profiler
+    # Held while a reconfigure applies, so one tenant's changes queue up.
+    reconfiguring: threading.Lock = field(
+        default_factory=threading.Lock, compare=False, repr=False
+    )
+
+    @classmethod
+    def create(cls, name: str, config: DuckDBConfig) -> Tenant:
+        """Build a tenant with fresh services around `config`."""
+        engine = ConnectionManager(config)
+        cache = ResultCache(engine)
+        return cls(
+            name=name,
+            engine=engine,
+            executor=QueryExecutor(engine),
+            scheduler=QueryScheduler(engine),
+            cache=cache,
+            statements=StatementRegistry(engine),
+            ingest=Ingestor(engine, cache),
+            profiles=Profiler(engine),
+        )
+
+    @property
+    def config(self) -> DuckDBConfig:
+        return self.engine.config
+
+    def close(self) -> None:
+        """Stop the tenant's query threads and close its database."""
+        self.executor.shutdown()
+        self.engine.close_all()
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'memory_bytes': parse_memory_size(self.config.memory_limit),
+            'config': self.config.to_dict(),
+        }
+
+
+class TenantRegistry:
+    """Named tenants whose memory limits share one machine budget.
+
+    The sum of every tenant's `memory_limit` (the default tenant
+    included) may not exceed `budget`, which defaults to the share of
+    RAM `DuckDBConfig` auto-detects for a single database. Creating a
+    tenant or raising its limit past the budget raises
+    `QuotaExceededError`; lower another tenant's limit first.
+    """
+
+    def __init__(self, default: Tenant, budget: int | None = None) -> None:
+        """Start with just `default`; `budget` is in bytes."""
+        self._tenants: dict[str, Tenant] = {default.name: default}
+        self._default: str = default.name
+        self._budget: int | None = budget
+        # Guards checks and changes of `_tenants` and `_pending`, never a
+        # drain: readers take lock-free snapshots instead.
+        self._lock = threading.RLock()
+        # Reconfigures applying outside the lock: (memory bytes, uri).
+        self._pending: dict[str, tuple[int, str]] = {}
+
+    # --- Budget ---
+    @property
+    def budget(self) -> int:
+        """Bytes all tenants may use together."""
+        return self._budget if self._budget is not None else memory_budget()
+
+    def allocated(self, exclude: str | None = None) -> int:
+        """Sum of the tenants' memory limits in bytes.
+
+        A tenant being reconfigured counts with the larger of its current
+        and its new limit until the change is applied.
+        """
+        pending = dict(self._pending)
+        return sum(
+            max(
+                parse_memory_size(tenant.config.memory_limit),
+                pending.get(name, (0, ''))[0],
+            )
+            for name, tenant in list(self._tenants.items())
+            if name != exclude
+        )
+
+    def _check_quota(self, name: str, memory_limit: str) -> None:
+        requested = parse_memory_size(memory_limit)
+        available = self.budget - self.allocated(exclude=name)
+        if requested > available:
+            raise QuotaExceededError(
+                f'memory_limit {memory_limit} for tenant {name!r} exceeds '
+                f'the {available} bytes left of the {self.budget} byte '
+                'budget'
+            )
+
+    def _check_database(self, name: str, config: DuckDBConfig) -> None:
+        uri = config.connection_uri
+        if uri == ':memory:':
+            return
+        claimed = [
+            (other, tenant.config.connection_uri)
+            for other, tenant in self._tenants.items()
+        ]
+        claimed += [
+            (other, p_uri) for other, (_, p_uri) in self._pending.items()
+        ]
+        for other, other_uri in claimed:
+            if other != name and other_uri == uri:
+                raise ValueError(
+                    f'{uri} is already the database of tenant {other!r}'
+                )
+
+    # --- Lookup ---
+    @property
+    def default(self) -> Tenant:
+        return self._tenants[self._default]
+
+    def get(self, name: str | None = None) -> Tenant:
+        """The tenant called `name` (the default tenant if None)."""
+        # No lock: a reconfigure may hold it while draining queries.
+        tenant = self._tenants.get(name or self._default)
+        if tenant is None:
+            raise TenantNotFoundError(name)
+        return tenant
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tenants
+
+    def all(self) -> list[Tenant]:
+        """All tenants, default first."""
+        return sorted(
+            list(self._tenants.values()),
+            key=lambda t: (t.name != self._default, t.name),
+        )
+
+    # --- Changes ---
+    def add(self, name: str, settings: dict | None = None) -> Tenant:
+        """Create a tenant from `DuckDBConfig` keyword settings.
+
+        Without a `memory_limit` the tenant gets whatever is left of the
+        budget, which must be at least `MIN_TENANT_MEMORY`.
+        """
+        if not _NAME_RE.match(name):
+            raise ValueError(f'Invalid tenant name {name!r}')
+        settings = dict(settings or {})
+        with self._lock:
+            if name in self._tenants:
+                raise ValueError(f'Tenant {name!r} already exists')
+            if not settings.get('memory_limit'):
+                left = self.budget - self.allocated()
+                if left < MIN_TENANT_MEMORY:
+                    raise QuotaExceededError(
+                        f'Only {left} bytes of the {self.budget} byte '
+                        f'budget are left for tenant {name!r}; lower '
+                        "another tenant's memory_limit first"
+                    )
+                settings['memory_limit'] = f'{left // 1000**2}MB'
+            config = DuckDBConfig(**settings)
+            self._check_quota(name, config.memory_limit)
+            self._check_database(name, config)
+            tenant = self._tenants[name] = Tenant.create(name, config)
+        return tenant
+
+    def reconfigure(
+        self, name: str, new_values: dict, if_match: str | None = None
+    ) -> dict[str, list]:
+        """`ConnectionManager.reconfigure` for one tenant, within budget.
+
+        With `if_match` (an `If-Match` header value) the change is only
+        applied if the tenant's config still has one of those ETags.
+        The checks run under the registry lock; applying the change,
+        which may drain the tenant's queries, only holds the tenant's own
+        lock, with the new limit and database reserved meanwhile.
+        """
+        tenant = self.get(name)
+        with tenant.reconfiguring:
+            with self._lock:
+                if if_match is not None and not _etag_matches(
+                    if_match, tenant.config.etag
+                ):
+                    raise StaleConfigError(
+                        f'Config of tenant {name!r} changed since it was read'
+                    )
+                memory = parse_memory_size(tenant.config.memory_limit)
+                uri = tenant.config.connection_uri
+                if 'memory_limit' in new_values:
+                    self._check_quota(tenant.name, new_values['memory_limit'])
+                    memory = parse_memory_size(new_values['memory_limit'])
+                if 'db_type' in new_values or 'db_path' in new_values:
+                    candidate = DuckDBConfig(
+                        **{**tenant.config.to_dict(), **new_values}
+                    )
+                    self._check_database(tenant.name, candidate)
+                    uri = candidate.connection_uri
+                self._pending[name] = (memory, uri)
+            try:
+                report = tenant.engine.reconfigure(new_values)
+            finally:
+                with self._lock:
+                    del self._pending[name]
+        if report['reopened']:
+            # A reopened database may hold different data.
+            tenant.cache.invalidate()
+        return report
+
+    def remove(self, name: str) -> None:
+        """Close and forget a tenant; the default one cannot be removed."""
+        if name == self._default:
+            raise ValueError('The default tenant cannot be removed')
+        with self._lock:
+            tenant = self._tenants.pop(name, None)
+        if tenant is None:
+            raise TenantNotFoundError(name)
+        tenant.close()
+
+    def load(self, profiles: dict[str, dict], prune: bool = False) -> None:
+        """Apply tenant settings, e.g. the `tenants` key of settings.json.
+
+        The default tenant's entry (if any) is applied first so that
+        lowering its memory_limit frees budget for the others. With
+        `prune`, tenants missing from `profiles` are removed first.
+        An entry replaces an existing tenant's settings the way PUT does:
+        fields it leaves out return to their defaults, except that a
+        tenant other than the default one keeps the memory_limit it was
+        given from the leftover budget.
+        """
+        if prune:
+            for tenant in self.all():
+                name = tenant.name
+                if name != self._default and name not in profiles:
+                    self.remove(name)
+        if self._default in profiles:
+            self._replace(self._default, profiles[self._default])
+        for name, settings in profiles.items():
+            if name == self._default:
+                continue
+            if name in self:
+                self._replace(name, settings)
+            else:
+                self.add(name, settings)
+
+    def _replace(self, name: str, settings: dict) -> None:
+        config = self.get(name).config
+        values = config.defaults()
+        if name != self._default:
+            values['memory_limit'] = config.memory_limit
+        self.reconfigure(name, {**values, **settings})
+
+    def close_all(self) -> None:
+        """Close every tenant except the default one, which is kept."""
+        with self._lock:
+            names = [name for name in self._tenants if name != self._default]
+        for name in names:
+            self.remove(name)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+class TenantMiddleware:
+    """Routes `/t/<name>/<path>` to `<path>` on behalf of tenant `name`.
+
+    The tenant name is stored in the request state, where
+    `current_tenant` looks for it before falling back to the
+    `TENANT_HEADER` header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(
+        self, scope: Scope, receive: Callable, send: Callable
+    ) -> None:
+        if scope['type'] in ('http', 'websocket'):
+            match = _PATH_RE.match(scope['path'])
+            if match is not None:
+                path = match['rest'] or '/'
+                scope = {
+                    **scope,
+                    'path': path,
+                    'raw_path': path.encode(),
+                    'state': {
+                        **scope.get('state', {}),
+                        'tenant': match['name'],
+                    },
+                }
+        await self.app(scope, receive, send)
+
+
+def current_tenant(request: Request) -> Tenant:
+    """FastAPI dependency resolving the tenant a request is routed to."""
+    name = getattr(request.state, 'tenant', None) or request.headers.get(
+        TENANT_HEADER
+    )
+    try:
+        return Tenants.get(name)
+    except TenantNotFoundError as exc:
+        raise HTTPException(
+            status_code=404, detail=f'Unknown tenant {name}'
+        ) from exc
+
+
+# --- Global instance (optional) ---
+Tenants: TenantRegistry = TenantRegistry(
+    Tenant(
+        name=DEFAULT_TENANT,
+        engine=Engine,
+        executor=Executor,
+        scheduler=Scheduler,
+        cache=Cache,
+        statements=Statements,
+        ingest=Ingest,
+        profiles=Profiles,
+    )
+)
+
+
+# --- Metrics, read from every tenant on each scrape ---
+def _per_tenant(value: Callable[[Tenant], float]) -> Callable:
+    def collect() -> Iterator[Sample]:
+        for tenant in Tenants.all():
+            yield {'tenant': tenant.name}, value(tenant)
+
+    return collect
+
+
+def _pools(attribute: str) -> Callable[[Tenant], float]:
+    return lambda tenant: sum(
+        getattr(pool, attribute) for pool in tenant.engine.pools.values()
+    )
+
+
+def _hit_ratio(tenant: Tenant) -> float:
+    lookups = tenant.cache.hits + tenant.cache.misses
+    return tenant.cache.hits / lookups if lookups else 0.0
+
+
+for _name, _description, _value, _type in (
+    (
+        'ducklearn_pool_cursors_in_use',
+        'Pooled DuckDB cursors handed out to queries.',
+        _pools('in_use'),
+        'gauge',
+    ),
+    (
+        'ducklearn_pool_cursors_open',
+        'Pooled DuckDB cursors open, idle or in use.',
+        _pools('created'),
+        'gauge',
+    ),
+    (
+        'ducklearn_pool_size',
+        "Most cursors the tenant's pool may open.",
+        _pools('size'),
+        'gauge',
+    ),
+    (
+        'ducklearn_queries_admitted',
+        'Queries running or queued on the query executor.',
+        lambda tenant: tenant.executor.admitted,
+        'gauge',
+    ),
+    (
+        'ducklearn_queries_capacity',
+        'Queries the executor admits before answering 429.',
+        lambda tenant: tenant.executor.capacity,
+        'gauge',
+    ),
+    (
+        'ducklearn_cache_hits_total',
+        'Result cache lookups answered from the cache.',
+        lambda tenant: tenant.cache.hits,
+        'counter',
+    ),
+    (
+        'ducklearn_cache_misses_total',
+        'Cacheable result lookups that had to run the query.',
+        lambda tenant: tenant.cache.misses,
+        'counter',
+    ),
+    (
+        'ducklearn_cache_hit_ratio',
+        'Share of cacheable lookups answered from the cache.',
+        _hit_ratio,
+        'gauge',
+    ),
+    (
+        'ducklearn_cache_bytes',
+        'Bytes of Arrow results held by the result cache.',
+        lambda tenant: tenant.cache.nbytes,
+        'gauge',
+    ),
+):
+    Metrics.collected(
+        _name, _description, ('tenant',), _per_tenant(_value), _type
+    )
+
+
+def _per_lane(value: Callable[[QueryScheduler, str], float]) -> Callable:
+    def collect() -> Iterator[Sample]:
+        for tenant in Tenants.all():
+            for lane in LANES:
+                labels = {'tenant': tenant.name, 'lane': lane}
+                yield labels, value(tenant.scheduler, lane)
+
+    return collect
+
+
+Metrics.collected(
+    'ducklearn_scheduler_running',
+    'Queries holding a scheduler slot, by lane.',
+    ('tenant', 'lane'),
+    _per_lane(QueryScheduler.running),
+)
+Metrics.collected(
+    'ducklearn_scheduler_waiting',
+    'Queries waiting for a scheduler slot, by lane.',
+    ('tenant', 'lane'),
+    _per_lane(QueryScheduler.waiting),
+)
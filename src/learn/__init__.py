@@ -0,0 +1,37 @@
+from .learn_base import NotFittedError, SQLTransformer
+from .learn_linear import LinearRegression, LogisticRegression
+from .learn_model_selection import (
+    CrossValidation,
+    KFold,
+    cross_validate,
+    train_test_split,
+)
+from .learn_pipeline import Filter, Pipeline
+from .learn_preprocessing import (
+    MinMaxScaler,
+    OneHotEncoder,
+    OrdinalEncoder,
+    SimpleImputer,
+    StandardScaler,
+)
+from .learn_registry import ModelRegistry, Models
+
+__all__ = [
+    'CrossValidation',
+    'Filter',
+    'KFold',
+    'LinearRegression',
+    'LogisticRegression',
+    'MinMaxScaler',
+    'ModelRegistry',
+    'Models',
+    'NotFittedError',
+    'OneHotEncoder',
+    'OrdinalEncoder',
+    'Pipeline',
+    'SimpleImputer',
+    'SQLTransformer',
+    'StandardScaler',
+    'cross_validate',
+    'train_test_split',
+]
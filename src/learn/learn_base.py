@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import duckdb
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from engine.engine_pool import Engine
+
+# Alias given to the input relation inside generated SQL.
+SOURCE_ALIAS = '_src'
+
+_NUMERIC_TYPES = frozenset(
+    {
+        'TINYINT',
+        'SMALLINT',
+        'INTEGER',
+        'BIGINT',
+        'HUGEINT',
+        'UTINYINT',
+        'USMALLINT',
+        'UINTEGER',
+        'UBIGINT',
+        'UHUGEINT',
+        'FLOAT',
+        'DOUBLE',
+        'DECIMAL',
+    }
+)
+
+
+class NotFittedError(ValueError, AttributeError):
+    """Raised when a transformer or model is used before `fit`."""
+
+
+def column(name: str) -> exp.Column:
+    """Quoted column reference, safe for any column name."""
+    return exp.column(name, quoted=True)
+
+
+def source_expression(source: str | exp.Expr) -> exp.Expr:
+    """Turn a table name or SQL query into a FROM-clause expression.
+
+    A string that parses as a query (`SELECT ...`, `FROM t ...`,
+    `WITH ...`) becomes an aliased subquery; anything else is treated as
+    a (possibly schema-qualified) table name.
+    """
+    if isinstance(source, exp.Query):
+        return source.subquery(SOURCE_ALIAS, copy=True)
+    if isinstance(source, exp.Expr):
+        return source
+    text = source.strip().rstrip(';')
+    try:
+        parsed = sqlglot.parse_one(text, dialect='duckdb')
+    except SqlglotError:
+        parsed = None
+    if isinstance(parsed, exp.Query):
+        return parsed.subquery(SOURCE_ALIAS)
+    return exp.to_table(text, dialect='duckdb')
+
+
+def select_from(
+    projections: Sequence[exp.Expr], source: str | exp.Expr
+) -> exp.Select:
+    """`SELECT <projections> FROM <source>` as a sqlglot AST."""
+    return exp.select(*projections).from_(source_expression(source))
+
+
+def to_sql(tree: exp.Expr) -> str:
+    """Render a sqlglot AST as DuckDB SQL."""
+    return tree.sql(dialect='duckdb')
+
+
+@contextmanager
+def connection_or_pool(
+    connection: duckdb.DuckDBPyConnection | None,
+) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Use `connection` if given, else borrow a pooled cursor."""
+    if connection is not None:
+        yield connection
+        return
+    with Engine.cursor() as cursor:
+        yield cursor
+
+
+def source_schema(
+    source: str | exp.Expr, connection: duckdb.DuckDBPyConnection
+) -> dict[str, str]:
+    """Column name -> DuckDB type of `source`, without scanning rows."""
+    sql = to_sql(select_from([exp.Star()], source))
+    rows = connection.execute(f'DESCRIBE {sql}').fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def is_numeric(type_name: str) -> bool:
+    """Whether a DuckDB type name is numeric (integer, float, decimal)."""
+    base = type_name.split('(')[0].upper()
+    return base in _NUMERIC_TYPES
+
+
+def fetch_one_dict(
+    connection: duckdb.DuckDBPyConnection, query: exp.Expr | str
+) -> dict:
+    """Run a single-row query and return it as a dict by column name."""
+    sql = query if isinstance(query, str) else to_sql(query)
+    result = connection.execute(sql)
+    names = [col[0] for col in result.description]
+    (row,) = result.fetchall()
+    return dict(zip(names, row, strict=True))
+
+
+class SQLTransformer:
+    """Base class for transformers that fit and transform inside DuckDB.
+
+    `fit` computes every statistic the transformer needs in ONE
+    aggregate query over the source; `transform` never touches the data
+    itself but returns SQL (or a lazy DuckDB relation) projecting the
+    source through `projections()`. Subclasses implement
+    `_fit_aggregates`, `_set_fitted` and `_column_projections`.
+    """
+
+    def __init__(self, columns: Sequence[str] | None = None) -> None:
+        """Transform `columns`, or the subclass default if None."""
+        self.columns: list[str] | None = (
+            list(columns) if columns is not None else None
+        )
+
+    # --- Subclass hooks ---
+    def _default_columns(self, schema: dict[str, str]) -> list[str]:
+        """Columns transformed when none are given: numeric ones."""
+        return [name for name, kind in schema.items() if is_numeric(kind)]
+
+    def _reset_fitted(self) -> None:
+        """Clear fitted state before a (re)fit."""
+
+    def _fit_aggregates(self, column_name: str) -> dict[str, exp.Expr]:
+        """Named aggregate expressions this column needs at fit time."""
+        raise NotImplementedError
+
+    def _set_fitted(self, column_name: str, stats: dict[str, Any]) -> None:
+        """Store the fitted statistics of one column."""
+        raise NotImplementedError
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        """Aliased output expressions replacing one input column."""
+        raise NotImplementedError
+
+    # --- Fitting ---
+    @property
+    def is_fitted(self) -> bool:
+        """Whether `fit` has run."""
+        return hasattr(self, 'columns_')
+
+    def _check_fitted(self) -> None:
+        if not self.is_fitted:
+            raise NotFittedError(
+                f'{type(self).__name__} is not fitted; call fit() first'
+            )
+
+    def fit_aggregate_sql(self, source: str | exp.Expr) -> str:
+        """The single aggregate query `fit` runs, for inspection."""
+        if self.columns is None:
+            raise ValueError('columns must be given to build fit SQL')
+        return to_sql(self._fit_query(self.columns, source)[0])
+
+    def _fit_query(
+        self, columns: Sequence[str], source: str | exp.Expr
+    ) -> tuple[exp.Select, dict[str, tuple[str, str]]]:
+        projections: list[exp.Expr] = []
+        names: dict[str, tuple[str, str]] = {}
+        for name in columns:
+            for stat, aggregate in self._fit_aggregates(name).items():
+                alias = f'a{len(projections)}'
+                projections.append(exp.alias_(aggregate, alias))
+                names[alias] = (name, stat)
+        return select_from(projections, source), names
+
+    def fit(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> SQLTransformer:
+        """Learn the statistics of `source` (a table name or query).
+
+        Uses `connection` if given, else a cursor from the shared pool.
+        """
+        with connection_or_pool(connection) as cursor:
+            schema = source_schema(source, cursor)
+            columns = (
+                self._default_columns(schema)
+                if self.columns is None
+                else list(self.columns)
+            )
+            missing = [name for name in columns if name not in schema]
+            if missing:
+                raise ValueError(f'Columns not in source: {missing}')
+            stats: dict[str, dict[str, Any]] = {c: {} for c in columns}
+            query, names = self._fit_query(columns, source)
+            if names:
+                for alias, value in fetch_one_dict(cursor, query).items():
+                    name, stat = names[alias]
+                    stats[name][stat] = value
+
+        self.feature_names_in_: list[str] = list(schema)
+        self._reset_fitted()
+        for name in columns:
+            self._set_fitted(name, stats[name])
+        self.columns_: list[str] = columns
+        return self
+
+    # --- Transforming ---
+    def projections(self) -> list[exp.Expr]:
+        """Output SELECT list: transformed columns in input order.
+
+        Columns the transformer does not touch are passed through.
+        """
+        self._check_fitted()
+        transformed = set(self.columns_)
+        out: list[exp.Expr] = []
+        for name in self.feature_names_in_:
+            if name in transformed:
+                out.extend(self._column_projections(name))
+            else:
+                out.append(column(name))
+        return out
+
+    @property
+    def feature_names_out_(self) -> list[str]:
+        """Names of the output columns, in order."""
+        return [node.alias_or_name for node in self.projections()]
+
+    def transform_query(self, source: str | exp.Expr) -> exp.Select:
+        """The transform as a sqlglot SELECT over `source`."""
+        return select_from(self.projections(), source)
+
+    def transform_sql(self, source: str | exp.Expr) -> str:
+        """The transform as DuckDB SQL over `source`."""
+        return to_sql(self.transform_query(source))
+
+    def transform(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+    ) -> duckdb.DuckDBPyRelation:
+        """Lazy DuckDB relation of the transformed `source`.
+
+        Nothing is computed until the relation is fetched, so the
+        transform streams through DuckDB with whatever follows it.
+        """
+        return connection.sql(self.transform_sql(source))
+
+    def fit_transform(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+    ) -> duckdb.DuckDBPyRelation:
+        """`fit` then `transform` on the same source and connection."""
+        return self.fit(source, connection).transform(source, connection)
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import duckdb
+import numpy as np
+from sqlglot import exp
+
+from learn.learn_base import (
+    NotFittedError,
+    column,
+    connection_or_pool,
+    fetch_one_dict,
+    is_numeric,
+    select_from,
+    source_schema,
+    to_sql,
+)
+
+# Name of the column appended by `predict`.
+PREDICTION_COLUMN = 'prediction'
+
+
+def _double(value: float) -> exp.Expr:
+    return exp.cast(exp.convert(float(value)), 'DOUBLE')
+
+
+def _factor(node: exp.Expr) -> exp.Expr:
+    """Copy of `node`, parenthesized if it is a binary operation."""
+    node = node.copy()
+    if isinstance(node, exp.Binary):
+        return exp.paren(node, copy=False)
+    return node
+
+
+def _sum_of(*factors: exp.Expr) -> exp.Expr:
+    """`sum(f1 * f2 * ...)` over copies of the given factors."""
+    product = _factor(factors[0])
+    for factor in factors[1:]:
+        product = exp.Mul(this=product, expression=_factor(factor))
+    return exp.func('sum', product)
+
+
+def _cross_products(
+    size: int, weight: str | None = None
+) -> tuple[list[str], list[tuple[int, int]]]:
+    """`sum(_xi * _xj [* weight]) AS h<k>` for the upper triangle.
+
+    Rendered as plain SQL over the `_x0 .. _x<size-1>` columns of a
+    design subquery: with p features this is p^2 / 2 aggregates, far
+    too many to build and render as sqlglot nodes for wide inputs.
+    """
+    factor = f' * {weight}' if weight else ''
+    aggregates: list[str] = []
+    cells: list[tuple[int, int]] = []
+    for i in range(size):
+        for j in range(i, size):
+            aggregates.append(f'sum(_x{i} * _x{j}{factor}) AS h{len(cells)}')
+            cells.append((i, j))
+    return aggregates, cells
+
+
+def _aggregate_over(aggregates: Sequence[str], design: exp.Select) -> str:
+    """`SELECT <aggregates> FROM (<design>) AS _design` as SQL."""
+    return f'SELECT {", ".join(aggregates)} FROM ({to_sql(design)}) AS _design'
+
+
+def _solve(gram: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Solve `gram @ beta = rhs`, falling back to least squares."""
+    try:
+        return np.linalg.solve(gram, rhs)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(gram, rhs, rcond=None)[0]
+
+
+def _sigmoid(eta: exp.Expr) -> exp.Expr:
+    """`1 / (1 + exp(-eta))`; DuckDB saturates to 0/1 without erroring."""
+    return exp.Div(
+        this=_double(1.0),
+        expression=exp.paren(
+            exp.Add(
+                this=_double(1.0),
+                expression=exp.func('exp', exp.Neg(this=exp.paren(eta))),
+            )
+        ),
+    )
+
+
+class _LinearModel:
+    """Shared plumbing for models scored as `intercept + x . coef`.
+
+    Training reads the source only through aggregate queries, so tables
+    far larger than RAM are fine: DuckDB streams (and spills) them while
+    Python only ever holds a p x p matrix. Rows with a NULL feature or
+    target are skipped.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        features: Sequence[str] | None = None,
+        *,
+        fit_intercept: bool = True,
+        alpha: float = 0.0,
+    ) -> None:
+        """Predict `target` from `features` (numeric columns if None).
+
+        `alpha` adds an L2 (ridge) penalty on the coefficients.
+        """
+        if alpha < 0:
+            raise ValueError(f'alpha must be >= 0, got {alpha}')
+        self.target: str = target
+        self.features: list[str] | None = (
+            list(features) if features is not None else None
+        )
+        self.fit_intercept: bool = fit_intercept
+        self.alpha: float = alpha
+
+    # --- Design matrix ---
+    def _resolve_features(self, schema: dict[str, str]) -> list[str]:
+        if self.target not in schema:
+            raise ValueError(f'Target {self.target!r} not in source')
+        if self.features is None:
+            features = [
+                name
+                for name, kind in schema.items()
+                if name != self.target and is_numeric(kind)
+            ]
+        else:
+            features = list(self.features)
+        missing = [name for name in features if name not in schema]
+        if missing:
+            raise ValueError(f'Columns not in source: {missing}')
+        if not features and not self.fit_intercept:
+            raise ValueError('No features to fit')
+        return features
+
+    def _design(self, features: Sequence[str]) -> list[exp.Expr]:
+        """Columns of X as SQL expressions (a leading 1 for intercept)."""
+        columns: list[exp.Expr] = [
+            exp.cast(column(name), 'DOUBLE') for name in features
+        ]
+        if self.fit_intercept:
+            return [_double(1.0), *columns]
+        return columns
+
+    def _complete_rows(
+        self, source: str | exp.Expr, features: Sequence[str]
+    ) -> exp.Select:
+        """`SELECT * FROM source WHERE <no feature/target is NULL>`."""
+        checks = [
+            exp.Not(this=exp.Is(this=column(name), expression=exp.null()))
+            for name in (*features, self.target)
+        ]
+        return select_from([exp.Star()], source).where(exp.and_(*checks))
+
+    def _penalty(self, size: int) -> np.ndarray:
+        """Ridge penalty matrix; the intercept is never penalized."""
+        penalty = np.eye(size) * self.alpha
+        if self.fit_intercept:
+            penalty[0, 0] = 0.0
+        return penalty
+
+    def _set_coefficients(self, features: list[str], beta: np.ndarray) -> None:
+        self.features_: list[str] = features
+        offset = 1 if self.fit_intercept else 0
+        self.intercept_: float = float(beta[0]) if self.fit_intercept else 0.0
+        self.coef_: dict[str, float] = {
+            name: float(value)
+            for name, value in zip(features, beta[offset:], strict=True)
+        }
+
+    # --- Scoring ---
+    def _check_fitted(self) -> None:
+        if not hasattr(self, 'coef_'):
+            raise NotFittedError(
+                f'{type(self).__name__} is not fitted; call fit() first'
+            )
+
+    def decision_expression(self) -> exp.Expr:
+        """`intercept + sum(coef * x)` as a sqlglot expression."""
+        self._check_fitted()
+        expr: exp.Expr = _double(self.intercept_)
+        for name, value in self.coef_.items():
+            expr = exp.Add(
+                this=expr,
+                expression=exp.Mul(
+                    this=_double(value),
+                    expression=exp.cast(column(name), 'DOUBLE'),
+                ),
+            )
+        return expr
+
+    def predict_expression(self) -> exp.Expr:
+        """The prediction for one row as a sqlglot expression."""
+        return self.decision_expression()
+
+    def predict_query(
+        self,
+        source: str | exp.Expr,
+        output: str = PREDICTION_COLUMN,
+    ) -> exp.Select:
+        """`SELECT *, <prediction> AS output FROM source`."""
+        prediction = exp.alias_(self.predict_expression(), output, quoted=True)
+        return select_from([exp.Star(), prediction], source)
+
+    def predict_sql(
+        self,
+        source: str | exp.Expr,
+        output: str = PREDICTION_COLUMN,
+    ) -> str:
+        """`predict_query` rendered as DuckDB SQL."""
+        return to_sql(self.predict_query(source, output))
+
+    def predict(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+        output: str = PREDICTION_COLUMN,
+    ) -> duckdb.DuckDBPyRelation:
+        """Lazy relation of `source` with a prediction column appended."""
+        return connection.sql(self.predict_sql(source, output))
+
+
+class LinearRegression(_LinearModel):
+    """Ordinary least squares (optionally ridge) fitted in one scan.
+
+    `fit` runs a single aggregate query computing every entry of X^T X
+    and X^T y, then solves the p x p normal equations in NumPy.
+    """
+
+    def normal_equations_sql(
+        self, source: str | exp.Expr, features: Sequence[str]
+    ) -> str:
+        """The aggregate query `fit` runs, for inspection."""
+        return self._normal_equations(source, features)[0]
+
+    def _normal_equations(
+        self, source: str | exp.Expr, features: Sequence[str]
+    ) -> tuple[str, list[tuple[int, int]]]:
+        design = self._design(features)
+        rows = self._complete_rows(source, features).subquery('_rows')
+        projected = exp.select(
+            *[exp.alias_(x, f'_x{i}') for i, x in enumerate(design)],
+            exp.alias_(exp.cast(column(self.target), 'DOUBLE'), '_y'),
+        ).from_(rows)
+        gram, cells = _cross_products(len(design))
+        aggregates = [
+            'count(*) AS n',
+            *gram,
+            *(f'sum(_x{i} * _y) AS r{i}' for i in range(len(design))),
+        ]
+        return _aggregate_over(aggregates, projected), cells
+
+    def fit(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> LinearRegression:
+        """Fit on `source` (a table name or query)."""
+        with connection_or_pool(connection) as cursor:
+            features = self._resolve_features(source_schema(source, cursor))
+            query, cells = self._normal_equations(source, features)
+            row = fetch_one_dict(cursor, query)
+        if not row['n']:
+            raise ValueError('No complete rows to fit on')
+
+        size = len(features) + int(self.fit_intercept)
+        gram = np.zeros((size, size))
+        for index, (i, j) in enumerate(cells):
+            gram[i, j] = gram[j, i] = row[f'h{index}']
+        rhs = np.array([row[f'r{i}'] for i in range(size)], dtype=float)
+        beta = _solve(gram + self._penalty(size), rhs)
+        self.n_samples_: int = int(row['n'])
+        self._set_coefficients(features, beta)
+        return self
+
+    def score(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> float:
+        """Coefficient of determination R^2 on `source`, in one scan."""
+        y = exp.cast(column(self.target), 'DOUBLE')
+        residual = exp.Sub(
+            this=y.copy(), expression=exp.paren(self.predict_expression())
+        )
+        rows = self._complete_rows(source, self.features_).subquery('_rows')
+        query = exp.select(
+            exp.alias_(_sum_of(residual, residual), 'ss_res'),
+            exp.alias_(exp.func('var_pop', y), 'var'),
+            exp.alias_(exp.func('count', exp.Star()), 'n'),
+        ).from_(rows)
+        with connection_or_pool(connection) as cursor:
+            row = fetch_one_dict(cursor, query)
+        ss_tot = (row['var'] or 0.0) * row['n']
+        if not ss_tot:
+            return 0.0
+        return 1.0 - row['ss_res'] / ss_tot
+
+
+class LogisticRegression(_LinearModel):
+    """Binary logistic regression fitted by IRLS (Newton's method).
+
+    Each iteration is one aggregate query returning the gradient
+    X^T (y - p) and Hessian X^T W X at the current coefficients, so
+    the data never leaves DuckDB. The target must be 0/1 (or boolean).
+    """
+
+    def __init__(
+        self,
+        target: str,
+        features: Sequence[str] | None = None,
+        *,
+        fit_intercept: bool = True,
+        alpha: float = 0.0,
+        max_iter: int = 25,
+        tol: float = 1e-8,
+    ) -> None:
+        """As `_LinearModel`; stops when no coefficient moves by `tol`."""
+        super().__init__(
+            target, features, fit_intercept=fit_intercept, alpha=alpha
+        )
+        self.max_iter: int = max_iter
+        self.tol: float = tol
+
+    def _irls_step(
+        self,
+        source: str | exp.Expr,
+        features: Sequence[str],
+        beta: np.ndarray,
+    ) -> tuple[str, list[tuple[int, int]]]:
+        design = self._design(features)
+        eta: exp.Expr = _double(0.0)
+        for coefficient, x in zip(beta, design, strict=True):
+            eta = exp.Add(
+                this=eta,
+                expression=exp.Mul(
+                    this=_double(coefficient), expression=x.copy()
+                ),
+            )
+        rows = self._complete_rows(source, features)
+        scored = exp.select(
+            *[exp.alias_(x, f'_x{i}') for i, x in enumerate(design)],
+            exp.alias_(exp.cast(column(self.target), 'DOUBLE'), '_y'),
+            exp.alias_(_sigmoid(eta), '_p'),
+        ).from_(rows.subquery('_rows'))
+
+        hessian, cells = _cross_products(len(design), '_p * (1 - _p)')
+        aggregates = [
+            'count(*) AS n',
+            'bool_and(_y IN (0, 1)) AS binary',
+            *hessian,
+            *(f'sum(_x{i} * (_y - _p)) AS g{i}' for i in range(len(design))),
+        ]
+        return _aggregate_over(aggregates, scored), cells
+
+    def fit(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> LogisticRegression:
+        """Fit on `source` (a table name or query) by IRLS."""
+        if self.max_iter < 1:
+            raise ValueError(
+                f'max_iter must be at least 1, got {self.max_iter}'
+            )
+        if not self.tol >= 0:
+            raise ValueError(f'tol must be non-negative, got {self.tol}')
+        with connection_or_pool(connection) as cursor:
+            features = self._resolve_features(source_schema(source, cursor))
+            size = len(features) + int(self.fit_intercept)
+            penalty = self._penalty(size)
+            beta = np.zeros(size)
+            self.n_iter_: int = 0
+            for _ in range(self.max_iter):
+                query, cells = self._irls_step(source, features, beta)
+                row = fetch_one_dict(cursor, query)
+                if not row['n']:
+                    raise ValueError('No complete rows to fit on')
+                if not row['binary']:
+                    raise ValueError(
+                        f'Target {self.target!r} must only hold 0 and 1'
+                    )
+                hessian = np.zeros((size, size))
+                for index, (i, j) in enumerate(cells):
+                    hessian[i, j] = hessian[j, i] = row[f'h{index}']
+                gradient = np.array(
+                    [row[f'g{i}'] for i in range(size)], dtype=float
+                )
+                step = _solve(hessian + penalty, gradient - penalty @ beta)
+                beta = beta + step
+                self.n_iter_ += 1
+                if np.max(np.abs(step)) < self.tol:
+                    break
+        self.n_samples_: int = int(row['n'])
+        self._set_coefficients(features, beta)
+        return self
+
+    def predict_proba_expression(self) -> exp.Expr:
+        """P(target = 1) for one row as a sqlglot expression."""
+        return _sigmoid(self.decision_expression())
+
+    def predict_expression(self) -> exp.Expr:
+        """The predicted class (0 or 1) as a sqlglot expression."""
+        decision = exp.GTE(
+            this=exp.paren(self.decision_expression()),
+            expression=_double(0.0),
+        )
+        return exp.cast(decision, 'INTEGER')
+
+    def predict_proba_sql(
+        self,
+        source: str | exp.Expr,
+        output: str = 'probability',
+    ) -> str:
+        """`SELECT *, <P(target = 1)> AS output FROM source`."""
+        probability = exp.alias_(
+            self.predict_proba_expression(), output, quoted=True
+        )
+        return to_sql(select_from([exp.Star(), probability], source))
+
+    def score(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> float:
+        """Accuracy of the predicted classes on `source`, in one scan."""
+        correct = exp.EQ(
+            this=self.predict_expression(),
+            expression=exp.cast(column(self.target), 'INTEGER'),
+        )
+        rows = self._complete_rows(source, self.features_).subquery('_rows')
+        query = exp.select(
+            exp.alias_(
+                exp.func('avg', exp.cast(correct, 'DOUBLE')), 'accuracy'
+            )
+        ).from_(rows)
+        with connection_or_pool(connection) as cursor:
+            row = fetch_one_dict(cursor, query)
+        return float(row['accuracy'] or 0.0)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import copy
+import re
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import duckdb
+from sqlglot import exp
+
+from engine.engine_pool import ConnectionManager, Engine
+from learn.learn_base import SOURCE_ALIAS, column, source_expression, to_sql
+
+# Buckets used to turn a row hash into a fraction for train/test split.
+_SPLIT_BUCKETS = 10_000
+_VIEW_PREFIX_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _aliased_source(source: str | exp.Expr) -> exp.Expr:
+    """FROM-clause source aliased as `_src`, so its rows can be hashed."""
+    node = source_expression(source)
+    if isinstance(node, exp.Table) and not node.alias:
+        node = node.copy()
+        alias = exp.TableAlias(this=exp.to_identifier(SOURCE_ALIAS))
+        node.set('alias', alias)
+    return node
+
+
+def row_hash(seed: int = 0, key: Sequence[str] | None = None) -> exp.Expr:
+    """Deterministic per-row hash mixed with `seed`.
+
+    Hashes the `key` columns if given, else the whole row (so identical
+    rows always land in the same fold).
+    """
+    values: list[exp.Expr] = (
+        [column(name) for name in key] if key else [exp.column(SOURCE_ALIAS)]
+    )
+    return exp.func('hash', *values, exp.convert(int(seed)))
+
+
+def _bucketed(
+    source: str | exp.Expr,
+    condition: exp.Expr,
+) -> exp.Select:
+    return (
+        exp.select(exp.Star()).from_(_aliased_source(source)).where(condition)
+    )
+
+
+def _bucket(seed: int, key: Sequence[str] | None, buckets: int) -> exp.Mod:
+    return exp.Mod(this=row_hash(seed, key), expression=exp.convert(buckets))
+
+
+def train_test_split(
+    source: str | exp.Expr,
+    *,
+    test_size: float = 0.25,
+    seed: int = 0,
+    key: Sequence[str] | None = None,
+) -> tuple[exp.Select, exp.Select]:
+    """Split `source` into (train, test) queries; no data is copied.
+
+    Each row goes to the test side when its hash falls in the first
+    `test_size` share of buckets, so the split is deterministic for a
+    given seed and the two sides are exact complements.
+    """
+    if not 0 < test_size < 1:
+        raise ValueError(f'test_size must be in (0, 1), got {test_size}')
+    cut = exp.convert(round(test_size * _SPLIT_BUCKETS))
+    bucket = _bucket(seed, key, _SPLIT_BUCKETS)
+    train = _bucketed(source, exp.GTE(this=bucket, expression=cut))
+    test = _bucketed(source, exp.LT(this=bucket.copy(), expression=cut))
+    return train, test
+
+
+class KFold:
+    """K-fold splitter assigning rows to folds by `hash(row) % k`.
+
+    Folds are plain queries over the source (or views created by
+    `create_views`), never copies of the data.
+    """
+
+    def __init__(
+        self,
+        n_splits: int = 5,
+        *,
+        seed: int = 0,
+        key: Sequence[str] | None = None,
+    ) -> None:
+        """Split into `n_splits` folds, hashing `key` columns or rows."""
+        if n_splits < 2:
+            raise ValueError(f'n_splits must be at least 2, got {n_splits}')
+        self.n_splits: int = n_splits
+        self.seed: int = seed
+        self.key: list[str] | None = list(key) if key else None
+
+    def fold_expression(self) -> exp.Expr:
+        """The fold number (0 .. n_splits - 1) of a row, as SQL."""
+        return _bucket(self.seed, self.key, self.n_splits)
+
+    def split(
+        self, source: str | exp.Expr
+    ) -> Iterator[tuple[exp.Select, exp.Select]]:
+        """Yield (train, test) queries for each fold in turn."""
+        for fold in range(self.n_splits):
+            index = exp.convert(fold)
+            yield (
+                _bucketed(
+                    source,
+                    exp.NEQ(this=self.fold_expression(), expression=index),
+                ),
+                _bucketed(
+                    source,
+                    exp.EQ(this=self.fold_expression(), expression=index),
+                ),
+            )
+
+    def create_views(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+        prefix: str,
+    ) -> list[tuple[str, str]]:
+        """Create `<prefix>_train_<i>` / `<prefix>_test_<i>` views.
+
+        Views live in the database catalog (not TEMP), so every pooled
+        cursor can read them. Returns the (train, test) view names.
+        """
+        if not _VIEW_PREFIX_RE.match(prefix):
+            raise ValueError(f'Invalid view prefix {prefix!r}')
+        names: list[tuple[str, str]] = []
+        for fold, (train, test) in enumerate(self.split(source)):
+            pair = (f'{prefix}_train_{fold}', f'{prefix}_test_{fold}')
+            for name, query in zip(pair, (train, test), strict=True):
+                connection.execute(
+                    f'CREATE OR REPLACE VIEW {name} AS {to_sql(query)}'
+                )
+            names.append(pair)
+        return names
+
+
+@dataclass
+class CrossValidation:
+    """Per-fold scores and timings of one `cross_validate` run."""
+
+    scores: list[float] = field(default_factory=list)
+    fit_seconds: list[float] = field(default_factory=list)
+    estimators: list[Any] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        """Mean score across folds."""
+        return sum(self.scores) / len(self.scores)
+
+    def to_dict(self) -> dict:
+        return {
+            'scores': self.scores,
+            'mean': self.mean,
+            'fit_seconds': self.fit_seconds,
+        }
+
+
+def cross_validate(
+    estimator: Any,
+    source: str | exp.Expr,
+    *,
+    cv: KFold | int = 5,
+    manager: ConnectionManager | None = None,
+    max_workers: int | None = None,
+) -> CrossValidation:
+    """Fit and score a copy of `estimator` on every fold concurrently.
+
+    Each fold runs on its own pooled cursor from `manager` (the shared
+    Engine by default), so `source` must be a table, view or query the
+    pool's database can see. At most `max_workers` folds run at once;
+    by default as many as the pool has cursors.
+    """
+    splitter = KFold(cv) if isinstance(cv, int) else cv
+    manager = manager or Engine
+    folds = list(splitter.split(source))
+    workers = max_workers or min(len(folds), manager.pool().size)
+
+    def run_fold(
+        train: exp.Select, test: exp.Select
+    ) -> tuple[Any, float, float]:
+        model = copy.deepcopy(estimator)
+        with manager.cursor() as cursor:
+            started = time.perf_counter()
+            model.fit(train, cursor)
+            seconds = time.perf_counter() - started
+            return model, model.score(test, cursor), seconds
+
+    result = CrossValidation()
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix='ducklearn-cv'
+    ) as pool:
+        for model, score, seconds in pool.map(
+            lambda fold: run_fold(*fold), folds
+        ):
+            result.estimators.append(model)
+            result.scores.append(score)
+            result.fit_seconds.append(seconds)
+    return result
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+import duckdb
+import sqlglot
+from sqlglot import exp
+
+from learn.learn_base import (
+    NotFittedError,
+    SQLTransformer,
+    connection_or_pool,
+    select_from,
+    to_sql,
+)
+from learn.learn_linear import PREDICTION_COLUMN
+
+# Prefix of the temp table holding a materialized estimator input.
+_MATERIALIZED_PREFIX = '__ducklearn_fit_'
+
+
+class Filter:
+    """Pipeline step keeping only rows where `condition` holds.
+
+    The condition may reference columns produced by earlier steps; the
+    pipeline rewrites it onto the source columns and pushes it down to
+    the scan.
+    """
+
+    def __init__(self, condition: str | exp.Expr) -> None:
+        """Keep rows matching `condition` (a SQL boolean expression)."""
+        self.condition: exp.Expr = (
+            condition
+            if isinstance(condition, exp.Expr)
+            else sqlglot.condition(condition, dialect='duckdb')
+        )
+
+    def __repr__(self) -> str:
+        return f'Filter({to_sql(self.condition)!r})'
+
+
+class _Plan:
+    """A fused plan: output columns and row filters over one source.
+
+    `columns` maps each output name to an expression over the source's
+    own columns (None means the source is passed through as `*`), so
+    stacking another step substitutes into these expressions instead of
+    adding a subquery.
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict[str, tuple[str, exp.Expr]] | None = None
+        self.conditions: list[exp.Expr] = []
+
+    def inline(self, node: exp.Expr) -> exp.Expr:
+        """Rewrite column references in `node` onto the source columns."""
+        if self.columns is None:
+            return node.copy()
+        columns = self.columns
+
+        def substitute(child: exp.Expr) -> exp.Expr:
+            if isinstance(child, exp.Column) and not child.table:
+                found = columns.get(child.name.lower())
+                if found is not None:
+                    inner = found[1].copy()
+                    if isinstance(inner, exp.Binary):
+                        return exp.paren(inner, copy=False)
+                    return inner
+            return child
+
+        return node.copy().transform(substitute)
+
+    def project(self, projections: Sequence[exp.Expr]) -> None:
+        """Stack a SELECT list on top of the plan."""
+        fused: dict[str, tuple[str, exp.Expr]] = {}
+        for node in projections:
+            name = node.alias_or_name
+            fused[name.lower()] = (name, self.inline(node.unalias()))
+        self.columns = fused
+
+    def filter(self, condition: exp.Expr) -> None:
+        """Stack a WHERE condition on top of the plan."""
+        self.conditions.append(self.inline(condition))
+
+    def query(
+        self,
+        source: str | exp.Expr,
+        extra: Sequence[exp.Expr] = (),
+    ) -> exp.Select:
+        """The whole plan as a single SELECT over `source`."""
+        if self.columns is None:
+            projections: list[exp.Expr] = [exp.Star()]
+        else:
+            projections = [
+                expr
+                if isinstance(expr, exp.Column) and expr.name == name
+                else exp.alias_(expr, name, quoted=True)
+                for name, expr in self.columns.values()
+            ]
+        projections += [
+            exp.alias_(self.inline(node.unalias()), node.alias, quoted=True)
+            for node in extra
+        ]
+        select = select_from(projections, source)
+        if self.conditions:
+            select = select.where(exp.and_(*self.conditions))
+        return select
+
+
+class Pipeline:
+    """Chain of transformers, filters and an optional final estimator.
+
+    Steps are composed lazily into ONE sqlglot SELECT: consecutive
+    projections are fused by substituting expressions into each other,
+    and filters are rewritten onto the source columns so they run at the
+    scan. Fitting a step reads the fused plan of the steps before it as
+    a subquery, so no intermediate table is written; `fit(...,
+    materialize=True)` is the one exception, writing the estimator's
+    input to a temp table once for iterative estimators.
+    """
+
+    def __init__(self, steps: Sequence[Any]) -> None:
+        """Build from steps, each `step` or `(name, step)`."""
+        named: list[tuple[str, Any]] = []
+        for step in steps:
+            name, step = (
+                step
+                if isinstance(step, tuple)
+                else (type(step).__name__.lower(), step)
+            )
+            if any(name == existing for existing, _ in named):
+                raise ValueError(f'Duplicate step name {name!r}')
+            named.append((name, step))
+        for index, (name, step) in enumerate(named):
+            if isinstance(step, SQLTransformer | Filter):
+                continue
+            if not hasattr(step, 'predict_expression'):
+                raise TypeError(
+                    f'Step {name!r} is not a transformer, filter or estimator'
+                )
+            if index != len(named) - 1:
+                raise ValueError(
+                    f'Estimator {name!r} must be the last pipeline step'
+                )
+        self.steps: list[tuple[str, Any]] = named
+
+    @property
+    def named_steps(self) -> dict[str, Any]:
+        """Steps by name."""
+        return dict(self.steps)
+
+    @property
+    def estimator(self) -> Any | None:
+        """The final estimator, if the pipeline has one."""
+        if self.steps and not isinstance(
+            self.steps[-1][1], SQLTransformer | Filter
+        ):
+            return self.steps[-1][1]
+        return None
+
+    def _preprocessing(self) -> list[SQLTransformer | Filter]:
+        steps = [step for _, step in self.steps]
+        return steps[:-1] if self.estimator is not None else steps
+
+    def _plan(self) -> _Plan:
+        plan = _Plan()
+        for step in self._preprocessing():
+            if isinstance(step, Filter):
+                plan.filter(step.condition)
+            else:
+                plan.project(step.projections())
+        return plan
+
+    # --- Fitting ---
+    def fit(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+        *,
+        materialize: bool = False,
+    ) -> Pipeline:
+        """Fit every step in order on `source` (a table name or query).
+
+        Each step fits on the fused plan of the steps before it. With
+        `materialize=True` the final estimator's input is written once
+        to a temp table, which pays off for estimators that scan their
+        input many times (e.g. logistic regression).
+        """
+        plan = _Plan()
+        with connection_or_pool(connection) as cursor:
+            for step in self._preprocessing():
+                if isinstance(step, Filter):
+                    plan.filter(step.condition)
+                    continue
+                step.fit(plan.query(source), cursor)
+                plan.project(step.projections())
+
+            estimator = self.estimator
+            if estimator is None:
+                return self
+            if not materialize:
+                estimator.fit(plan.query(source), cursor)
+                return self
+            table = f'{_MATERIALIZED_PREFIX}{uuid.uuid4().hex}'
+            cursor.execute(
+                f'CREATE TEMP TABLE {table} AS {to_sql(plan.query(source))}'
+            )
+            try:
+                estimator.fit(table, cursor)
+            finally:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        return self
+
+    # --- Fused SQL ---
+    def transform_query(self, source: str | exp.Expr) -> exp.Select:
+        """Every transformer and filter fused into one SELECT."""
+        return self._plan().query(source)
+
+    def transform_sql(self, source: str | exp.Expr) -> str:
+        """`transform_query` rendered as DuckDB SQL."""
+        return to_sql(self.transform_query(source))
+
+    def transform(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+    ) -> duckdb.DuckDBPyRelation:
+        """Lazy relation of the transformed `source`."""
+        return connection.sql(self.transform_sql(source))
+
+    def predict_expression(self) -> exp.Expr:
+        """The prediction for one source row as a single expression.
+
+        Every transform is inlined; Filter steps are not applied, so
+        this scores any row (used for online, row-at-a-time scoring).
+        """
+        estimator = self.estimator
+        if estimator is None:
+            raise NotFittedError('Pipeline has no final estimator')
+        return self._plan().inline(estimator.predict_expression())
+
+    def predict_query(
+        self,
+        source: str | exp.Expr,
+        output: str = PREDICTION_COLUMN,
+    ) -> exp.Select:
+        """Transformed columns plus the estimator's prediction, fused."""
+        estimator = self.estimator
+        if estimator is None:
+            raise NotFittedError('Pipeline has no final estimator')
+        prediction = exp.alias_(estimator.predict_expression(), output)
+        return self._plan().query(source, [prediction])
+
+    def predict_sql(
+        self,
+        source: str | exp.Expr,
+        output: str = PREDICTION_COLUMN,
+    ) -> str:
+        """`predict_query` rendered as DuckDB SQL."""
+        return to_sql(self.predict_query(source, output))
+
+    def predict(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection,
+        output: str = PREDICTION_COLUMN,
+    ) -> duckdb.DuckDBPyRelation:
+        """Lazy relation of `source` transformed and scored."""
+        return connection.sql(self.predict_sql(source, output))
+
+    def score(
+        self,
+        source: str | exp.Expr,
+        connection: duckdb.DuckDBPyConnection | None = None,
+    ) -> float:
+        """The final estimator's score on the transformed `source`."""
+        estimator = self.estimator
+        if estimator is None:
+            raise NotFittedError('Pipeline has no final estimator')
+        return estimator.score(self.transform_query(source), connection)
+
+    def explain(self, source: str | exp.Expr) -> str:
+        """The fused SQL the pipeline runs on `source`, pretty-printed.
+
+        Shows the prediction query when the pipeline ends in a fitted
+        estimator, otherwise the transform query.
+        """
+        estimator = self.estimator
+        if estimator is not None and hasattr(estimator, 'coef_'):
+            query = self.predict_query(source)
+        else:
+            query = self.transform_query(source)
+        return query.sql(dialect='duckdb', pretty=True)
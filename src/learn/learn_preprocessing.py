@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from typing import Any, Literal
+
+from sqlglot import exp
+
+from learn.learn_base import SQLTransformer, column
+
+ImputeStrategy = Literal['mean', 'median', 'most_frequent', 'constant']
+
+
+def _number(value: float) -> exp.Expr:
+    """Literal for a fitted statistic, typed DOUBLE so it never truncates."""
+    return exp.cast(exp.convert(float(value)), 'DOUBLE')
+
+
+def _category_suffix(value: object) -> str:
+    """Column-name-friendly rendering of a category value."""
+    return re.sub(r'\s+', '_', str(value))
+
+
+class StandardScaler(SQLTransformer):
+    """Scale columns to zero mean and unit (population) variance.
+
+    Compiles to `(x - mean) / std`; constant columns get `std = 1` so
+    they map to 0 rather than NULL/inf, as in scikit-learn.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] | None = None,
+        *,
+        with_mean: bool = True,
+        with_std: bool = True,
+    ) -> None:
+        """Scale `columns` (numeric columns if None)."""
+        super().__init__(columns)
+        self.with_mean: bool = with_mean
+        self.with_std: bool = with_std
+
+    def _fit_aggregates(self, column_name: str) -> dict[str, exp.Expr]:
+        x = exp.cast(column(column_name), 'DOUBLE')
+        return {
+            'mean': exp.func('avg', x),
+            'std': exp.func('stddev_pop', x),
+        }
+
+    def _reset_fitted(self) -> None:
+        self.mean_: dict[str, float] = {}
+        self.scale_: dict[str, float] = {}
+
+    def _set_fitted(self, column_name: str, stats: dict[str, Any]) -> None:
+        std = stats['std']
+        self.mean_[column_name] = float(stats['mean'] or 0.0)
+        self.scale_[column_name] = float(std) if std else 1.0
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        expr: exp.Expr = exp.cast(column(column_name), 'DOUBLE')
+        if self.with_mean:
+            expr = exp.Sub(
+                this=expr, expression=_number(self.mean_[column_name])
+            )
+        if self.with_std:
+            expr = exp.Div(
+                this=exp.paren(expr, copy=False),
+                expression=_number(self.scale_[column_name]),
+            )
+        return [exp.alias_(expr, column_name, quoted=True)]
+
+
+class MinMaxScaler(SQLTransformer):
+    """Scale columns linearly into `feature_range` (default [0, 1]).
+
+    Constant columns map to the lower bound of the range.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] | None = None,
+        *,
+        feature_range: tuple[float, float] = (0.0, 1.0),
+    ) -> None:
+        """Scale `columns` (numeric columns if None) into `feature_range`."""
+        low, high = feature_range
+        if low >= high:
+            raise ValueError(
+                f'feature_range minimum must be below maximum, got '
+                f'{feature_range}'
+            )
+        super().__init__(columns)
+        self.feature_range: tuple[float, float] = (low, high)
+
+    def _fit_aggregates(self, column_name: str) -> dict[str, exp.Expr]:
+        x = exp.cast(column(column_name), 'DOUBLE')
+        return {'min': exp.func('min', x), 'max': exp.func('max', x)}
+
+    def _reset_fitted(self) -> None:
+        self.data_min_: dict[str, float] = {}
+        self.data_max_: dict[str, float] = {}
+
+    def _set_fitted(self, column_name: str, stats: dict[str, Any]) -> None:
+        self.data_min_[column_name] = float(stats['min'] or 0.0)
+        self.data_max_[column_name] = float(stats['max'] or 0.0)
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        low, high = self.feature_range
+        data_min = self.data_min_[column_name]
+        span = self.data_max_[column_name] - data_min
+        scale = (high - low) / span if span else 0.0
+        # x * scale + (low - min * scale): one multiply-add per row.
+        expr = exp.Add(
+            this=exp.Mul(
+                this=exp.cast(column(column_name), 'DOUBLE'),
+                expression=_number(scale),
+            ),
+            expression=_number(low - data_min * scale),
+        )
+        return [exp.alias_(expr, column_name, quoted=True)]
+
+
+class _CategoricalTransformer(SQLTransformer):
+    """Shared fitting of the sorted distinct categories of each column."""
+
+    def _default_columns(self, schema: dict[str, str]) -> list[str]:
+        return [name for name, kind in schema.items() if kind == 'VARCHAR']
+
+    def _fit_aggregates(self, column_name: str) -> dict[str, exp.Expr]:
+        x = column(column_name)
+        # list(DISTINCT x ORDER BY x) FILTER (WHERE x IS NOT NULL)
+        categories = exp.ArrayAgg(
+            this=exp.Order(
+                this=exp.Distinct(expressions=[x]),
+                expressions=[exp.Ordered(this=x.copy(), nulls_first=False)],
+            )
+        )
+        not_null = exp.not_(exp.Is(this=x.copy(), expression=exp.null()))
+        return {
+            'categories': exp.Filter(
+                this=categories, expression=exp.Where(this=not_null)
+            )
+        }
+
+    def _reset_fitted(self) -> None:
+        self.categories_: dict[str, list[object]] = {}
+
+    def _set_fitted(self, column_name: str, stats: dict[str, Any]) -> None:
+        self.categories_[column_name] = list(stats['categories'] or [])
+
+
+class OneHotEncoder(_CategoricalTransformer):
+    """Replace each categorical column by one 0/1 column per category.
+
+    Output columns are named `<column>_<category>` and typed TINYINT;
+    unseen categories and NULL encode as all zeros.
+    """
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        out: list[exp.Expr] = []
+        for value in self.categories_[column_name]:
+            equal = exp.EQ(
+                this=column(column_name), expression=exp.convert(value)
+            )
+            hit = exp.func('coalesce', equal, exp.false())
+            name = f'{column_name}_{_category_suffix(value)}'
+            out.append(exp.alias_(exp.cast(hit, 'TINYINT'), name, quoted=True))
+        return out
+
+
+class OrdinalEncoder(_CategoricalTransformer):
+    """Replace each categorical column by its category's index.
+
+    Categories are numbered in sorted order from 0; unseen values and
+    NULL encode as `unknown_value` (default -1).
+    """
+
+    def __init__(
+        self, columns: Sequence[str] | None = None, *, unknown_value: int = -1
+    ) -> None:
+        """Encode `columns` (VARCHAR columns if None)."""
+        super().__init__(columns)
+        self.unknown_value: int = unknown_value
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        categories = exp.Array(
+            expressions=[
+                exp.convert(value) for value in self.categories_[column_name]
+            ]
+        )
+        position = exp.func('list_position', categories, column(column_name))
+        expr = exp.func(
+            'coalesce',
+            exp.Sub(this=position, expression=exp.convert(1)),
+            exp.convert(self.unknown_value),
+        )
+        expr = exp.cast(expr, 'INTEGER')
+        return [exp.alias_(expr, column_name, quoted=True)]
+
+
+class SimpleImputer(SQLTransformer):
+    """Fill NULLs with a per-column statistic or a constant.
+
+    `mean` and `median` apply to numeric columns, `most_frequent` to
+    any column; `constant` fills with `fill_value` and reads no data.
+    """
+
+    _AGGREGATES = {'mean': 'avg', 'median': 'median', 'most_frequent': 'mode'}
+
+    def __init__(
+        self,
+        columns: Sequence[str] | None = None,
+        *,
+        strategy: ImputeStrategy = 'mean',
+        fill_value: object = None,
+    ) -> None:
+        """Impute `columns` (numeric columns if None) with `strategy`."""
+        if strategy not in (*self._AGGREGATES, 'constant'):
+            raise ValueError(f'Unknown imputation strategy {strategy!r}')
+        if strategy == 'constant' and fill_value is None:
+            raise ValueError("strategy='constant' requires a fill_value")
+        super().__init__(columns)
+        self.strategy: ImputeStrategy = strategy
+        self.fill_value: object = fill_value
+
+    def _fit_aggregates(self, column_name: str) -> dict[str, exp.Expr]:
+        if self.strategy == 'constant':
+            return {}
+        func = self._AGGREGATES[self.strategy]
+        return {'fill': exp.func(func, column(column_name))}
+
+    def _reset_fitted(self) -> None:
+        self.statistics_: dict[str, object] = {}
+
+    def _set_fitted(self, column_name: str, stats: dict[str, Any]) -> None:
+        if self.strategy == 'constant':
+            self.statistics_[column_name] = self.fill_value
+        else:
+            self.statistics_[column_name] = stats['fill']
+
+    def _column_projections(self, column_name: str) -> list[exp.Expr]:
+        fill = self.statistics_[column_name]
+        if fill is None:
+            # All-NULL column: nothing to impute from.
+            return [column(column_name)]
+        expr = exp.func('coalesce', column(column_name), exp.convert(fill))
+        return [exp.alias_(expr, column_name, quoted=True)]
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+import sqlglot
+from platformdirs import user_data_dir
+from sqlglot import exp
+
+from learn.learn_linear import LinearRegression, LogisticRegression
+from learn.learn_pipeline import Filter, Pipeline
+from learn.learn_preprocessing import (
+    MinMaxScaler,
+    OneHotEncoder,
+    OrdinalEncoder,
+    SimpleImputer,
+    StandardScaler,
+)
+
+# Bump when the on-disk layout changes incompatibly.
+FORMAT_VERSION = 1
+# Lists and dicts with at least this many items go to binary files.
+INLINE_LIMIT = 64
+_METADATA = 'model.json'
+
+# Classes that may be saved; loading never imports anything else.
+MODEL_CLASSES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        StandardScaler,
+        MinMaxScaler,
+        OneHotEncoder,
+        OrdinalEncoder,
+        SimpleImputer,
+        LinearRegression,
+        LogisticRegression,
+        Pipeline,
+        Filter,
+    )
+}
+
+
+class ModelNotFoundError(KeyError):
+    """Raised for an unknown model id."""
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """Metadata of one stored model (no fitted state)."""
+
+    id: str
+    name: str | None
+    kind: str
+    created_at: str
+    path: Path
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'kind': self.kind,
+            'created_at': self.created_at,
+        }
+
+
+def _numeric_array(items: list) -> np.ndarray | None:
+    """`items` as an int64 or float64 array, if all are of that kind."""
+    if all(isinstance(item, float) for item in items):
+        return np.asarray(items, dtype=np.float64)
+    if all(
+        isinstance(item, int) and not isinstance(item, bool) for item in items
+    ):
+        try:
+            return np.asarray(items, dtype=np.int64)
+        except OverflowError:
+            return None
+    return None
+
+
+def _as_list(value: Any) -> Any:
+    return value.tolist() if isinstance(value, np.ndarray) else value
+
+
+class _Encoder:
+    """Turns a fitted object into JSON-able state plus binary arrays.
+
+    Large lists of all ints or all floats become `.npy` files of that
+    dtype, loaded back as read-only memory-mapped arrays; large string
+    lists become single-column Parquet files. Everything else stays
+    inline in the orjson metadata.
+    """
+
+    def __init__(self) -> None:
+        self.arrays: dict[str, np.ndarray | pa.Table] = {}
+
+    def _store(self, data: np.ndarray | pa.Table, suffix: str) -> dict:
+        name = f'a{len(self.arrays)}{suffix}'
+        self.arrays[name] = data
+        return {'__file__': name}
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, np.generic):
+            return value.item()
+        if value is None or isinstance(value, bool | int | float | str):
+            return value
+        if isinstance(value, Decimal):
+            return {'__decimal__': str(value)}
+        if isinstance(value, dt.datetime):
+            return {'__datetime__': value.isoformat()}
+        if isinstance(value, dt.date):
+            return {'__date__': value.isoformat()}
+        if isinstance(value, exp.Expr):
+            return {'__sql__': value.sql(dialect='duckdb')}
+        if isinstance(value, tuple):
+            return {'__tuple__': [self.encode(item) for item in value]}
+        if isinstance(value, np.ndarray):
+            return self._store(np.ascontiguousarray(value), '.npy')
+        if isinstance(value, list):
+            return self._encode_list(value)
+        if isinstance(value, dict):
+            if len(value) >= INLINE_LIMIT:
+                return {
+                    '__dict__': [
+                        self._encode_list(list(value)),
+                        self._encode_list(list(value.values())),
+                    ]
+                }
+            return {
+                '__map__': [
+                    [self.encode(k), self.encode(v)] for k, v in value.items()
+                ]
+            }
+        kind = type(value).__name__
+        if MODEL_CLASSES.get(kind) is type(value):
+            return {
+                '__object__': kind,
+                'state': {k: self.encode(v) for k, v in vars(value).items()},
+            }
+        raise TypeError(f'Cannot store value of type {kind}')
+
+    def _encode_list(self, items: list) -> Any:
+        if len(items) >= INLINE_LIMIT:
+            array = _numeric_array(items)
+            if array is not None:
+                return self._store(array, '.npy')
+            if all(isinstance(item, str) for item in items):
+                return self._store(pa.table({'values': items}), '.parquet')
+        return [self.encode(item) for item in items]
+
+
+class _Decoder:
+    """Inverse of `_Encoder`, reading arrays from one model directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root: Path = root
+
+    def _load(self, name: str) -> np.ndarray | list:
+        path = self.root / name
+        if name.endswith('.npy'):
+            # Left memory-mapped: the OS pages in what scoring touches.
+            return np.load(path, mmap_mode='r', allow_pickle=False)
+        return pq.read_table(path, memory_map=True)['values'].to_pylist()
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if '__file__' in value:
+            return self._load(value['__file__'])
+        if '__map__' in value:
+            return {
+                self.decode(k): self.decode(v) for k, v in value['__map__']
+            }
+        if '__dict__' in value:
+            # Dict entries must be Python objects, so arrays become lists.
+            keys, values = (
+                _as_list(self.decode(part)) for part in value['__dict__']
+            )
+            return dict(zip(keys, values, strict=True))
+        if '__tuple__' in value:
+            return tuple(self.decode(item) for item in value['__tuple__'])
+        if '__decimal__' in value:
+            return Decimal(value['__decimal__'])
+        if '__datetime__' in value:
+            return dt.datetime.fromisoformat(value['__datetime__'])
+        if '__date__' in value:
+            return dt.date.fromisoformat(value['__date__'])
+        if '__sql__' in value:
+            return sqlglot.parse_one(value['__sql__'], dialect='duckdb')
+        if '__object__' in value:
+            cls = MODEL_CLASSES.get(value['__object__'])
+            if cls is None:
+                raise ValueError(f'Unknown model class {value["__object__"]}')
+            obj: Any = object.__new__(cls)
+            obj.__dict__.update(
+                {k: self.decode(v) for k, v in value['state'].items()}
+            )
+            return obj
+        raise ValueError(f'Unrecognized stored value {sorted(value)}')
+
+
+def _content_hash(state_bytes: bytes, arrays: dict) -> str:
+    digest = hashlib.sha256(state_bytes)
+    for name in sorted(arrays):
+        data = arrays[name]
+        digest.update(name.encode())
+        if isinstance(data, np.ndarray):
+            digest.update(data.tobytes())
+        else:
+            digest.update(orjson.dumps(data['values'].to_pylist()))
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Content-addressed store of fitted transformers, models and pipelines.
+
+    Each model lives in `<root>/<id>/`: `model.json` (orjson metadata
+    and small state) next to `.npy`/Parquet files for large arrays. The
+    id is a hash of the fitted state, so saving the same model twice is
+    a no-op. Loaded models are cached per process and must be treated
+    as read-only.
+    """
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        """Store under `root` (default: the platformdirs data dir)."""
+        self.root: Path = (
+            Path(root)
+            if root is not None
+            else Path(user_data_dir('DuckLearn')) / 'models'
+        )
+        self._loaded: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, model_id: str) -> Path:
+        if not model_id.startswith('m_') or not model_id[2:].isalnum():
+            raise ModelNotFoundError(model_id)
+        return self.root / model_id
+
+    # --- Save ---
+    def save(self, model: Any, name: str | None = None) -> ModelInfo:
+        """Persist a fitted model and return its metadata."""
+        encoder = _Encoder()
+        state = encoder.encode(model)
+        state_bytes = orjson.dumps(state, option=orjson.OPT_SORT_KEYS)
+        model_id = 'm_' + _content_hash(state_bytes, encoder.arrays)[:16]
+        target = self._dir(model_id)
+        if target.exists():
+            return self.info(model_id)
+
+        metadata = {
+            'id': model_id,
+            'name': name,
+            'kind': type(model).__name__,
+            'created_at': dt.datetime.now(dt.UTC).isoformat(),
+            'format_version': FORMAT_VERSION,
+            'state': state,
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix='.saving-', dir=self.root))
+        try:
+            for file_name, data in encoder.arrays.items():
+                if isinstance(data, np.ndarray):
+                    np.save(staging / file_name, data, allow_pickle=False)
+                else:
+                    pq.write_table(
+                        data, staging / file_name, compression='none'
+                    )
+            (staging / _METADATA).write_bytes(orjson.dumps(metadata))
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Saved concurrently by another worker: same content.
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return self.info(model_id)
+
+    # --- Lookup ---
+    def _metadata(self, model_id: str) -> dict:
+        path = self._dir(model_id) / _METADATA
+        try:
+            return orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            raise ModelNotFoundError(model_id) from None
+
+    def info(self, model_id: str) -> ModelInfo:
+        """Metadata of a stored model."""
+        meta = self._metadata(model_id)
+        return ModelInfo(
+            id=meta['id'],
+            name=meta['name'],
+            kind=meta['kind'],
+            created_at=meta['created_at'],
+            path=self._dir(model_id),
+        )
+
+    def list(self) -> list[ModelInfo]:
+        """All stored models, newest first."""
+        if not self.root.exists():
+            return []
+        infos = [
+            self.info(path.name)
+            for path in self.root.iterdir()
+            if path.name.startswith('m_') and (path / _METADATA).exists()
+        ]
+        return sorted(infos, key=lambda info: info.created_at, reverse=True)
+
+    def load(self, model_id: str) -> Any:
+        """Load a model, reusing the in-process copy when there is one."""
+        with self._lock:
+            cached = self._loaded.get(model_id)
+        if cached is not None:
+            return cached
+        meta = self._metadata(model_id)
+        if meta['format_version'] != FORMAT_VERSION:
+            raise ValueError(
+                f'Model {model_id} uses format {meta["format_version"]}, '
+                f'expected {FORMAT_VERSION}'
+            )
+        model = _Decoder(self._dir(model_id)).decode(meta['state'])
+        with self._lock:
+            return self._loaded.setdefault(model_id, model)
+
+    def delete(self, model_id: str) -> None:
+        """Remove a stored model."""
+        target = self._dir(model_id)
+        if not target.exists():
+            raise ModelNotFoundError(model_id)
+        with self._lock:
+            self._loaded.pop(model_id, None)
+        shutil.rmtree(target)
+
+
+# --- Global instance (optional) ---
+Models: ModelRegistry = ModelRegistry()
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping, Sequence
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+
+import pyarrow as pa
+from sqlglot import exp
+
+from engine.engine_executor import Executor, QueryExecutor
+from engine.engine_pool import ConnectionManager, Engine
+from engine.engine_scheduler import QueryScheduler, Scheduler, Slot
+from learn.learn_base import SQLTransformer, to_sql
+from learn.learn_linear import PREDICTION_COLUMN
+from learn.learn_pipeline import Pipeline
+from learn.learn_preprocessing import OneHotEncoder, OrdinalEncoder
+
+# Default time the first online request waits for others to join it.
+BATCH_WINDOW_SECONDS = 0.002
+# A batch is scored immediately once it holds this many rows.
+MAX_BATCH_ROWS = 1024
+
+# Arrow table registered on the cursor while a batch is scored.
+_BATCH_RELATION = '__ducklearn_online_rows'
+_ROW_INDEX = '__ducklearn_row'
+
+
+def scoring_sql(
+    model: Any, source: str | exp.Expr, output: str = PREDICTION_COLUMN
+) -> str:
+    """SQL scoring (or transforming) every row of `source` with `model`."""
+    if isinstance(model, SQLTransformer):
+        return model.transform_sql(source)
+    if isinstance(model, Pipeline) and model.estimator is None:
+        return model.transform_sql(source)
+    return model.predict_sql(source, output)
+
+
+def batch_scoring_sql(model: Any) -> str:
+    """SQL scoring the registered online batch, one value per row."""
+    if not hasattr(model, 'predict_expression') or (
+        isinstance(model, Pipeline) and model.estimator is None
+    ):
+        raise ValueError(
+            f'{type(model).__name__} has no estimator to score rows with'
+        )
+    prediction = exp.alias_(model.predict_expression(), PREDICTION_COLUMN)
+    query = (
+        exp.select(exp.column(_ROW_INDEX), prediction)
+        .from_(_BATCH_RELATION)
+        .order_by(exp.column(_ROW_INDEX))
+    )
+    return to_sql(query)
+
+
+def input_schema(model: Any) -> pa.Schema:
+    """Arrow schema of the columns `model` reads to score one row.
+
+    Columns a pipeline feeds to a categorical encoder are strings; all
+    other inputs are scored as numbers.
+    """
+    categorical: set[str] = set()
+    if isinstance(model, Pipeline):
+        for _, step in model.steps:
+            if isinstance(step, OneHotEncoder | OrdinalEncoder):
+                categorical.update(step.columns_)
+    names = dict.fromkeys(
+        node.name for node in model.predict_expression().find_all(exp.Column)
+    )
+    return pa.schema(
+        (name, pa.string() if name in categorical else pa.float64())
+        for name in names
+    )
+
+
+def coerce_rows(rows: Sequence[object], schema: pa.Schema) -> list[dict]:
+    """`rows` cut down to `schema`'s columns and converted to its types.
+
+    Raises ValueError naming the first row that lacks a column or holds
+    a value that does not convert.
+    """
+    coerced = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, Mapping):
+            raise ValueError(f'Row {index} is not an object')
+        missing = [name for name in schema.names if name not in row]
+        if missing:
+            raise ValueError(f'Row {index} is missing columns: {missing}')
+        values = {}
+        for column in schema:
+            try:
+                values[column.name] = _coerce(row[column.name], column.type)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(
+                    f'Row {index}, column {column.name!r}: {exc}'
+                ) from exc
+        coerced.append(values)
+    return coerced
+
+
+def _coerce(value: object, type_: pa.DataType) -> object:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int | float | str):
+        raise TypeError(f'unsupported value {value!r}')
+    if pa.types.is_string(type_):
+        return str(value)
+    return float(value)
+
+
+@dataclass
+class _Batch:
+    model_id: str
+    model: Any
+    schema: pa.Schema
+    rows: list[dict] = field(default_factory=list)
+    waiters: list[tuple[int, int, asyncio.Future]] = field(
+        default_factory=list
+    )
+    timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row scoring requests per model.
+
+    The first request for a model opens a batch and waits `window`
+    seconds; requests arriving meanwhile join it. The batch is then
+    scored by ONE vectorized query over an Arrow table on the query
+    executor, and each caller gets back its own rows' predictions.
+    With a `scheduler`, each batch waits for an interactive slot.
+    """
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        executor: QueryExecutor,
+        scheduler: QueryScheduler | None = None,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_rows: int = MAX_BATCH_ROWS,
+    ) -> None:
+        """Score on `manager`'s cursors via `executor`'s threads."""
+        self.manager: ConnectionManager = manager
+        self.executor: QueryExecutor = executor
+        self.scheduler: QueryScheduler | None = scheduler
+        self.window: float = window
+        self.max_rows: int = max_rows
+        self._batches: dict[str, _Batch] = {}
+        # Compiled scoring SQL per model id (ids are content hashes).
+        self._sql: dict[str, str] = {}
+        self._schemas: dict[str, pa.Schema] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches_run: int = 0
+
+    async def predict(
+        self, model_id: str, model: Any, rows: Sequence[dict]
+    ) -> list[object]:
+        """Predictions for `rows`, scored together with concurrent calls.
+
+        Rows are checked against the model's input columns first, so a
+        bad row fails only its own call, never the shared batch.
+        """
+        if not rows:
+            return []
+        schema = self._schemas.get(model_id)
+        if schema is None:
+            batch_scoring_sql(model)  # Raises for models that can't score.
+            schema = self._schemas[model_id] = input_schema(model)
+        rows = coerce_rows(rows, schema)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        batch = self._batches.get(model_id)
+        if batch is None:
+            batch = self._batches[model_id] = _Batch(model_id, model, schema)
+            batch.timer = loop.call_later(self.window, self._flush, model_id)
+        start = len(batch.rows)
+        batch.rows.extend(rows)
+        batch.waiters.append((start, len(batch.rows), future))
+        if len(batch.rows) >= self.max_rows:
+            self._flush(model_id)
+        return await future
+
+    def _flush(self, model_id: str) -> None:
+        batch = self._batches.pop(model_id, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        try:
+            if self.scheduler is None:
+                predictions = await self.executor.run(self._score, batch)
+            else:
+                with await self.scheduler.acquire('interactive') as slot:
+                    predictions = await self.executor.run(
+                        self._score, batch, slot
+                    )
+        except BaseException as exc:
+            for _, _, future in batch.waiters:
+                if not future.done():
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+        self.batches_run += 1
+        for start, stop, future in batch.waiters:
+            if not future.done():
+                future.set_result(predictions[start:stop])
+
+    def _score(self, batch: _Batch, slot: Slot | None = None) -> list[object]:
+        sql = self._sql.get(batch.model_id)
+        if sql is None:
+            sql = self._sql[batch.model_id] = batch_scoring_sql(batch.model)
+        columns = [
+            pa.array([row[name] for row in batch.rows], type_)
+            for name, type_ in zip(
+                batch.schema.names, batch.schema.types, strict=True
+            )
+        ]
+        columns.append(pa.array(range(len(batch.rows)), pa.int64()))
+        schema = batch.schema.append(pa.field(_ROW_INDEX, pa.int64()))
+        table = pa.Table.from_arrays(columns, schema=schema)
+        with self.manager.cursor() as cursor:
+            # The slot interrupts the scoring query at the lane's timeout.
+            watching = nullcontext() if slot is None else slot.watching(cursor)
+            cursor.register(_BATCH_RELATION, table)
+            try:
+                with watching:
+                    scored = cursor.execute(sql).fetchall()
+            finally:
+                cursor.unregister(_BATCH_RELATION)
+        return [prediction for _, prediction in scored]
+
+
+# --- Global instance (optional) ---
+Online: MicroBatcher = MicroBatcher(Engine, Executor, Scheduler)
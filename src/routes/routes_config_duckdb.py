@@ -1,22 +1,110 @@
-from fastapi import APIRouter, Body
-from config.config_duckdb import DuckDBConfig
+import duckdb
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 
-router = APIRouter(prefix="/api/config", tags=["DuckDB Config"])
+from config.config_duckdb import DuckDBConfig, DuckDBConfigUpdate
+from config.config_load_save import Config
+from engine.engine_pool import DrainTimeoutError
+from engine.engine_tenants import (
+    QuotaExceededError,
+    StaleConfigError,
+    Tenant,
+    Tenants,
+    current_tenant,
+)
 
-# --- Initialize config instance ---
-duckdb_config = DuckDBConfig()
+router = APIRouter(prefix='/api/config', tags=['DuckDB Config'])
 
 
-@router.get("")
-def get_duckdb_config():
-    """Return current DuckDB configuration."""
-    return duckdb_config.to_dict()
+def _json(content: dict, headers: dict | None = None) -> Response:
+    return Response(
+        orjson.dumps(content), media_type='application/json', headers=headers
+    )
 
 
-@router.put("")
-def update_duckdb_config(new_config: dict = Body(...)):
+def _config_response(config: DuckDBConfig) -> Response:
+    return _json(config.to_dict(), headers={'ETag': config.etag})
+
+
+@router.get('')
+async def get_duckdb_config(
+    tenant: Tenant = Depends(current_tenant),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    """
+    Return the tenant's current DuckDB configuration.
+    The ETag header identifies this version of the settings; send it
+    back as If-Match when updating.
+    """
+    if if_none_match == tenant.config.etag:
+        return Response(status_code=304, headers={'ETag': tenant.config.etag})
+    return _config_response(tenant.config)
+
+
+@router.get('/autotune')
+async def get_duckdb_autotune(
+    tenant: Tenant = Depends(current_tenant),
+) -> Response:
+    """
+    Explain the auto-detected settings: memory and CPU limits read from
+    cgroups (v1 or v2), CPU affinity and the worker count, the values
+    derived from them and how. `in_use` tells which of the derived
+    values the tenant's configuration currently uses.
+    """
+    derived = tenant.config.tuning.to_dict()
+    current = tenant.config.to_dict()
+    in_use = {
+        key: current[key] == value
+        for key, value in derived.items()
+        if key in current
+    }
+    return _json({**derived, 'in_use': in_use})
+
+
+def _persist(tenant: Tenant, changes: dict, replace: bool) -> None:
+    """Record the change under `tenants` in settings.json (debounced)."""
+    with Config.modify() as data:
+        stored = data.setdefault('tenants', {})
+        previous = {} if replace else stored.get(tenant.name, {})
+        stored[tenant.name] = {**previous, **changes}
+
+
+async def _apply(tenant: Tenant, changes: dict, if_match: str | None) -> None:
+    try:
+        await run_in_threadpool(
+            Tenants.reconfigure, tenant.name, changes, if_match
+        )
+    except StaleConfigError as exc:
+        raise HTTPException(status_code=412, detail=str(exc)) from exc
+    except DrainTimeoutError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except QuotaExceededError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except (ValueError, TypeError, duckdb.Error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.put('')
+async def update_duckdb_config(
+    new_config: DuckDBConfigUpdate,
+    tenant: Tenant = Depends(current_tenant),
+    if_match: str | None = Header(None),
+) -> Response:
     """
-    Update DuckDB configuration dynamically.
+    Replace the tenant's DuckDB configuration.
+    Fields left out return to their defaults; auto-detected ones
+    (memory_limit, threads, temp_directory, max_temp_directory_size)
+    to the derived values. Use PATCH to change only some fields.
+    memory_limit, threads, default_null_order, enable_progress_bar and
+    the spill settings are pushed to the running database with SET;
+    db_type, db_path, access_mode and read_only drain in-flight queries
+    and reconnect. A memory_limit that would push the tenants' total
+    past the machine budget is rejected with 409, and a stale If-Match
+    ETag with 412. The fields sent are saved to settings.json, which
+    other workers watch and reload.
+    Draining can block, so it runs off the event loop (and off the query
+    executor, whose workers may be the ones holding cursors).
     Example JSON payload:
     {
         "memory_limit": "8GB",
@@ -24,8 +112,23 @@ def update_duckdb_config(new_config: dict = Body(...)):
         "enable_progress_bar": false
     }
     """
-    for key, value in new_config.items():
-        if hasattr(duckdb_config, key):
-            setattr(duckdb_config, key, value)
+    changes = {**tenant.config.defaults(), **new_config.changes()}
+    await _apply(tenant, changes, if_match)
+    # Persist only what was sent, so derived values are re-derived later.
+    _persist(tenant, new_config.changes(), replace=True)
+    return _config_response(tenant.config)
+
 
-    return duckdb_config.to_dict()
\ No newline at end of file
+@router.patch('')
+async def patch_duckdb_config(
+    changes: DuckDBConfigUpdate,
+    tenant: Tenant = Depends(current_tenant),
+    if_match: str | None = Header(None),
+) -> Response:
+    """
+    Change only the fields sent; everything else is kept.
+    Applied like PUT, including the If-Match check.
+    """
+    await _apply(tenant, changes.changes(), if_match)
+    _persist(tenant, changes.changes(), replace=False)
+    return _config_response(tenant.config)
@@ -0,0 +1,181 @@
+import glob
+import shutil
+import tempfile
+from collections.abc import Callable, Generator, Iterator
+from pathlib import Path
+
+import duckdb
+import orjson
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from platformdirs import user_cache_dir
+from pydantic import BaseModel
+
+from engine.engine_executor import QueueFullError, release_after
+from engine.engine_ingest import (
+    FileProgress,
+    IngestError,
+    IngestFormat,
+    IngestMode,
+    IngestResult,
+    expand_sources,
+)
+from engine.engine_pool import PoolTimeoutError
+from engine.engine_scheduler import Slot
+from engine.engine_stream import NDJSON_MEDIA_TYPE
+from engine.engine_tenants import Tenant, current_tenant
+
+router = APIRouter(prefix='/api/ingest', tags=['Ingestion'])
+
+# Copy uploads in 1 MiB chunks so no file is ever held in memory whole.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class IngestRequest(BaseModel):
+    """Files (paths or globs on the server) to load into a table."""
+
+    table: str
+    sources: list[str]
+    format: IngestFormat | None = None
+    mode: IngestMode = 'append'
+
+
+def _upload_root() -> Path:
+    root = Path(user_cache_dir('DuckLearn')) / 'uploads'
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _progress_events(
+    run: Generator[FileProgress, None, IngestResult],
+) -> Iterator[bytes]:
+    """Encode ingest progress as NDJSON; errors become a final event."""
+    try:
+        while True:
+            yield orjson.dumps(next(run).to_dict()) + b'\n'
+    except StopIteration as done:
+        yield orjson.dumps(done.value.to_dict()) + b'\n'
+    except (duckdb.Error, IngestError) as exc:
+        yield orjson.dumps({'event': 'error', 'detail': str(exc)}) + b'\n'
+
+
+def _watched_ingest(
+    tenant: Tenant,
+    slot: Slot,
+    table: str,
+    files: list[Path],
+    format: IngestFormat | None,
+    mode: IngestMode,
+) -> Generator[FileProgress, None, IngestResult]:
+    # The cursor is checked out on the first step and returned when the
+    # stream closes, and is interrupted at the batch lane's timeout.
+    with tenant.engine.cursor() as cursor, slot.watching(cursor):
+        return (
+            yield from tenant.ingest.iter_ingest(
+                table, files, format=format, mode=mode, cursor=cursor
+            )
+        )
+
+
+async def _stream_ingest(
+    tenant: Tenant,
+    table: str,
+    sources: list[str],
+    format: IngestFormat | None,
+    mode: IngestMode,
+    on_close: Callable[[], None] | None = None,
+) -> StreamingResponse:
+    executor = tenant.executor
+    try:
+        admission = executor.admit()
+    except QueueFullError as exc:
+        if on_close is not None:
+            on_close()
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    slot = None
+    try:
+        slot = await tenant.scheduler.acquire('batch')
+        files = await executor.run(expand_sources, sources)
+        run = _watched_ingest(tenant, slot, table, files, format, mode)
+    except BaseException as exc:
+        if slot is not None:
+            slot.release()
+        admission.release()
+        if on_close is not None:
+            on_close()
+        if isinstance(exc, IngestError):
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if isinstance(exc, PoolTimeoutError):
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        raise
+
+    chunks = executor.iterate(_progress_events(run), on_close=on_close)
+    return StreamingResponse(
+        release_after(chunks, admission, slot), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.post('')
+async def ingest_files(
+    body: IngestRequest, tenant: Tenant = Depends(current_tenant)
+) -> StreamingResponse:
+    """
+    Load server-side files into a table using DuckDB's native readers.
+    Streams NDJSON: one `file` event per loaded file, then a `done`
+    summary (or an `error` event, in which case nothing is committed).
+    Ingestion runs in the scheduler's batch lane.
+    """
+    return await _stream_ingest(
+        tenant, body.table, body.sources, body.format, body.mode
+    )
+
+
+@router.post('/upload')
+async def ingest_upload(
+    table: str = Form(...),
+    files: list[UploadFile] = File(...),
+    format: IngestFormat | None = Form(None),
+    mode: IngestMode = Form('append'),
+    tenant: Tenant = Depends(current_tenant),
+) -> StreamingResponse:
+    """
+    Load uploaded files into a table. Multipart parts are spooled to
+    disk by the form parser and copied chunk-wise into a private upload
+    directory, which is removed once ingestion finishes.
+    """
+    spool = Path(tempfile.mkdtemp(dir=_upload_root()))
+    try:
+        paths = []
+        for index, upload in enumerate(files):
+            name = Path(upload.filename or f'upload-{index}').name
+            dest = spool / f'{index:05d}-{name}'
+            await run_in_threadpool(_copy_upload, upload, dest)
+            # Sources are globs; the client chose the file name.
+            paths.append(glob.escape(str(dest)))
+    except BaseException:
+        shutil.rmtree(spool, ignore_errors=True)
+        raise
+
+    return await _stream_ingest(
+        tenant,
+        table,
+        paths,
+        format,
+        mode,
+        on_close=lambda: shutil.rmtree(spool, ignore_errors=True),
+    )
+
+
+def _copy_upload(upload: UploadFile, dest: Path) -> None:
+    upload.file.seek(0)
+    with dest.open('wb') as out:
+        shutil.copyfileobj(upload.file, out, UPLOAD_CHUNK_BYTES)
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Response
+from pydantic import BaseModel, ConfigDict, Field
+
+from config.config_load_save import Config
+from engine.engine_metrics import (
+    CONTENT_TYPE,
+    SLOW_QUERIES_KEY,
+    Metrics,
+    SlowQueries,
+)
+
+router = APIRouter(tags=['Metrics'])
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics of this worker process: request latency per
+    route, query counts and durations, rows and bytes streamed, cursor
+    pool occupancy and result cache hits.
+    """
+    return Response(Metrics.render(), media_type=CONTENT_TYPE)
+
+
+class SlowQuerySettings(BaseModel):
+    """Fields to change; omitted ones keep their current value."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool | None = None
+    threshold_ms: float | None = Field(None, ge=0)
+    capacity: int | None = Field(None, ge=1, le=10_000)
+
+
+@router.get('/api/metrics/slow-queries')
+async def slow_queries(tenant: str | None = None) -> dict:
+    """
+    Return the slow query log settings and the logged queries, newest
+    first, each with DuckDB's JSON profile (operators, timings and
+    cardinalities). Pass `tenant` to only see that tenant's queries.
+    """
+    return {
+        'settings': SlowQueries.settings(),
+        'queries': [entry.to_dict() for entry in SlowQueries.entries(tenant)],
+    }
+
+
+@router.put('/api/metrics/slow-queries')
+async def configure_slow_queries(settings: SlowQuerySettings) -> dict:
+    """
+    Turn the slow query log on or off, or change its threshold and ring
+    buffer size. Profiling adds a little overhead to every query while
+    enabled. Settings are saved to settings.json for all workers.
+    """
+    changes = settings.model_dump(exclude_none=True)
+    SlowQueries.configure(**changes)
+    with Config.modify() as data:
+        data[SLOW_QUERIES_KEY] = SlowQueries.settings()
+    return SlowQueries.settings()
+
+
+@router.delete('/api/metrics/slow-queries', status_code=204)
+async def clear_slow_queries() -> None:
+    """
+    Empty the slow query log of this worker.
+    """
+    SlowQueries.clear()
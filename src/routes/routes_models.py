@@ -0,0 +1,238 @@
+from typing import Any, Literal
+
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from engine.engine_executor import QueueFullError, release_after
+from engine.engine_ingest import IngestError, quote_table
+from engine.engine_pool import ConnectionManager, PoolTimeoutError
+from engine.engine_scheduler import Slot, client_id
+from engine.engine_stream import (
+    ARROW_STREAM_MEDIA_TYPE,
+    DEFAULT_BATCH_ROWS,
+    NDJSON_MEDIA_TYPE,
+    QueryStream,
+    arrow_ipc_chunks,
+    ndjson_chunks,
+)
+from engine.engine_tenants import DEFAULT_TENANT, Tenant, current_tenant
+from learn.learn_linear import PREDICTION_COLUMN
+from learn.learn_registry import ModelNotFoundError, Models
+from learn.learn_serving import MicroBatcher, Online, scoring_sql
+
+router = APIRouter(prefix='/api/models', tags=['Models'])
+
+# Online batchers of non-default tenants (the default one uses Online).
+_batchers: dict[str, MicroBatcher] = {}
+
+
+class PredictRequest(BaseModel):
+    """Rows to score (a table name or SQL query) and where results go."""
+
+    source: str
+    mode: Literal['stream', 'table'] = 'stream'
+    target: str | None = None
+    output: str = PREDICTION_COLUMN
+    format: Literal['arrow', 'ndjson'] = 'arrow'
+    batch_rows: int = Field(DEFAULT_BATCH_ROWS, gt=0, le=1_000_000)
+
+
+class OnlinePredictRequest(BaseModel):
+    """A few rows (usually one) to score with low latency."""
+
+    rows: list[dict] = Field(min_length=1, max_length=1024)
+
+
+def _online(tenant: Tenant) -> MicroBatcher:
+    if tenant.name == DEFAULT_TENANT:
+        return Online
+    batcher = _batchers.get(tenant.name)
+    if batcher is None or batcher.executor is not tenant.executor:
+        # New tenant, or one removed and created again under this name.
+        batcher = MicroBatcher(
+            tenant.engine, tenant.executor, tenant.scheduler
+        )
+        _batchers[tenant.name] = batcher
+    return batcher
+
+
+async def _model_or_404(tenant: Tenant, model_id: str) -> Any:
+    try:
+        return await tenant.executor.run(Models.load, model_id)
+    except ModelNotFoundError as exc:
+        raise HTTPException(
+            status_code=404, detail=f'Unknown model {model_id}'
+        ) from exc
+
+
+@router.get('')
+async def list_models(tenant: Tenant = Depends(current_tenant)) -> list[dict]:
+    """List stored models, newest first."""
+    infos = await tenant.executor.run(Models.list)
+    return [info.to_dict() for info in infos]
+
+
+@router.get('/{model_id}')
+async def get_model(
+    model_id: str, tenant: Tenant = Depends(current_tenant)
+) -> dict:
+    """Return a stored model's metadata."""
+    try:
+        return (await tenant.executor.run(Models.info, model_id)).to_dict()
+    except ModelNotFoundError as exc:
+        raise HTTPException(
+            status_code=404, detail=f'Unknown model {model_id}'
+        ) from exc
+
+
+def _create_table(
+    engine: ConnectionManager, slot: Slot, target: str, sql: str
+) -> int:
+    with engine.cursor() as cursor, slot.watching(cursor):
+        (rows,) = cursor.execute(
+            f'CREATE OR REPLACE TABLE {quote_table(target)} AS {sql}'
+        ).fetchone()
+    return rows
+
+
+@router.post('/{model_id}/predict', response_model=None)
+async def predict(
+    model_id: str,
+    body: PredictRequest,
+    request: Request,
+    tenant: Tenant = Depends(current_tenant),
+) -> dict | StreamingResponse:
+    """
+    Score a table or query with a stored model, entirely inside DuckDB.
+    The model is compiled to one SQL expression over the source. In
+    `stream` mode rows come back as Arrow IPC or NDJSON like POST
+    /api/query; in `table` mode they are written to `target` with
+    CREATE TABLE AS and only the row count is returned.
+    Streams are scheduled by cost like POST /api/query; table mode
+    always runs in the batch lane.
+    """
+    executor, scheduler = tenant.executor, tenant.scheduler
+    model = await _model_or_404(tenant, model_id)
+    try:
+        sql = scoring_sql(model, body.source, body.output)
+    except (SqlglotError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    try:
+        admission = executor.admit()
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    if body.mode == 'table':
+        if not body.target:
+            admission.release()
+            raise HTTPException(
+                status_code=400, detail='table mode requires a target'
+            )
+        with admission:
+            slot = None
+            try:
+                slot = await scheduler.acquire('batch', client_id(request))
+                with slot:
+                    rows = await executor.run(
+                        _create_table, tenant.engine, slot, body.target, sql
+                    )
+            except QueueFullError as exc:
+                raise HTTPException(status_code=429, detail=str(exc)) from exc
+            except PoolTimeoutError as exc:
+                raise HTTPException(status_code=503, detail=str(exc)) from exc
+            except (duckdb.Error, IngestError) as exc:
+                if slot is not None and slot.timed_out:
+                    raise HTTPException(
+                        status_code=504,
+                        detail=(
+                            f'Scoring exceeded the {slot.timeout:g}s timeout'
+                        ),
+                    ) from exc
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            finally:
+                tenant.cache.invalidate(
+                    [exp.to_table(body.target, dialect='duckdb').name]
+                )
+        return {'id': model_id, 'table': body.target, 'rows': rows}
+
+    slot = None
+    try:
+        cost = await executor.run(scheduler.classify, sql)
+        slot = await scheduler.acquire(cost.lane, client_id(request))
+        stream = await executor.run(QueryStream, tenant.engine, tenant.name)
+        slot.watch(stream.cursor)
+        await executor.run(
+            stream.execute,
+            sql,
+            body.batch_rows,
+            cursor=stream.cursor,
+            request=request,
+        )
+    except BaseException as exc:
+        if slot is not None:
+            slot.release()
+        admission.release()
+        if isinstance(exc, QueueFullError):
+            raise HTTPException(status_code=429, detail=str(exc)) from exc
+        if isinstance(exc, PoolTimeoutError):
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        if slot is not None and slot.timed_out:
+            raise HTTPException(
+                status_code=504,
+                detail=f'Scoring exceeded the {slot.timeout:g}s timeout',
+            ) from exc
+        if isinstance(exc, duckdb.Error):
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise
+
+    def close() -> None:
+        slot.unwatch()
+        stream.close()
+
+    if body.format == 'ndjson':
+        encode, media_type = ndjson_chunks, NDJSON_MEDIA_TYPE
+    else:
+        encode, media_type = arrow_ipc_chunks, ARROW_STREAM_MEDIA_TYPE
+    chunks = executor.iterate(
+        encode(stream.reader, tenant.name),
+        cursor=stream.cursor,
+        on_close=close,
+    )
+    return StreamingResponse(
+        release_after(chunks, admission, slot), media_type=media_type
+    )
+
+
+@router.post('/{model_id}/predict/online')
+async def predict_online(
+    model_id: str,
+    body: OnlinePredictRequest,
+    tenant: Tenant = Depends(current_tenant),
+) -> dict:
+    """
+    Score a handful of rows sent as JSON objects.
+    Concurrent requests for the same model that arrive within a couple
+    of milliseconds are coalesced into one vectorized query, so many
+    single-row callers cost about as much as one batch.
+    """
+    model = await _model_or_404(tenant, model_id)
+    try:
+        admission = tenant.executor.admit()
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    with admission:
+        try:
+            predictions = await _online(tenant).predict(
+                model_id, model, body.rows
+            )
+        except PoolTimeoutError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except (duckdb.Error, ValueError, TypeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {'id': model_id, 'predictions': predictions}
@@ -0,0 +1,52 @@
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException
+
+from engine.engine_ingest import IngestError
+from engine.engine_pool import PoolTimeoutError
+from engine.engine_profile import TableProfile
+from engine.engine_scheduler import Slot
+from engine.engine_tenants import Tenant, current_tenant
+
+router = APIRouter(prefix='/api/profile', tags=['Profile'])
+
+
+def _profile(
+    tenant: Tenant, slot: Slot, table: str, force: bool
+) -> TableProfile:
+    with tenant.engine.cursor() as cursor, slot.watching(cursor):
+        return tenant.profiles.profile(table, force=force, cursor=cursor)
+
+
+@router.get('/{table}')
+async def profile_table(
+    table: str,
+    refresh: bool = False,
+    tenant: Tenant = Depends(current_tenant),
+) -> dict:
+    """
+    Return per-column statistics of a table.
+    Counts, nulls, min/max, mean/variance, approximate distinct counts
+    and quantiles come from one aggregate query. Results are cached;
+    after appends only the new rows are scanned and merged in. Pass
+    `refresh=true` to force a full rescan. Scans run in the scheduler's
+    batch lane and are interrupted at its timeout (504).
+    """
+    slot = None
+    try:
+        slot = await tenant.scheduler.acquire('batch')
+        with slot:
+            profile = await tenant.executor.run(
+                _profile, tenant, slot, table, refresh
+            )
+    except PoolTimeoutError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except duckdb.CatalogException as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except (duckdb.Error, IngestError) as exc:
+        if slot is not None and slot.timed_out:
+            raise HTTPException(
+                status_code=504,
+                detail=f'Profiling exceeded the {slot.timeout:g}s timeout',
+            ) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return profile.to_dict()
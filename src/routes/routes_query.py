@@ -0,0 +1,148 @@
+from typing import Literal
+
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from engine.engine_cache import analyze_sql
+from engine.engine_executor import QueueFullError, release_after
+from engine.engine_pool import PoolTimeoutError
+from engine.engine_scheduler import (
+    RestrictedStatementError,
+    Slot,
+    client_id,
+)
+from engine.engine_stream import (
+    ARROW_STREAM_MEDIA_TYPE,
+    DEFAULT_BATCH_ROWS,
+    NDJSON_MEDIA_TYPE,
+    QueryStream,
+    arrow_ipc_chunks,
+    ndjson_chunks,
+)
+from engine.engine_tenants import Tenant, current_tenant
+
+router = APIRouter(prefix='/api/query', tags=['Query'])
+
+# Non-standard but widely used status for "client closed request".
+CLIENT_CLOSED_REQUEST = 499
+
+
+class QueryRequest(BaseModel):
+    """SQL to run and how to stream the result back."""
+
+    sql: str
+    format: Literal['arrow', 'ndjson'] = 'arrow'
+    batch_rows: int = Field(DEFAULT_BATCH_ROWS, gt=0, le=1_000_000)
+
+
+@router.post('')
+async def run_query(
+    query: QueryRequest,
+    request: Request,
+    tenant: Tenant = Depends(current_tenant),
+) -> StreamingResponse:
+    """
+    Run SQL against the tenant's DuckDB and stream the result.
+    `arrow` returns an Arrow IPC stream of record batches; `ndjson`
+    returns one JSON object per row. Rows are fetched batch by batch,
+    so the full result is never held in Python memory.
+    All DuckDB work runs on the query executor's thread pool; the query
+    is interrupted if the client disconnects, and 429 is returned when
+    the admission queue is full.
+    Queries are costed from their sqlglot parse and DuckDB's EXPLAIN
+    estimates and scheduled in the interactive or batch lane;
+    interactive queries start first. A client (the `X-DuckLearn-Client`
+    header, else its address) is limited in concurrent queries (429),
+    and a query running past its lane's timeout is interrupted (504).
+    Read-only results small enough for the result cache are kept and
+    served again for equivalent SQL until a referenced table is written.
+    """
+    executor, cache = tenant.executor, tenant.cache
+    scheduler = tenant.scheduler
+    try:
+        admission = executor.admit()
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    media_type = (
+        NDJSON_MEDIA_TYPE
+        if query.format == 'ndjson'
+        else ARROW_STREAM_MEDIA_TYPE
+    )
+    encode = ndjson_chunks if query.format == 'ndjson' else arrow_ipc_chunks
+
+    slot = None
+    try:
+        shape = await executor.run(analyze_sql, query.sql)
+        cached = cache.get(shape)
+        if cached is not None:
+            reader = cached.to_reader(max_chunksize=query.batch_rows)
+            chunks = executor.iterate(encode(reader, tenant.name))
+            return StreamingResponse(
+                release_after(chunks, admission), media_type=media_type
+            )
+
+        cost = await executor.run(scheduler.classify, query.sql)
+        slot = await scheduler.acquire(cost.lane, client_id(request))
+        stream = await executor.run(QueryStream, tenant.engine, tenant.name)
+        slot.watch(stream.cursor)
+        # Versions as of before execution: a write racing the query
+        # must keep its result out of the cache.
+        snapshot = cache.snapshot(shape)
+        try:
+            await executor.run(
+                stream.execute,
+                query.sql,
+                query.batch_rows,
+                cursor=stream.cursor,
+                request=request,
+            )
+        finally:
+            cache.invalidate_for(shape)
+    except BaseException as exc:
+        if slot is not None:
+            slot.release()
+        admission.release()
+        error = http_error(exc, slot)
+        if error is None:
+            raise
+        raise error from exc
+
+    def close() -> None:
+        slot.unwatch()
+        stream.close()
+
+    stream.reader = cache.capture(shape, stream.reader, snapshot)
+    chunks = executor.iterate(
+        encode(stream.reader, tenant.name),
+        cursor=stream.cursor,
+        on_close=close,
+    )
+    return StreamingResponse(
+        release_after(chunks, admission, slot), media_type=media_type
+    )
+
+
+def http_error(exc: BaseException, slot: Slot | None) -> HTTPException | None:
+    """The HTTP error a failed query maps to (None: not a query error)."""
+    if isinstance(exc, QueueFullError):
+        return HTTPException(status_code=429, detail=str(exc))
+    if isinstance(exc, PoolTimeoutError):
+        return HTTPException(status_code=503, detail=str(exc))
+    if isinstance(exc, RestrictedStatementError):
+        return HTTPException(status_code=403, detail=str(exc))
+    if isinstance(exc, duckdb.InterruptException):
+        if slot is not None and slot.timed_out:
+            return HTTPException(
+                status_code=504,
+                detail=f'Query exceeded the {slot.timeout:g}s {slot.lane} '
+                'query timeout',
+            )
+        return HTTPException(
+            status_code=CLIENT_CLOSED_REQUEST, detail=str(exc)
+        )
+    if isinstance(exc, duckdb.Error):
+        return HTTPException(status_code=400, detail=str(exc))
+    return None
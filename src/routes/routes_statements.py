@@ -0,0 +1,200 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from engine.engine_executor import QueueFullError, release_after
+from engine.engine_prepared import PreparedStatement, StatementNotFoundError
+from engine.engine_scheduler import Slot, client_id
+from engine.engine_stream import (
+    ARROW_STREAM_MEDIA_TYPE,
+    DEFAULT_BATCH_ROWS,
+    NDJSON_MEDIA_TYPE,
+    QueryStream,
+    arrow_ipc_chunks,
+    ndjson_chunks,
+)
+from engine.engine_tenants import Tenant, current_tenant
+
+from .routes_query import http_error
+
+router = APIRouter(prefix='/api/statements', tags=['Prepared Statements'])
+
+
+class StatementRequest(BaseModel):
+    """Parameterized SQL using `?` or `$1, $2, ...` placeholders."""
+
+    sql: str
+
+
+class ExecuteRequest(BaseModel):
+    """One parameter set and how to stream the result back."""
+
+    params: list = Field(default_factory=list)
+    format: Literal['arrow', 'ndjson'] = 'arrow'
+    batch_rows: int = Field(DEFAULT_BATCH_ROWS, gt=0, le=1_000_000)
+
+
+class ExecuteManyRequest(BaseModel):
+    """Many parameter sets applied in one transaction."""
+
+    batches: list[list]
+
+
+def _statement_or_404(tenant: Tenant, statement_id: str) -> PreparedStatement:
+    try:
+        return tenant.statements.get(statement_id)
+    except StatementNotFoundError as exc:
+        raise HTTPException(
+            status_code=404, detail=f'Unknown statement {statement_id}'
+        ) from exc
+
+
+@router.post('', status_code=201)
+async def register_statement(
+    body: StatementRequest, tenant: Tenant = Depends(current_tenant)
+) -> dict:
+    """Parse and register a statement; returns its id and parameter count."""
+    try:
+        statement = await tenant.executor.run(
+            tenant.statements.register, body.sql
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return statement.to_dict()
+
+
+@router.get('/{statement_id}')
+async def get_statement(
+    statement_id: str, tenant: Tenant = Depends(current_tenant)
+) -> dict:
+    """Return a registered statement."""
+    return _statement_or_404(tenant, statement_id).to_dict()
+
+
+@router.delete('/{statement_id}', status_code=204)
+async def delete_statement(
+    statement_id: str, tenant: Tenant = Depends(current_tenant)
+) -> None:
+    """Forget a registered statement."""
+    _statement_or_404(tenant, statement_id)
+    tenant.statements.forget(statement_id)
+
+
+@router.post('/{statement_id}/execute')
+async def execute_statement(
+    statement_id: str,
+    body: ExecuteRequest,
+    request: Request,
+    tenant: Tenant = Depends(current_tenant),
+) -> StreamingResponse:
+    """
+    Execute a registered statement with one parameter set and stream
+    the result like POST /api/query. The statement is prepared once per
+    pooled cursor, so repeat calls skip parsing and planning (and
+    costing: they run in the scheduler's interactive lane).
+    """
+    executor, cache = tenant.executor, tenant.cache
+    statement = _statement_or_404(tenant, statement_id)
+    try:
+        admission = executor.admit()
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    slot = None
+    try:
+        slot = await tenant.scheduler.acquire(
+            'interactive', client_id(request)
+        )
+        stream = await executor.run(QueryStream, tenant.engine, tenant.name)
+        slot.watch(stream.cursor)
+        try:
+            await executor.run(
+                stream.run,
+                lambda cursor: tenant.statements.execute(
+                    cursor, statement_id, body.params
+                ),
+                body.batch_rows,
+                cursor=stream.cursor,
+                request=request,
+            )
+        finally:
+            cache.invalidate_for(statement.shape)
+    except BaseException as exc:
+        if slot is not None:
+            slot.release()
+        admission.release()
+        error = http_error(exc, slot)
+        if error is None and isinstance(exc, ValueError | TypeError):
+            error = HTTPException(status_code=400, detail=str(exc))
+        if error is None:
+            raise
+        raise error from exc
+
+    def close() -> None:
+        slot.unwatch()
+        stream.close()
+
+    if body.format == 'ndjson':
+        encode, media_type = ndjson_chunks, NDJSON_MEDIA_TYPE
+    else:
+        encode, media_type = arrow_ipc_chunks, ARROW_STREAM_MEDIA_TYPE
+    chunks = executor.iterate(
+        encode(stream.reader, tenant.name),
+        cursor=stream.cursor,
+        on_close=close,
+    )
+    return StreamingResponse(
+        release_after(chunks, admission, slot), media_type=media_type
+    )
+
+
+@router.post('/{statement_id}/execute_many')
+async def execute_statement_many(
+    statement_id: str,
+    body: ExecuteManyRequest,
+    request: Request,
+    tenant: Tenant = Depends(current_tenant),
+) -> dict:
+    """
+    Apply a registered statement to many parameter sets at once.
+    Single-row INSERT ... VALUES statements are bound as one Arrow batch
+    and inserted set-wise; others run the prepared statement per set.
+    Everything happens in one transaction, in the scheduler's batch
+    lane, and is rolled back if the client disconnects or the lane's
+    timeout passes (504).
+    """
+    executor, cache = tenant.executor, tenant.cache
+    statement = _statement_or_404(tenant, statement_id)
+    try:
+        admission = executor.admit()
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    def run(slot: Slot) -> int:
+        with tenant.engine.cursor() as cursor, slot.watching(cursor):
+            return tenant.statements.execute_many(
+                cursor, statement_id, body.batches
+            )
+
+    slot = None
+    with admission:
+        try:
+            slot = await tenant.scheduler.acquire('batch', client_id(request))
+            # The slot interrupts its cursor on disconnect, as on timeout.
+            applied = await executor.run(
+                run, slot, cursor=slot, request=request
+            )
+        except BaseException as exc:
+            error = http_error(exc, slot)
+            if error is None and isinstance(exc, ValueError | TypeError):
+                error = HTTPException(status_code=400, detail=str(exc))
+            if error is None:
+                raise
+            raise error from exc
+        finally:
+            if slot is not None:
+                slot.release()
+            cache.invalidate_for(statement.shape)
+    return {'id': statement_id, 'applied': applied}
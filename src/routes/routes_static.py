@@ -0,0 +1,82 @@
+import mimetypes
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# SvelteKit puts content-hashed files here; their URL changes with them.
+IMMUTABLE_PREFIX = '_app/immutable/'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Everything else (HTML, favicon, ...) is revalidated with its ETag.
+REVALIDATE_CACHE = 'no-cache'
+
+# Precompressed siblings written by the build, in order of preference.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Encodings an Accept-Encoding header allows (q=0 excluded)."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '').lower() in ('q=0', 'q=0.0', 'q=0.00'):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Serve a frontend build, preferring precompressed `.br`/`.gz` files.
+    Files under `_app/immutable/` are cached for a year; others must be
+    revalidated, which their ETag makes a cheap 304.
+    """
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = os.fspath(full_path)
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(full_path)[0] or 'text/plain'
+
+        accepted = _accepted_encodings(
+            request_headers.get('accept-encoding', '')
+        )
+        encoding, has_variants = None, False
+        path, stat = full_path, stat_result
+        for name, suffix in ENCODINGS:
+            try:
+                variant = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            has_variants = True
+            if encoding is None and name in accepted:
+                encoding, path, stat = name, full_path + suffix, variant
+
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            stat_result=stat,
+            media_type=media_type,
+        )
+        if encoding is not None:
+            response.headers['content-encoding'] = encoding
+        if has_variants:
+            response.headers['vary'] = 'Accept-Encoding'
+        relative = os.path.relpath(full_path, self.directory)
+        relative = relative.replace(os.sep, '/')
+        response.headers['cache-control'] = (
+            IMMUTABLE_CACHE
+            if relative.startswith(IMMUTABLE_PREFIX)
+            else REVALIDATE_CACHE
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from config.config_duckdb import DuckDBConfigUpdate
+from config.config_load_save import Config
+from engine.engine_tenants import (
+    TENANT_HEADER,
+    QuotaExceededError,
+    TenantNotFoundError,
+    Tenants,
+)
+
+router = APIRouter(prefix='/api/tenants', tags=['Tenants'])
+
+
+class TenantRequest(BaseModel):
+    """A new tenant and its DuckDB settings (as for PUT /api/config)."""
+
+    name: str
+    config: DuckDBConfigUpdate = Field(default_factory=DuckDBConfigUpdate)
+
+
+@router.get('')
+async def list_tenants() -> dict:
+    """
+    List tenants with their memory allocation and the machine budget.
+    Requests are routed to a tenant by the X-DuckLearn-Tenant header or
+    a /t/<name> path prefix, e.g. POST /t/analytics/api/query.
+    """
+    return {
+        'header': TENANT_HEADER,
+        'budget_bytes': Tenants.budget,
+        'allocated_bytes': Tenants.allocated(),
+        'tenants': [tenant.to_dict() for tenant in Tenants.all()],
+    }
+
+
+@router.post('', status_code=201)
+async def create_tenant(body: TenantRequest) -> dict:
+    """
+    Create a tenant with its own database, cursor pool, query threads
+    and admission queue. Without a memory_limit it gets what is left of
+    the budget; 409 is returned when the budget is exhausted. The
+    tenant is saved to settings.json, so other workers create it too.
+    """
+    try:
+        settings = body.config.changes()
+        tenant = await run_in_threadpool(Tenants.add, body.name, settings)
+    except QuotaExceededError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    with Config.modify() as data:
+        data.setdefault('tenants', {})[body.name] = settings
+    return tenant.to_dict()
+
+
+@router.delete('/{name}', status_code=204)
+async def delete_tenant(name: str) -> None:
+    """Close a tenant's database and free its memory allocation."""
+    try:
+        await run_in_threadpool(Tenants.remove, name)
+    except TenantNotFoundError as exc:
+        raise HTTPException(
+            status_code=404, detail=f'Unknown tenant {name}'
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    with Config.modify() as data:
+        data.get('tenants', {}).pop(name, None)
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from config.config_autotune import (
+    SERVER_MEMORY_ENV,
+    SERVER_THREADS_ENV,
+    WORKERS_ENV,
+    ResourceLimits,
+    autotune,
+    cgroup_cpu_limit,
+    cgroup_memory_limit,
+    detect_limits,
+    worker_count,
+)
+from config.config_duckdb import DuckDBConfig
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def cgroup_v2(tmp_path):
+    """A v2 hierarchy where the process sits two levels down."""
+    root = tmp_path / 'cgroup'
+    _write(root / 'cgroup.controllers', 'cpu memory')
+    _write(root / 'memory.max', 'max')
+    _write(root / 'cpu.max', 'max 100000')
+    _write(root / 'pod' / 'memory.max', str(2 * 1024**3))
+    _write(root / 'pod' / 'app' / 'memory.max', 'max')
+    _write(root / 'pod' / 'app' / 'memory.high', str(3 * 1024**3))
+    _write(root / 'pod' / 'app' / 'cpu.max', '150000 100000')
+    proc = tmp_path / 'proc-cgroup'
+    proc.write_text('0::/pod/app\n')
+    return root, proc
+
+
+@pytest.fixture
+def cgroup_v1(tmp_path):
+    root = tmp_path / 'cgroup'
+    _write(root / 'memory' / 'memory.limit_in_bytes', '9223372036854771712')
+    _write(root / 'memory' / 'job' / 'memory.limit_in_bytes', '536870912')
+    _write(root / 'cpu,cpuacct' / 'cpu.cfs_quota_us', '200000')
+    _write(root / 'cpu,cpuacct' / 'cpu.cfs_period_us', '100000')
+    proc = tmp_path / 'proc-cgroup'
+    proc.write_text('4:memory:/job\n2:cpu,cpuacct:/\n0::/\n')
+    return root, proc
+
+
+def test_cgroup_v2_takes_the_tightest_ancestor(cgroup_v2):
+    root, proc = cgroup_v2
+    memory, source = cgroup_memory_limit(root, proc)
+    assert memory == 2 * 1024**3
+    assert source.endswith('pod/memory.max')
+    assert cgroup_cpu_limit(root, proc)[0] == 1.5
+
+
+def test_cgroup_v1_ignores_the_unlimited_sentinel(cgroup_v1):
+    root, proc = cgroup_v1
+    assert cgroup_memory_limit(root, proc)[0] == 512 * 1024**2
+    cpus, source = cgroup_cpu_limit(root, proc)
+    assert cpus == 2.0 and 'cgroup v1' in source
+
+
+def test_no_cgroup_falls_back_to_host(tmp_path):
+    limits = detect_limits(tmp_path / 'missing', tmp_path / 'missing')
+    assert limits.memory_source == 'host RAM (psutil)'
+    assert limits.cpus >= 1
+
+
+def test_workers_split_memory_threads_and_spill(monkeypatch, tmp_path):
+    monkeypatch.setenv(WORKERS_ENV, '4')
+    workers, _ = worker_count()
+    limits = ResourceLimits(
+        memory_bytes=8 * 1000**3,
+        memory_source='test',
+        cpus=6.0,
+        cpu_source='test',
+        workers=workers,
+        workers_source='test',
+    )
+    tuned = autotune(tmp_path / 'db.duckdb', limits)
+
+    assert tuned.memory_limit == '500MB'
+    assert tuned.threads == 1
+    assert tuned.temp_directory == f'{tmp_path / "db.duckdb"}.tmp'
+    assert '4 workers' in tuned.steps['memory_limit']
+    assert tuned.to_dict()['limits']['cpus'] == 6.0
+
+
+def test_server_totals_are_split_between_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv(WORKERS_ENV, '4')
+    monkeypatch.setenv(SERVER_THREADS_ENV, '10')
+    monkeypatch.setenv(SERVER_MEMORY_ENV, '8GB')
+    limits = detect_limits(tmp_path / 'missing', tmp_path / 'missing')
+    tuned = autotune(limits=limits)
+
+    assert tuned.threads == 2
+    assert tuned.memory_limit == '2000MB'
+    assert f'${SERVER_THREADS_ENV} (10)' in tuned.steps['threads']
+
+
+def test_config_spills_to_a_private_directory():
+    first, second = DuckDBConfig(), DuckDBConfig()
+    assert first.temp_directory != second.temp_directory
+    settings = first.database_settings()
+    assert settings['temp_directory'] == first.temp_directory
+    assert settings['max_temp_directory_size'].endswith('MB')
@@ -23,11 +23,12 @@ def temp_config(tmp_path, monkeypatch):
 
 
 def test_initialization_creates_directory_and_file(temp_config):
-    """Ensure __init__ creates directory and initializes config."""
+    """Ensure first use creates directory and initializes config."""
     cfg = temp_config
+    assert not cfg.loaded and not cfg.path.exists()
+    assert cfg.data == {}
     assert cfg._config_dir.exists()
     assert cfg.path.exists()
-    assert cfg.data == {}
 
 
 def test_save_and_load_cycle(temp_config):
@@ -73,8 +74,8 @@ def test_load_creates_new_file_if_not_exists(tmp_path, monkeypatch):
     )
 
     cfg = ConfigManager(app_name='AnotherApp', filename='new.json')
-    assert cfg.path.exists()
     assert cfg.data == {}
+    assert cfg.path.exists()
 
 
 def test_save_raises_no_exceptions_on_write_error(monkeypatch, temp_config):
@@ -89,3 +90,105 @@ def test_save_raises_no_exceptions_on_write_error(monkeypatch, temp_config):
     # Should raise OSError normally, because save doesn't catch errors
     with pytest.raises(OSError):
         temp_config.save()
+
+
+def test_save_is_atomic_and_keeps_no_temp_files(temp_config):
+    """Writes go through a renamed temp file that never lingers."""
+    temp_config.save({'a': 1})
+    temp_config.save({'a': 2})
+
+    names = [p.name for p in temp_config._config_dir.iterdir()]
+    assert [name for name in names if name.endswith('.tmp')] == []
+    assert orjson.loads(temp_config.path.read_bytes()) == {'a': 2}
+    assert temp_config.version == 2
+
+
+def test_corrupt_file_is_kept_as_backup(temp_config):
+    """The unreadable file is copied aside before it can be overwritten."""
+    temp_config.path.write_text('{bad json}')
+
+    assert temp_config.load() == {}
+    backup = temp_config.path.with_name(temp_config.filename + '.corrupt')
+    assert backup.read_text() == '{bad json}'
+
+
+def test_modify_bursts_are_coalesced_into_one_write(monkeypatch, temp_config):
+    """Several edits within the debounce window share a single write."""
+    assert temp_config.data == {}
+    writes = []
+    monkeypatch.setattr(temp_config, '_write_atomic', writes.append)
+
+    for i in range(5):
+        with temp_config.modify() as data:
+            data['n'] = i
+    with temp_config.modify():
+        pass  # unchanged data doesn't schedule anything new
+
+    assert temp_config.pending and writes == []
+    assert temp_config.version == 5
+    temp_config.flush()
+    assert not temp_config.pending
+    assert [orjson.loads(w) for w in writes] == [{'n': 4}]
+
+
+def test_reload_picks_up_external_changes(temp_config):
+    """Another process's write is loaded and reported to subscribers."""
+    seen = []
+    temp_config.subscribe(seen.append)
+    assert temp_config.data == {}
+    other = ConfigManager(app_name='TestApp', filename=temp_config.filename)
+    other.save({'tenants': {'team': {'threads': 1}}})
+
+    assert temp_config.reload() is True
+    assert temp_config.data == {'tenants': {'team': {'threads': 1}}}
+    assert seen == [temp_config.data]
+    assert temp_config.reload() is False
+
+
+def test_reload_does_not_drop_pending_local_changes(temp_config):
+    """A debounced write that hasn't happened yet survives the reload."""
+    with temp_config.modify() as data:
+        data['local'] = True
+    ConfigManager(app_name='TestApp', filename=temp_config.filename).save(
+        {'remote': True}
+    )
+
+    assert temp_config.reload() is False
+    temp_config.flush()
+    assert orjson.loads(temp_config.path.read_bytes()) == {
+        'local': True,
+        'remote': True,
+    }
+
+
+def test_concurrent_writers_keep_each_others_changes(temp_config):
+    """Two workers editing one file: each save merges the other's."""
+    temp_config.save({'tenants': {'a': {'threads': 1}, 'b': {}}})
+    other = ConfigManager(app_name='TestApp', filename=temp_config.filename)
+    seen = []
+    other.subscribe(seen.append)
+    assert other.data == temp_config.data
+
+    with temp_config.modify() as data:
+        data['tenants']['a'] = {'threads': 2}
+        data['tenants']['c'] = {}
+    with other.modify() as data:
+        del data['tenants']['b']
+        data['tenants']['d'] = {}
+    temp_config.flush()
+    other.flush()
+
+    expected = {'tenants': {'a': {'threads': 2}, 'c': {}, 'd': {}}}
+    assert orjson.loads(temp_config.path.read_bytes()) == expected
+    assert other.data == expected
+    assert seen == [expected]
+    # The first writer now merges from the file it last saw.
+    assert temp_config.reload() is True
+    with temp_config.modify() as data:
+        data['tenants']['a']['threads'] = 3
+    temp_config.flush()
+    assert orjson.loads(temp_config.path.read_bytes())['tenants'] == {
+        'a': {'threads': 3},
+        'c': {},
+        'd': {},
+    }
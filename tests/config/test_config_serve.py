@@ -0,0 +1,89 @@
+import pytest
+
+from config.config_autotune import (
+    SERVER_MEMORY_ENV,
+    SERVER_THREADS_ENV,
+    WORKERS_ENV,
+)
+from config.config_serve import (
+    DATABASE_ENV,
+    READ_ONLY_ENV,
+    WRITER_ENV,
+    plan_serve,
+    worker_database,
+)
+
+
+@pytest.fixture
+def fresh_worker_database():
+    worker_database.cache_clear()
+    yield worker_database
+    worker_database.cache_clear()
+
+
+def test_memory_databases_run_independent_workers():
+    plan = plan_serve(4, threads=8, memory_limit='8GB')
+    assert plan.coordination == 'independent'
+    assert plan.worker_env() == {
+        WORKERS_ENV: '4',
+        SERVER_THREADS_ENV: '8',
+        SERVER_MEMORY_ENV: '8GB',
+    }
+    [(name, command, _)] = plan.processes('0.0.0.0', 9000)
+    assert name == 'workers'
+    assert command[command.index('--workers') + 1] == '4'
+
+
+def test_read_only_workers_all_open_the_file(tmp_path):
+    plan = plan_serve(3, tmp_path / 'a.duckdb', read_only=True)
+    assert plan.coordination == 'read_only'
+    env = plan.worker_env()
+    assert env[DATABASE_ENV] == str(tmp_path / 'a.duckdb')
+    assert env[READ_ONLY_ENV] == '1'
+
+
+def test_writer_owns_a_read_write_database(tmp_path):
+    plan = plan_serve(3, tmp_path / 'a.duckdb', socket_dir=tmp_path)
+    assert plan.coordination == 'writer_proxy'
+    writer, workers = plan.processes('127.0.0.1', 8000)
+
+    assert writer[0] == 'writer'
+    assert str(plan.socket) in writer[1]
+    assert writer[2][DATABASE_ENV] == str(tmp_path / 'a.duckdb')
+    assert writer[2][WORKERS_ENV] == '1'
+    # The public workers never open the file themselves.
+    assert DATABASE_ENV not in workers[2]
+    assert workers[2][WRITER_ENV] == str(plan.socket)
+
+
+def test_single_worker_opens_the_file_itself(tmp_path):
+    plan = plan_serve(1, tmp_path / 'a.duckdb')
+    assert plan.coordination == 'independent'
+    assert plan.worker_env()[DATABASE_ENV] == str(tmp_path / 'a.duckdb')
+
+
+@pytest.mark.parametrize(
+    'kwargs, message',
+    [
+        ({'workers': 0}, 'at least 1'),
+        ({'workers': 4, 'threads': 2}, 'cannot be shared'),
+        ({'workers': 2, 'memory_limit': 'lots'}, 'Invalid memory size'),
+    ],
+)
+def test_invalid_plans_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        plan_serve(**kwargs)
+
+
+def test_worker_database_from_environment(
+    monkeypatch, tmp_path, fresh_worker_database
+):
+    assert fresh_worker_database() == {}
+    fresh_worker_database.cache_clear()
+    monkeypatch.setenv(DATABASE_ENV, str(tmp_path / 'a.duckdb'))
+    monkeypatch.setenv(READ_ONLY_ENV, '1')
+
+    settings = fresh_worker_database()
+    assert settings['db_type'] == 'persistent'
+    assert settings['read_only'] is True
+    assert not settings['temp_directory'].startswith(str(tmp_path))
@@ -0,0 +1,54 @@
+import os
+import threading
+
+import pytest
+
+from config.config_watch import FileWatcher
+
+
+def _replace(path, text):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+@pytest.mark.parametrize('backend', ['inotify', 'polling'])
+def test_watcher_sees_atomic_replacement(tmp_path, monkeypatch, backend):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    changed = threading.Event()
+    watcher = FileWatcher(path, changed.set, interval=0.05)
+    if backend == 'polling':
+        monkeypatch.setattr(watcher, '_inotify_fd', lambda: None)
+
+    watcher.start()
+    try:
+        if watcher.backend != backend:
+            pytest.skip(f'{backend} is not available here')
+        _replace(tmp_path / 'other.json', '{}')
+        assert not changed.wait(0.3)
+        _replace(path, '{"a": 1}')
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
+    assert watcher.backend == 'stopped'
+
+
+def test_callback_errors_do_not_stop_the_watcher(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    calls = [threading.Event(), threading.Event()]
+
+    def callback():
+        next(event for event in calls if not event.is_set()).set()
+        raise RuntimeError('boom')
+
+    watcher = FileWatcher(path, callback, interval=0.05)
+    watcher.start()
+    try:
+        _replace(path, '{"a": 1}')
+        assert calls[0].wait(5)
+        _replace(path, '{"a": 2}')
+        assert calls[1].wait(5)
+    finally:
+        watcher.stop()
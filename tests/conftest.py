@@ -16,6 +16,9 @@ from rich.console import Console
 from rich.table import Table
 from rich.theme import Theme
 
+from config.config_duckdb import DuckDBConfig
+from engine.engine_pool import ConnectionManager
+
 # ---------- config ----------
 STATUS_COLUMNS = ['passed', 'failed', 'error', 'skipped', 'xfail', 'xpass']
 NUM_W = 5
@@ -39,6 +42,23 @@ COLOR = {
 _records: list[tuple[str, str, str]] = []
 
 
+# ---------- shared fixtures ----------
+@pytest.fixture
+def manager_threads() -> int:
+    """Cursors (and DuckDB threads) of `manager`; override or parametrize."""
+    return 2
+
+
+@pytest.fixture
+def manager(manager_threads: int):
+    """Manager over a small in-memory database, closed after the test."""
+    m = ConnectionManager(
+        DuckDBConfig(memory_limit='256MB', threads=manager_threads)
+    )
+    yield m
+    m.close_all()
+
+
 # ---------- helpers ----------
 def _split_nodeid(nodeid: str) -> tuple[str, str]:
     parts = nodeid.split('::')
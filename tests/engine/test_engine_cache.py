@@ -0,0 +1,137 @@
+import pyarrow as pa
+import pytest
+
+from config.config_duckdb import DuckDBConfig
+from engine.engine_cache import ResultCache, analyze_sql
+from engine.engine_pool import ConnectionManager
+
+
+@pytest.fixture
+def cache():
+    """Cache with a 1 MB budget (10% of a 10MB memory_limit)."""
+    manager = ConnectionManager(DuckDBConfig(memory_limit='10MB', threads=1))
+    return ResultCache(manager)
+
+
+def _table(rows):
+    return pa.table({'x': pa.array(range(rows), pa.int64())})
+
+
+@pytest.mark.parametrize(
+    'other',
+    [
+        'select A,  b\nFROM T AS y WHERE y.a > 1',
+        'SELECT a, b FROM t z WHERE z.A > 1',
+    ],
+)
+def test_equivalent_sql_shares_a_key(other):
+    """Whitespace, casing and table aliases don't change the key."""
+    base = analyze_sql('SELECT a, b FROM t AS x WHERE x.a > 1')
+    assert base.cacheable
+    assert analyze_sql(other).key == base.key
+    assert base.tables == {'t'}
+
+
+def test_different_sql_gets_a_different_key():
+    """Column aliases change the result schema, so they change the key."""
+    assert (
+        analyze_sql('SELECT a AS p FROM t').key
+        != analyze_sql('SELECT a AS q FROM t').key
+    )
+
+
+@pytest.mark.parametrize(
+    'sql',
+    [
+        'SELECT random()',
+        'SELECT now()',
+        "SELECT * FROM read_parquet('x.parquet')",
+        "SELECT * FROM parquet_scan('x.parquet')",
+        "SELECT * FROM 'x.csv'",
+        "SELECT count(*) FROM 'data/*.parquet' AS d",
+        'INSERT INTO t VALUES (1)',
+        'PRAGMA version',
+        'SELEC 1',
+    ],
+)
+def test_volatile_and_write_statements_are_not_cacheable(sql):
+    """Non-deterministic reads, writes and unknown SQL bypass the cache."""
+    assert not analyze_sql(sql).cacheable
+
+
+def test_write_invalidates_only_dependent_entries(cache):
+    """Writing t drops results that read t and keeps the rest."""
+    on_t = analyze_sql('SELECT * FROM t')
+    on_u = analyze_sql('SELECT * FROM u')
+    assert cache.put(on_t, _table(10))
+    assert cache.put(on_u, _table(10))
+
+    cache.invalidate_for(analyze_sql('UPDATE T SET x = 1'))
+
+    assert cache.get(on_t) is None
+    assert cache.get(on_u) is not None
+
+
+def test_results_reading_views_are_not_stored(cache):
+    """A write to a view's table can't drop results read through it."""
+    with cache.manager.cursor() as cursor:
+        cursor.execute('CREATE TABLE base_t AS SELECT 1 AS x')
+    cache.invalidate_for(analyze_sql('CREATE TABLE base_t (x INT)'))
+    on_view = analyze_sql('SELECT * FROM view_v')
+    assert cache.put(on_view, _table(10))
+
+    with cache.manager.cursor() as cursor:
+        cursor.execute('CREATE VIEW view_v AS SELECT * FROM base_t')
+    cache.invalidate_for(analyze_sql('CREATE VIEW view_v AS SELECT 1'))
+    assert cache.get(on_view) is None
+    assert not cache.put(on_view, _table(10))
+    assert cache.put(analyze_sql('SELECT * FROM base_t'), _table(10))
+
+
+def test_stale_result_is_not_stored(cache):
+    """A write between snapshot and store keeps the result out."""
+    shape = analyze_sql('SELECT * FROM t')
+    snapshot = cache.snapshot(shape)
+    cache.invalidate(['t'])
+    assert not cache.put(shape, _table(10), snapshot)
+
+
+def test_lru_eviction_respects_byte_budget(cache):
+    """Least recently used entries go first once the budget is exceeded."""
+    rows = cache.max_entry_bytes // 8  # int64 column
+    shapes = [analyze_sql(f'SELECT * FROM t{i}') for i in range(5)]
+    for shape in shapes[:4]:
+        assert cache.put(shape, _table(rows))
+    cache.get(shapes[0])  # touch: now most recently used
+    assert cache.put(shapes[4], _table(rows))
+
+    assert cache.nbytes <= cache.budget
+    assert cache.get(shapes[0]) is not None
+    assert cache.get(shapes[1]) is None
+
+
+def test_oversized_results_are_skipped(cache):
+    """Results above max_entry_bytes are never cached."""
+    shape = analyze_sql('SELECT * FROM big')
+    assert not cache.put(shape, _table(cache.max_entry_bytes))
+    assert len(cache) == 0
+
+
+def test_capture_caches_streamed_batches(cache):
+    """Streaming through capture stores the result once exhausted."""
+    shape = analyze_sql('SELECT * FROM t')
+    source = _table(100).to_reader(max_chunksize=10)
+    reader = cache.capture(shape, source, cache.snapshot(shape))
+    assert cache.get(shape) is None
+    assert reader.read_all().num_rows == 100
+    assert cache.get(shape).num_rows == 100
+
+
+def test_capture_skips_results_written_during_execution(cache):
+    """A write after the pre-execution snapshot keeps the result out."""
+    shape = analyze_sql('SELECT * FROM t')
+    snapshot = cache.snapshot(shape)
+    cache.invalidate(['t'])
+    reader = cache.capture(shape, _table(10).to_reader(), snapshot)
+    assert reader.read_all().num_rows == 10
+    assert cache.get(shape) is None
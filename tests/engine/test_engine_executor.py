@@ -0,0 +1,116 @@
+import asyncio
+import threading
+
+import duckdb
+import pytest
+
+from engine.engine_executor import QueryExecutor, QueueFullError
+
+SLOW_SQL = (
+    'SELECT count(*) FROM range(100000000000) t(a), range(10) u(b) '
+    'WHERE a + b < 0'
+)
+
+
+class FakeRequest:
+    """Stand-in for a Starlette request that disconnects on demand."""
+
+    def __init__(self) -> None:
+        self.gone = False
+
+    async def is_disconnected(self) -> bool:
+        return self.gone
+
+
+@pytest.fixture
+def executor(manager):
+    """Executor with a one-slot queue so backpressure is easy to hit."""
+    ex = QueryExecutor(manager, max_queue=1)
+    yield ex
+    ex.shutdown()
+
+
+def test_admission_is_bounded(executor):
+    """threads + max_queue slots are handed out, then QueueFullError."""
+    slots = [executor.admit() for _ in range(executor.capacity)]
+    with pytest.raises(QueueFullError):
+        executor.admit()
+    slots[0].release()
+    slots[0].release()  # idempotent
+    executor.admit().release()
+    for slot in slots[1:]:
+        slot.release()
+    assert executor.admitted == 0
+
+
+@pytest.mark.asyncio
+async def test_run_executes_off_the_event_loop(executor):
+    """Blocking work runs on a dedicated duckdb-query worker thread."""
+    name = await executor.run(lambda: threading.current_thread().name)
+    assert name.startswith('duckdb-query')
+    assert name != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_disconnect_interrupts_running_query(executor, manager):
+    """A client disconnect interrupts the cursor's running query."""
+    request = FakeRequest()
+    with manager.cursor() as cur:
+        task = asyncio.create_task(
+            executor.run(cur.execute, SLOW_SQL, cursor=cur, request=request)
+        )
+        await asyncio.sleep(0.2)
+        request.gone = True
+        with pytest.raises(duckdb.InterruptException):
+            await asyncio.wait_for(task, timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_pool_follows_threads_setting(executor, manager):
+    """Changing threads resizes the worker pool on next use."""
+    await executor.run(lambda: None)
+    assert executor._workers == 2
+    manager.reconfigure({'threads': 1})
+    await executor.run(lambda: None)
+    assert executor._workers == 1
+    assert executor.capacity == 2
+
+
+@pytest.mark.asyncio
+async def test_iterate_closes_iterator_when_abandoned(executor):
+    """Breaking out of iterate still closes the blocking iterator."""
+    closed = threading.Event()
+
+    def numbers():
+        try:
+            yield from range(100)
+        finally:
+            closed.set()
+
+    agen = executor.iterate(numbers())
+    assert [await agen.__anext__() for _ in range(3)] == [0, 1, 2]
+    await agen.aclose()
+    assert await asyncio.to_thread(closed.wait, 5)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_closes_the_late_result(executor):
+    """A result returned after its caller was cancelled gets closed."""
+    started, finish, closed = (threading.Event() for _ in range(3))
+
+    class Stream:
+        def close(self) -> None:
+            closed.set()
+
+    def open_stream():
+        started.set()
+        finish.wait(5)
+        return Stream()
+
+    task = asyncio.create_task(executor.run(open_stream))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    finish.set()
+    assert await asyncio.to_thread(closed.wait, 5)
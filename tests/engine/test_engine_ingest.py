@@ -0,0 +1,117 @@
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from engine.engine_cache import ResultCache, analyze_sql
+from engine.engine_ingest import (
+    IngestError,
+    Ingestor,
+    detect_format,
+    expand_sources,
+    quote_table,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Two parquet parts, a CSV and a JSON file with the same columns."""
+    for part in range(2):
+        ids = [part * 10 + i for i in range(10)]
+        pq.write_table(
+            pa.table({'id': ids, 'tag': ['p'] * 10}),
+            tmp_path / f'part-{part}.parquet',
+        )
+    (tmp_path / 'extra.csv').write_text('id,tag\n100,c\n101,c\n')
+    (tmp_path / 'extra.ndjson').write_text('{"id": 200, "tag": "j"}\n')
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    ('name', 'fmt'),
+    [
+        ('a.parquet', 'parquet'),
+        ('a.CSV', 'csv'),
+        ('a.csv.gz', 'csv'),
+        ('a.jsonl', 'json'),
+    ],
+)
+def test_detect_format(name, fmt):
+    assert detect_format(name) == fmt
+
+
+def test_detect_format_rejects_unknown():
+    with pytest.raises(IngestError):
+        detect_format('a.xlsx')
+
+
+def test_expand_sources_globs_and_dedupes(data_dir):
+    files = expand_sources(
+        [str(data_dir / '*.parquet'), str(data_dir / 'part-0.parquet')]
+    )
+    assert [f.name for f in files] == ['part-0.parquet', 'part-1.parquet']
+    with pytest.raises(IngestError):
+        expand_sources([str(data_dir / '*.nothing')])
+
+
+def test_expand_sources_takes_paths_literally(tmp_path):
+    """Paths are never globbed, so expanding twice is harmless."""
+    odd = tmp_path / 'a[1]*.csv'
+    odd.write_text('x\n1\n')
+    (tmp_path / 'a1.csv').write_text('x\n2\n')
+    assert expand_sources([odd]) == expand_sources(expand_sources([odd]))
+    assert [f.name for f in expand_sources([odd])] == ['a[1]*.csv']
+    with pytest.raises(IngestError):
+        expand_sources([tmp_path / '*.csv'])
+
+
+def test_quote_table_quotes_every_part():
+    assert quote_table('main.t; drop') == '"main"."t; drop"'
+
+
+def test_ingest_mixed_formats_reports_progress(manager, data_dir):
+    """Each file is loaded and reported; rows add up in the table."""
+    seen = []
+    result = Ingestor(manager).ingest(
+        'events',
+        [str(data_dir / '*.parquet'), str(data_dir / 'extra.*')],
+        on_progress=seen.append,
+    )
+    assert [p.index for p in seen] == [1, 2, 3, 4]
+    assert result.rows == 23
+    with manager.cursor() as cur:
+        assert cur.execute('SELECT count(*) FROM events').fetchone() == (23,)
+
+
+def test_ingest_replace_and_append(manager, data_dir):
+    ingestor = Ingestor(manager)
+    source = [str(data_dir / 'extra.csv')]
+    ingestor.ingest('t', source)
+    ingestor.ingest('t', source)
+    ingestor.ingest('t', source, mode='replace')
+    with manager.cursor() as cur:
+        assert cur.execute('SELECT count(*) FROM t').fetchone() == (2,)
+
+
+def test_failed_ingest_rolls_back(manager, data_dir):
+    """A bad file leaves the table as it was before the run."""
+    (data_dir / 'bad.csv').write_text('other\nx\n')
+    ingestor = Ingestor(manager)
+    ingestor.ingest('t', [str(data_dir / 'extra.csv')])
+    with pytest.raises(duckdb.Error):
+        ingestor.ingest(
+            't', [str(data_dir / 'extra.csv'), str(data_dir / 'bad.csv')]
+        )
+    with manager.cursor() as cur:
+        assert cur.execute('SELECT count(*) FROM t').fetchone() == (2,)
+
+
+def test_ingest_invalidates_its_own_cache(manager, data_dir):
+    """Results reading the loaded table are dropped from `cache` only."""
+    cache, other = ResultCache(manager), ResultCache(manager)
+    shape = analyze_sql('SELECT * FROM t')
+    for c in (cache, other):
+        c.put(shape, pa.table({'id': [1]}))
+    Ingestor(manager, cache).ingest('t', [str(data_dir / 'extra.csv')])
+    assert cache.get(shape) is None
+    assert other.get(shape) is not None
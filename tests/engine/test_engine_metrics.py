@@ -0,0 +1,110 @@
+import duckdb
+import pytest
+
+from engine.engine_metrics import (
+    QUERIES,
+    ROWS_STREAMED,
+    MetricsRegistry,
+    SlowQueries,
+    SlowQuery,
+    SlowQueryLog,
+)
+from engine.engine_stream import QueryStream, ndjson_chunks
+
+
+@pytest.fixture
+def manager_threads():
+    return 1
+
+
+@pytest.fixture
+def slow_log():
+    """Log every query while the test runs."""
+    settings = SlowQueries.settings()
+    SlowQueries.clear()
+    SlowQueries.configure(enabled=True, threshold_ms=0)
+    yield SlowQueries
+    SlowQueries.configure(**settings)
+    SlowQueries.clear()
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    hits = registry.counter('hits_total', 'Hits.', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency.', buckets=(1,))
+    registry.collected(
+        'open', 'Open.', ('pool',), lambda: [({'pool': 'a'}, 2)]
+    )
+
+    hits.inc(route='/a"b')
+    hits.inc(2, route='/a"b')
+    latency.observe(0.5)
+    latency.observe(3)
+
+    text = registry.render()
+    assert '# TYPE hits_total counter' in text
+    assert 'hits_total{route="/a\\"b"} 3' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_sum 3.5' in text
+    assert 'latency_seconds_count 2' in text
+    assert 'open{pool="a"} 2' in text
+    with pytest.raises(ValueError):
+        hits.inc(path='/')
+    with pytest.raises(ValueError):
+        registry.counter('hits_total', 'Again.')
+
+
+def test_slow_query_log_is_a_ring_buffer():
+    log = SlowQueryLog(enabled=True, threshold_ms=100, capacity=2)
+    for i in range(3):
+        log.add(SlowQuery(f't{i % 2}', f'q{i}', 1.0, 0, 0.0, {}))
+
+    assert [e.sql for e in log.entries()] == ['q2', 'q1']
+    assert [e.sql for e in log.entries('t1')] == ['q1']
+    assert log.is_slow(0.1) and not log.is_slow(0.05)
+    log.configure(capacity=1)
+    assert [e.sql for e in log.entries()] == ['q2']
+    with pytest.raises(ValueError):
+        log.configure(threshold_ms=-1)
+    assert log.clear() == 1
+
+
+def test_query_stream_counts_and_profiles(manager, slow_log):
+    before = QUERIES.value(tenant='metrics', outcome='ok')
+    rows_before = ROWS_STREAMED.value(tenant='metrics', format='ndjson')
+    stream = QueryStream(manager, 'metrics')
+    stream.execute('SELECT range AS x FROM range(10)', batch_rows=4)
+    lines = b''.join(ndjson_chunks(stream.reader, 'metrics')).splitlines()
+    stream.close()
+
+    assert len(lines) == 10
+    assert QUERIES.value(tenant='metrics', outcome='ok') == before + 1
+    assert (
+        ROWS_STREAMED.value(tenant='metrics', format='ndjson')
+        == rows_before + 10
+    )
+    [entry] = slow_log.entries('metrics')
+    assert entry.rows == 10 and 'range(10)' in entry.sql
+    assert entry.profile['children']
+    # The cursor goes back to the pool with profiling switched off.
+    with manager.cursor() as cur:
+        setting = "SELECT current_setting('enable_profiling')"
+        assert cur.execute(setting).fetchone()[0] is None
+
+
+def test_failed_and_abandoned_queries(manager):
+    errors = QUERIES.value(tenant='metrics', outcome='error')
+    abandoned = QUERIES.value(tenant='metrics', outcome='abandoned')
+
+    with pytest.raises(duckdb.CatalogException):
+        QueryStream(manager, 'metrics').execute('SELECT * FROM missing')
+    stream = QueryStream(manager, 'metrics')
+    stream.execute('SELECT * FROM range(100)', batch_rows=10)
+    next(iter(stream.reader))
+    stream.close()
+
+    assert QUERIES.value(tenant='metrics', outcome='error') == errors + 1
+    assert (
+        QUERIES.value(tenant='metrics', outcome='abandoned') == abandoned + 1
+    )
@@ -0,0 +1,225 @@
+import threading
+import time
+
+import duckdb
+import pytest
+
+from config.config_duckdb import DuckDBConfig
+from engine.engine_pool import (
+    ConnectionManager,
+    ConnectionPool,
+    DrainTimeoutError,
+    PoolClosedError,
+    PoolTimeoutError,
+)
+
+
+@pytest.fixture
+def config():
+    """Small in-memory config so tests don't depend on host resources."""
+    return DuckDBConfig(memory_limit='512MB', threads=2)
+
+
+@pytest.fixture
+def pool(config):
+    """Provide a pool that is always closed after the test."""
+    p = ConnectionPool(config)
+    yield p
+    p.close()
+
+
+def test_settings_are_applied_at_open(pool):
+    """memory_limit and threads from the config reach the database."""
+    with pool.cursor() as cur:
+        threads, null_order = cur.execute(
+            "SELECT current_setting('threads'), "
+            "current_setting('default_null_order')"
+        ).fetchone()
+    assert threads == 2
+    assert null_order.lower() == 'nulls_last'
+
+
+def test_cursors_share_one_database(pool):
+    """Every pooled cursor sees tables created through another cursor."""
+    with pool.cursor() as cur:
+        cur.execute('CREATE TABLE t AS SELECT 42 AS x')
+    with pool.cursor() as a, pool.cursor() as b:
+        assert a is not b
+        assert b.execute('SELECT x FROM t').fetchone() == (42,)
+
+
+def test_cursors_are_reused(pool):
+    """Released cursors go back to the pool instead of being recreated."""
+    with pool.cursor() as first:
+        pass
+    with pool.cursor() as second:
+        assert second is first
+    assert pool.created == 1
+    assert pool.in_use == 0
+
+
+def test_pool_is_bounded(pool):
+    """Acquiring past the bound times out instead of opening more."""
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.01)
+    for cur in held:
+        pool.release(cur)
+
+
+def test_waiter_gets_released_cursor(pool):
+    """A blocked acquire is served as soon as another caller releases."""
+    held = [pool.acquire(), pool.acquire()]
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(1.0)))
+    waiter.start()
+    pool.release(held.pop())
+    waiter.join()
+    assert len(got) == 1
+    pool.release(got[0])
+    pool.release(held.pop())
+
+
+def test_waiter_gets_capacity_freed_by_discard(pool):
+    """Discarding or shrinking away a cursor lets a waiter open one."""
+    held = [pool.acquire(), pool.acquire()]
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(5.0)))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(held.pop(), discard=True)
+    waiter.join()
+    assert len(got) == 1 and got[0] not in held
+    assert pool.created == 2
+
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(5.0)))
+    waiter.start()
+    time.sleep(0.05)
+    pool.apply_live({'threads': 3})
+    waiter.join()
+    assert len(got) == 2 and pool.created == 3
+    for cur in [*got, *held]:
+        pool.release(cur)
+
+
+def test_closed_pool_rejects_acquire(config):
+    """A closed pool refuses new work."""
+    p = ConnectionPool(config)
+    p.close()
+    with pytest.raises(PoolClosedError):
+        p.acquire()
+
+
+def test_manager_keeps_one_pool_per_uri(config):
+    """The manager opens a database once per connection_uri."""
+    manager = ConnectionManager(config)
+    try:
+        assert manager.pool() is manager.pool()
+        assert list(manager.pools) == [':memory:']
+    finally:
+        manager.close_all()
+    assert manager.pools == {}
+
+
+def test_persistent_read_only_maps_to_access_mode(tmp_path):
+    """read_only=True on a persistent db opens it in read_only mode."""
+    db_file = tmp_path / 'ro.duckdb'
+    rw = ConnectionPool(DuckDBConfig('persistent', str(db_file), '256MB', 1))
+    with rw.cursor() as cur:
+        cur.execute('CREATE TABLE t (x INT)')
+    rw.close()
+
+    ro_config = DuckDBConfig(
+        'persistent', str(db_file), '256MB', 1, read_only=True
+    )
+    assert ro_config.effective_access_mode() == 'read_only'
+    ro = ConnectionPool(ro_config)
+    try:
+        with ro.cursor() as cur, pytest.raises(duckdb.Error):
+            cur.execute('INSERT INTO t VALUES (1)')
+    finally:
+        ro.close()
+
+
+def test_reconfigure_applies_live_settings(config):
+    """threads/memory_limit changes reach the running database via SET."""
+    manager = ConnectionManager(config)
+    try:
+        with manager.cursor() as cur:
+            cur.execute('CREATE TABLE keep AS SELECT 1 AS x')
+        report = manager.reconfigure({'threads': 1, 'memory_limit': '256MB'})
+        assert report == {'live': ['memory_limit', 'threads'], 'reopened': []}
+        with manager.cursor() as cur:
+            assert cur.execute(
+                "SELECT current_setting('threads')"
+            ).fetchone() == (1,)
+            # Same database instance: no reconnect happened.
+            assert cur.execute('SELECT x FROM keep').fetchone() == (1,)
+        assert manager.pool().size == 1
+    finally:
+        manager.close_all()
+
+
+def test_reconfigure_reapplies_cursor_settings(config):
+    """Connection-local settings are refreshed on the next acquire."""
+    manager = ConnectionManager(config)
+    try:
+        with manager.cursor() as cur:
+            pass
+        manager.reconfigure({'enable_progress_bar': False})
+        with manager.cursor() as again:
+            assert again is cur
+            assert again.execute(
+                "SELECT current_setting('enable_progress_bar')"
+            ).fetchone() == (False,)
+    finally:
+        manager.close_all()
+
+
+def test_reconfigure_reopens_on_db_path_change(config, tmp_path):
+    """Switching to a persistent file drains and reconnects."""
+    manager = ConnectionManager(config)
+    db_file = tmp_path / 'switched.duckdb'
+    try:
+        old_pool = manager.pool()
+        report = manager.reconfigure(
+            {'db_type': 'persistent', 'db_path': str(db_file)}
+        )
+        assert report['reopened'] == ['db_path', 'db_type']
+        assert old_pool.closed
+        assert manager.config.connection_uri == str(db_file)
+        with manager.cursor() as cur:
+            cur.execute('CREATE TABLE t AS SELECT 1 AS x')
+        assert db_file.exists()
+    finally:
+        manager.close_all()
+
+
+def test_drain_times_out_while_cursor_is_held(config):
+    """A reconnect refuses to tear down a pool with a stuck query."""
+    p = ConnectionPool(config)
+    held = p.acquire()
+    try:
+        with pytest.raises(DrainTimeoutError):
+            p.drain(timeout=0.01)
+        # Pool stays usable after a failed drain.
+        with p.cursor() as cur:
+            assert cur.execute('SELECT 1').fetchone() == (1,)
+    finally:
+        p.release(held)
+        p.close()
+
+
+def test_reconfigure_validates_before_applying(config):
+    """An invalid value rejects the whole update, valid keys included."""
+    manager = ConnectionManager(config)
+    try:
+        with pytest.raises(ValueError):
+            manager.reconfigure({'memory_limit': '128MB', 'threads': 0})
+        assert manager.config.memory_limit == config.memory_limit
+        with manager.cursor() as cur:
+            assert cur.execute(
+                "SELECT current_setting('threads')"
+            ).fetchone() == (config.threads,)
+    finally:
+        manager.close_all()
@@ -0,0 +1,131 @@
+import datetime as dt
+import uuid
+from decimal import Decimal
+
+import duckdb
+import pytest
+
+from engine.engine_prepared import (
+    StatementNotFoundError,
+    StatementRegistry,
+    sql_literal,
+)
+
+
+@pytest.fixture
+def manager(manager):
+    """The shared manager with a lookup table."""
+    with manager.cursor() as cur:
+        cur.execute('CREATE TABLE kv (k INTEGER, v VARCHAR)')
+        cur.execute("INSERT INTO kv VALUES (1, 'one'), (2, 'two')")
+    return manager
+
+
+@pytest.fixture
+def registry(manager):
+    return StatementRegistry(manager)
+
+
+def test_register_counts_parameters(registry):
+    """? and $n placeholders are both counted once at registration."""
+    assert registry.register('SELECT * FROM kv WHERE k = ?').param_count == 1
+    assert registry.register('SELECT $2, $1, $1').param_count == 2
+    with pytest.raises(ValueError):
+        registry.register('SELECT ?, $1')
+    with pytest.raises(ValueError):
+        registry.register('SELECT 1; SELECT 2')
+
+
+def test_register_is_idempotent(registry):
+    """The same SQL maps to the same statement id."""
+    a = registry.register('SELECT v FROM kv WHERE k = ?')
+    b = registry.register('SELECT v FROM kv WHERE k = ?')
+    assert a is b
+    assert len(registry) == 1
+
+
+def test_execute_prepares_once_per_cursor(registry, manager):
+    """A cursor PREPAREs a statement on first use and EXECUTEs after."""
+    stmt = registry.register('SELECT v FROM kv WHERE k = ?')
+    with manager.cursor() as cur:
+        assert registry.execute(cur, stmt.id, [1]).fetchall() == [('one',)]
+        assert registry.execute(cur, stmt.id, [2]).fetchall() == [('two',)]
+        assert registry._prepared[cur] == {stmt.id}
+
+
+def test_execute_checks_parameter_count(registry, manager):
+    stmt = registry.register('SELECT v FROM kv WHERE k = ?')
+    with manager.cursor() as cur, pytest.raises(ValueError):
+        registry.execute(cur, stmt.id, [])
+
+
+def test_unknown_statement_raises(registry, manager):
+    with manager.cursor() as cur, pytest.raises(StatementNotFoundError):
+        registry.execute(cur, 's_missing', [])
+
+
+def test_execute_many_bulk_insert_uses_arrow_batch(registry, manager):
+    """Single-row INSERT ... VALUES is rewritten to a set-wise insert."""
+    stmt = registry.register('INSERT INTO kv VALUES (?, upper(?))')
+    assert stmt.bulk_sql is not None
+    with manager.cursor() as cur:
+        applied = registry.execute_many(
+            cur, stmt.id, [(i, f'v{i}') for i in range(10, 1010)]
+        )
+        assert applied == 1000
+        assert cur.execute(
+            'SELECT count(*), max(v) FROM kv WHERE k >= 10'
+        ).fetchone() == (1000, 'V999')
+
+
+def test_execute_many_falls_back_per_row(registry, manager):
+    """Non-insert statements run once per parameter set."""
+    stmt = registry.register('UPDATE kv SET v = ? WHERE k = ?')
+    assert stmt.bulk_sql is None
+    with manager.cursor() as cur:
+        registry.execute_many(cur, stmt.id, [('uno', 1), ('dos', 2)])
+        assert cur.execute('SELECT v FROM kv ORDER BY k').fetchall() == [
+            ('uno',),
+            ('dos',),
+        ]
+
+
+def test_execute_many_rolls_back_on_error(registry, manager):
+    """A failing parameter set leaves the table untouched."""
+    stmt = registry.register('INSERT INTO kv VALUES (CAST(? AS INTEGER), ?)')
+    with manager.cursor() as cur:
+        with pytest.raises(duckdb.ConversionException):
+            registry.execute_many(cur, stmt.id, [(3, 'a'), ('x', 'b')])
+        assert cur.execute('SELECT count(*) FROM kv').fetchone() == (2,)
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        None,
+        True,
+        42,
+        1.5,
+        float('nan'),
+        Decimal('12345678901234567890.123'),
+        "it's; DROP TABLE kv; --",
+        b'\x00\xffab',
+        uuid.UUID(int=7),
+        dt.date(2024, 2, 29),
+        dt.datetime(2024, 1, 2, 3, 4, 5),
+        dt.time(12, 30),
+    ],
+)
+def test_sql_literal_round_trips(manager, value):
+    """Rendered literals read back as the original value."""
+    with manager.cursor() as cur:
+        (got,) = cur.execute(f'SELECT {sql_literal(value)}').fetchone()
+    if isinstance(value, float) and value != value:
+        assert got != got
+    else:
+        assert got == value
+
+
+def test_sql_literal_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        sql_literal(object())
@@ -0,0 +1,150 @@
+import pytest
+
+from engine.engine_profile import Profiler, column_kind, profile_sql
+
+
+@pytest.fixture
+def manager(manager):
+    with manager.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE events AS
+            SELECT
+                range AS id,
+                CASE WHEN range % 10 = 0 THEN NULL ELSE range % 7 END AS x,
+                'tag' || (range % 5) AS tag,
+                DATE '2024-01-01' + (range % 30)::INTEGER AS stamp,
+                [range, range + 1] AS pair
+            FROM range(1000)
+            """
+        )
+    return manager
+
+
+def _append(manager, start, stop):
+    with manager.cursor() as cur:
+        cur.execute(
+            f"""
+            INSERT INTO events
+            SELECT range, range % 3, 'new' || (range % 50),
+                DATE '2024-03-01', [range]
+            FROM range({start}, {stop})
+            """
+        )
+
+
+def _columns(profile):
+    return {c.name: c for c in profile.columns}
+
+
+@pytest.mark.parametrize(
+    ('type_name', 'kind'),
+    [
+        ('BIGINT', 'numeric'),
+        ('DECIMAL(18,3)', 'numeric'),
+        ('DATE', 'temporal'),
+        ('VARCHAR', 'scalar'),
+        ('BIGINT[]', 'nested'),
+        ('STRUCT(a INTEGER)', 'nested'),
+    ],
+)
+def test_column_kind(type_name, kind):
+    assert column_kind(type_name) == kind
+
+
+def test_profile_is_one_aggregate_query():
+    sql = profile_sql('"t"', [('a', 'BIGINT'), ('b', 'VARCHAR')], None)
+    assert sql.count('SELECT') == 1
+    assert 'approx_count_distinct' not in sql
+    assert 'approx_quantile' in sql and 'WHERE rowid' not in sql
+    assert profile_sql('"t"', [('a', 'BIGINT')], 41).endswith(
+        'WHERE rowid > 41'
+    )
+
+
+def test_full_profile(manager):
+    profile = Profiler(manager).profile('events')
+    cols = _columns(profile)
+
+    assert profile.rows == 1000 and profile.refresh == 'full'
+    assert cols['x'].count == 900 and cols['x'].nulls == 100
+    assert (cols['x'].min, cols['x'].max) == (0, 6)
+    assert cols['x'].distinct == 7
+    assert cols['tag'].distinct == 5 and cols['tag'].quantiles is None
+    assert cols['id'].mean == pytest.approx(499.5)
+    assert cols['id'].quantiles['0.5'] == pytest.approx(500, abs=10)
+    assert str(cols['stamp'].min) == '2024-01-01'
+    assert cols['pair'].count == 1000 and cols['pair'].min is None
+
+
+def test_unchanged_table_is_served_from_cache(manager):
+    profiler = Profiler(manager)
+    first = profiler.profile('events')
+    again = profiler.profile('events')
+
+    assert again.refresh == 'cached'
+    assert again.to_dict()['columns'] == first.to_dict()['columns']
+
+
+def test_appended_rows_are_merged_incrementally(manager):
+    """Merged moments match a rescan exactly; sketches approximately."""
+    profiler = Profiler(manager)
+    profiler.profile('events')
+    _append(manager, 1000, 3000)
+
+    merged = profiler.profile('events')
+    full = Profiler(manager).profile('events')
+
+    assert merged.refresh == 'incremental'
+    assert merged.rows == full.rows == 3000
+    for name, column in _columns(full).items():
+        other = _columns(merged)[name]
+        assert (other.count, other.nulls) == (column.count, column.nulls)
+        assert (other.min, other.max) == (column.min, column.max)
+        if column.mean is not None:
+            assert other.mean == pytest.approx(column.mean)
+            assert other.variance == pytest.approx(column.variance)
+        assert other.distinct == pytest.approx(column.distinct, rel=0.05)
+    tag = _columns(merged)['tag']
+    assert tag.distinct == 55
+    median = _columns(merged)['id'].quantiles['0.5']
+    assert median == pytest.approx(1500, rel=0.1)
+
+
+def test_deleted_rows_trigger_a_rescan(manager):
+    profiler = Profiler(manager)
+    profiler.profile('events')
+    with manager.cursor() as cur:
+        cur.execute('DELETE FROM events WHERE id < 10')
+    _append(manager, 1000, 1010)
+
+    profile = profiler.profile('events')
+    assert profile.refresh == 'full'
+    assert profile.rows == 1000
+
+
+def test_updated_rows_trigger_a_rescan(manager):
+    """In-place UPDATEs keep count and rowids but not the checksum."""
+    profiler = Profiler(manager)
+    profiler.profile('events')
+    with manager.cursor() as cur:
+        cur.execute('UPDATE events SET x = 100 WHERE id = 1')
+
+    profile = profiler.profile('events')
+    assert profile.refresh == 'full'
+    assert _columns(profile)['x'].max == 100
+
+    with manager.cursor() as cur:
+        cur.execute('UPDATE events SET x = 200 WHERE id = 2')
+    _append(manager, 1000, 1010)
+    profile = profiler.profile('events')
+    assert profile.refresh == 'full'
+    assert _columns(profile)['x'].max == 200
+
+
+def test_force_rescans(manager):
+    profiler = Profiler(manager)
+    profiler.profile('events')
+    assert profiler.profile('events', force=True).refresh == 'full'
+    profiler.forget('EVENTS')
+    assert profiler.profile('events').refresh == 'full'
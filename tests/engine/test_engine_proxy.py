@@ -0,0 +1,82 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from engine.engine_proxy import WriterProxy
+from engine.engine_scheduler import ADDRESS_HEADER, client_id
+
+
+def _writer() -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/api/echo')
+    async def echo(request: Request, n: int = 0):
+        body = await request.body()
+        return {'n': n, 'body': body.decode(), 'path': request.url.path}
+
+    @app.get('/api/client')
+    async def client(request: Request):
+        return {'client': client_id(request)}
+
+    @app.get('/t/{tenant}/api/rows')
+    async def rows(tenant: str):
+        chunks = (f'{tenant}-{i}\n'.encode() for i in range(3))
+        return StreamingResponse(chunks, media_type='application/x-ndjson')
+
+    return app
+
+
+def _local() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/metrics')
+    async def metrics():
+        return PlainTextResponse('local')
+
+    return app
+
+
+def _client(
+    transport: httpx.AsyncBaseTransport,
+    address: tuple[str, int] = ('127.0.0.1', 123),
+) -> AsyncClient:
+    proxy = WriterProxy(_local(), transport=transport)
+    return AsyncClient(
+        transport=ASGITransport(app=proxy, client=address),
+        base_url='http://t',
+    )
+
+
+@pytest.mark.asyncio
+async def test_api_requests_are_forwarded_to_the_writer():
+    async with _client(ASGITransport(app=_writer())) as client:
+        echoed = await client.post('/api/echo?n=3', content=b'payload')
+        streamed = await client.get('/t/acme/api/rows')
+        local = await client.get('/metrics')
+
+    assert echoed.json() == {'n': 3, 'body': 'payload', 'path': '/api/echo'}
+    assert streamed.text == 'acme-0\nacme-1\nacme-2\n'
+    assert local.text == 'local'
+
+
+@pytest.mark.asyncio
+async def test_unreachable_writer_returns_502(tmp_path):
+    transport = httpx.AsyncHTTPTransport(uds=str(tmp_path / 'gone.sock'))
+    async with _client(transport) as client:
+        response = await client.get('/api/config')
+    assert response.status_code == 502
+    assert 'Writer process unavailable' in response.json()['detail']
+
+
+@pytest.mark.asyncio
+async def test_client_address_is_forwarded_not_spoofed():
+    """The writer, seeing no peer on its socket, uses the proxy's header."""
+    writer = ASGITransport(app=_writer(), client=None)
+    async with _client(writer, ('203.0.113.7', 5000)) as client:
+        plain = await client.get('/api/client')
+        spoofed = await client.get(
+            '/api/client', headers={ADDRESS_HEADER: '198.51.100.1'}
+        )
+    assert plain.json() == spoofed.json() == {'client': '203.0.113.7'}
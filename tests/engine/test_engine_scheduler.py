@@ -0,0 +1,187 @@
+import asyncio
+
+import duckdb
+import pytest
+
+from engine.engine_scheduler import (
+    ClientLimitError,
+    QueryScheduler,
+    RestrictedStatementError,
+    SlotTimeoutError,
+    check_allowed,
+    classify,
+)
+
+SLOW_SQL = (
+    'SELECT count(*) FROM range(100000000000) t(a), range(10) u(b) '
+    'WHERE a + b < 0'
+)
+
+
+@pytest.fixture
+def manager_threads():
+    """Three cursors, so two batch slots plus one spare."""
+    return 3
+
+
+def test_classify_uses_plan_estimates(manager):
+    """Large row estimates go to batch; LIMIT inputs don't count."""
+    with manager.planner() as cursor:
+        small = classify('SELECT sum(range) FROM range(1000)', cursor)
+        huge = classify(SLOW_SQL, cursor)
+        limited = classify('SELECT * FROM range(100000000000) LIMIT 5', cursor)
+
+    assert small.lane == 'interactive'
+    assert small.estimated_rows == 1000
+    assert huge.lane == 'batch'
+    assert huge.estimated_rows >= 100_000_000_000
+    assert limited.lane == 'interactive'
+
+
+@pytest.mark.parametrize(
+    'sql',
+    [
+        "SET GLOBAL memory_limit = '100GB'",
+        'SELECT 1; SET threads = 64',
+        'RESET memory_limit',
+        'PRAGMA threads = 64',
+        "ATTACH '/tmp/other.duckdb' AS other",
+        "COPY (SELECT 1) TO '/tmp/out.csv'",
+        "EXPORT DATABASE '/tmp/dump'",
+    ],
+)
+def test_settings_and_outside_access_are_refused(manager, sql):
+    """Client SQL can't lift its quota or reach past its database."""
+    with manager.planner() as cursor:
+        with pytest.raises(RestrictedStatementError):
+            check_allowed(cursor, sql)
+
+
+def test_reads_writes_and_copy_from_are_allowed(manager):
+    with manager.planner() as cursor:
+        for sql in [
+            'SELECT 1',
+            'PRAGMA version',
+            'CREATE TABLE t (x INT)',
+            "COPY t FROM 'data.csv'",
+            'SELEC 1',
+        ]:
+            check_allowed(cursor, sql)
+
+
+def test_classify_counts_joins_and_never_runs_scripts(manager):
+    """Many joins mean batch; scripts are parsed but not EXPLAINed."""
+    joins = ' '.join(f'JOIN range(2) t{i} USING (range)' for i in range(4))
+    assert classify(f'SELECT * FROM range(2) {joins}').lane == 'batch'
+
+    with manager.planner() as cursor:
+        cost = classify('SELECT 1; CREATE TABLE made AS SELECT 1', cursor)
+    assert cost.estimated_rows is None
+    with manager.cursor() as cursor:
+        with pytest.raises(duckdb.CatalogException):
+            cursor.execute('SELECT * FROM made')
+
+
+@pytest.mark.asyncio
+async def test_batch_queries_leave_a_slot_for_interactive(manager):
+    """Batch work stops at `batch_capacity`, keeping a slot free."""
+    scheduler = QueryScheduler(manager)
+    assert (scheduler.capacity, scheduler.batch_capacity) == (3, 2)
+    batch = [await scheduler.acquire('batch') for _ in range(2)]
+
+    waiting_batch = asyncio.create_task(scheduler.acquire('batch'))
+    await asyncio.sleep(0)
+    assert not waiting_batch.done()
+    (await asyncio.wait_for(scheduler.acquire(), 1)).release()
+
+    batch[0].release()
+    batch[1].release()
+    (await waiting_batch).release()
+    assert scheduler.running('batch') == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_queries_start_before_batch(manager):
+    """A freed slot goes to waiting interactive work ahead of batch."""
+    scheduler = QueryScheduler(manager)
+    batch = await scheduler.acquire('batch')
+    slots = [await scheduler.acquire() for _ in range(2)]
+
+    waiting_batch = asyncio.create_task(scheduler.acquire('batch'))
+    waiting_interactive = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    assert scheduler.waiting('batch') == scheduler.waiting('interactive') == 1
+
+    slots[0].release()
+    slots[0] = await waiting_interactive
+    assert not waiting_batch.done()
+    batch.release()
+    (await waiting_batch).release()
+    for slot in slots:
+        slot.release()
+    assert scheduler.running('interactive') == 0
+
+
+@pytest.mark.asyncio
+async def test_client_limit_and_wait_timeout(manager):
+    """Clients over their limit get ClientLimitError; waits time out."""
+    scheduler = QueryScheduler(manager, client_limit=1, wait_timeout=0.05)
+    slot = await scheduler.acquire(client='analyst')
+    with pytest.raises(ClientLimitError):
+        await scheduler.acquire(client='analyst')
+
+    others = [await scheduler.acquire() for _ in range(2)]
+    with pytest.raises(SlotTimeoutError):
+        await scheduler.acquire(client='dashboard')
+    assert scheduler.waiting('interactive') == 0
+
+    slot.release()
+    slot.release()  # idempotent
+    (await scheduler.acquire(client='analyst')).release()
+    for other in others:
+        other.release()
+
+
+@pytest.mark.asyncio
+async def test_timeout_interrupts_watched_cursor(manager):
+    """A query running past its lane's timeout is interrupted."""
+    scheduler = QueryScheduler(manager, timeouts={'batch': 0.2})
+    with await scheduler.acquire('batch') as slot:
+        with manager.cursor() as cursor:
+            slot.watch(cursor)
+            with pytest.raises(duckdb.InterruptException):
+                await asyncio.to_thread(cursor.execute, SLOW_SQL)
+            slot.unwatch()
+    assert slot.timed_out
+
+
+@pytest.mark.asyncio
+async def test_watching_covers_work_on_a_pooled_cursor(manager):
+    """`watching` interrupts a blocking call and unwatches afterwards."""
+    scheduler = QueryScheduler(manager, timeouts={'batch': 0.2})
+
+    def run(slot):
+        with manager.cursor() as cursor, slot.watching(cursor):
+            cursor.execute(SLOW_SQL)
+
+    with await scheduler.acquire('batch') as slot:
+        with pytest.raises(duckdb.InterruptException):
+            await asyncio.to_thread(run, slot)
+        assert slot._cursor is None
+
+
+@pytest.mark.asyncio
+async def test_slot_interrupts_its_cursor_on_request(manager):
+    """A slot stands in for its cursor, e.g. for disconnect handling."""
+    scheduler = QueryScheduler(manager)
+    with await scheduler.acquire() as slot:
+        slot.interrupt()  # nothing watched yet
+        with manager.cursor() as cursor, slot.watching(cursor):
+            running = asyncio.create_task(
+                asyncio.to_thread(cursor.execute, SLOW_SQL)
+            )
+            await asyncio.sleep(0.2)
+            slot.interrupt()
+            with pytest.raises(duckdb.InterruptException):
+                await running
+    assert not slot.timed_out
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from config.config_duckdb import DuckDBConfig
+from engine.engine_tenants import (
+    QuotaExceededError,
+    Tenant,
+    TenantNotFoundError,
+    TenantRegistry,
+)
+
+MB = 1000**2
+
+
+@pytest.fixture
+def tenants():
+    default = Tenant.create(
+        'default', DuckDBConfig(memory_limit='200MB', threads=1)
+    )
+    registry = TenantRegistry(default, budget=500 * MB)
+    yield registry
+    registry.close_all()
+    default.close()
+
+
+def test_tenants_get_isolated_databases(tenants):
+    team = tenants.add('team', {'memory_limit': '100MB', 'threads': 1})
+    with team.engine.cursor() as cur:
+        cur.execute('CREATE TABLE only_here AS SELECT 1 AS x')
+        assert cur.execute(
+            "SELECT current_setting('memory_limit')"
+        ).fetchone() == ('95.3 MiB',)
+    with tenants.default.engine.cursor() as cur:
+        assert not cur.execute(
+            "SELECT * FROM duckdb_tables() WHERE table_name = 'only_here'"
+        ).fetchall()
+    assert team.executor is not tenants.default.executor
+    assert tenants.allocated() == 300 * MB
+
+
+def test_memory_limits_stay_within_budget(tenants):
+    tenants.add('a', {'memory_limit': '250MB'})
+    with pytest.raises(QuotaExceededError):
+        tenants.add('b', {'memory_limit': '100MB'})
+    assert 'b' not in tenants
+    with pytest.raises(QuotaExceededError):
+        tenants.reconfigure('default', {'memory_limit': '300MB'})
+
+    tenants.reconfigure('default', {'memory_limit': '100MB'})
+    tenants.add('b', {'memory_limit': '100MB'})
+    assert tenants.allocated() == 450 * MB
+
+
+def test_missing_memory_limit_takes_the_rest(tenants):
+    team = tenants.add('team', {'threads': 1})
+    assert team.config.memory_limit == '300MB'
+    with pytest.raises(QuotaExceededError):
+        tenants.add('late', {'memory_limit': '1MB'})
+
+
+def test_exhausted_budget_refuses_a_default_memory_limit(tenants):
+    """No tenant is created with a leftover too small to run queries."""
+    tenants.add('a', {'memory_limit': '280MB'})
+    with pytest.raises(QuotaExceededError):
+        tenants.add('b', {'threads': 1})
+    assert 'b' not in tenants
+
+
+def test_load_applies_default_first(tenants):
+    tenants.load(
+        {
+            'x': {'memory_limit': '300MB'},
+            'default': {'memory_limit': '100MB'},
+        }
+    )
+    assert [t.name for t in tenants.all()] == ['default', 'x']
+    assert tenants.default.config.memory_limit == '100MB'
+
+
+def test_load_replaces_existing_settings(tenants):
+    """Fields a stored entry leaves out return to their defaults."""
+    team = tenants.add('team', {'threads': 1, 'enable_progress_bar': False})
+    allotted = team.config.memory_limit
+    tenants.load({'team': {'default_null_order': 'nulls_first'}})
+    defaults = team.config.defaults()
+    assert team.config.enable_progress_bar == defaults['enable_progress_bar']
+    assert team.config.threads == defaults['threads']
+    assert team.config.default_null_order == 'nulls_first'
+    assert team.config.memory_limit == allotted
+
+
+def test_persistent_database_belongs_to_one_tenant(tenants, tmp_path):
+    path = str(tmp_path / 'shared.duckdb')
+    settings = {'db_type': 'persistent', 'db_path': path}
+    tenants.add('a', {**settings, 'memory_limit': '10MB'})
+    with pytest.raises(ValueError, match='already the database'):
+        tenants.add('b', {**settings, 'memory_limit': '10MB'})
+
+
+def test_remove_and_invalid_names(tenants):
+    tenants.add('gone', {'memory_limit': '10MB'})
+    tenants.remove('gone')
+    with pytest.raises(TenantNotFoundError):
+        tenants.get('gone')
+    with pytest.raises(ValueError):
+        tenants.remove('default')
+    with pytest.raises(ValueError):
+        tenants.add('../etc')
+
+
+def test_reopening_a_tenant_does_not_block_the_registry(tenants, tmp_path):
+    """Lookups go on while a reconfigure drains; its target is reserved."""
+    team = tenants.add('team', {'memory_limit': '100MB', 'threads': 1})
+    path = str(tmp_path / 'team.duckdb')
+    settings = {'db_type': 'persistent', 'db_path': path}
+    with team.engine.cursor():
+        worker = threading.Thread(
+            target=tenants.reconfigure, args=('team', settings)
+        )
+        worker.start()
+        time.sleep(0.2)  # now draining, waiting for our cursor
+        started = time.perf_counter()
+        assert [t.name for t in tenants.all()] == ['default', 'team']
+        assert tenants.allocated() == 300 * MB
+        assert time.perf_counter() - started < 1
+        with pytest.raises(ValueError, match='already the database'):
+            tenants.add('other', {**settings, 'memory_limit': '10MB'})
+    worker.join(5)
+    assert not worker.is_alive()
+    assert team.config.db_path is not None
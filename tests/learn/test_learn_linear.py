@@ -0,0 +1,119 @@
+import duckdb
+import numpy as np
+import pytest
+
+from learn.learn_base import NotFittedError
+from learn.learn_linear import LinearRegression, LogisticRegression
+
+
+@pytest.fixture
+def con():
+    c = duckdb.connect()
+    c.execute('SELECT setseed(0.25)')
+    c.execute(
+        """
+        CREATE TABLE lin AS
+        SELECT a, b, 3 + 2 * a - 0.5 * b AS y
+        FROM (
+            SELECT range::DOUBLE AS a, (range * 7 % 13)::DOUBLE AS b
+            FROM range(200)
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE logit AS
+        SELECT x, (random() < 1 / (1 + exp(-(0.5 + 2 * x))))::INTEGER AS y
+        FROM (SELECT random() * 4 - 2 AS x FROM range(20000))
+        """
+    )
+    yield c
+    c.close()
+
+
+def test_linear_regression_recovers_coefficients(con):
+    model = LinearRegression('y').fit('lin', con)
+    assert model.features_ == ['a', 'b']
+    assert model.intercept_ == pytest.approx(3.0)
+    assert model.coef_ == pytest.approx({'a': 2.0, 'b': -0.5})
+    assert model.score('lin', con) == pytest.approx(1.0)
+
+
+def test_linear_regression_matches_numpy_lstsq(con):
+    rows = np.array(con.execute('SELECT a, b, y FROM lin').fetchall())
+    noisy = rows[:, 2] + np.sin(rows[:, 0])
+    con.execute('CREATE TABLE noisy AS SELECT a, b, y + sin(a) AS y FROM lin')
+    design = np.column_stack([np.ones(len(rows)), rows[:, :2]])
+    expected = np.linalg.lstsq(design, noisy, rcond=None)[0]
+    model = LinearRegression('y', ['a', 'b']).fit('noisy', con)
+    assert [model.intercept_, *model.coef_.values()] == pytest.approx(expected)
+
+
+def test_linear_regression_single_scan(con):
+    sql = LinearRegression('y').normal_equations_sql('lin', ['a', 'b'])
+    # One aggregate over one scan of the (filtered) source.
+    assert sql.count('FROM lin') == 1
+    assert sql.count('sum(') == 6 + 3
+
+
+def test_linear_regression_skips_null_rows(con):
+    con.execute('INSERT INTO lin VALUES (NULL, 1, 100), (1, 1, NULL)')
+    model = LinearRegression('y').fit('lin', con)
+    assert model.n_samples_ == 200
+    assert model.coef_['a'] == pytest.approx(2.0)
+
+
+def test_ridge_shrinks_coefficients(con):
+    plain = LinearRegression('y', ['a']).fit('lin', con)
+    ridge = LinearRegression('y', ['a'], alpha=1e6).fit('lin', con)
+    assert abs(ridge.coef_['a']) < abs(plain.coef_['a'])
+
+
+def test_predict_compiles_to_sql(con):
+    model = LinearRegression('y').fit('lin', con)
+    sql = model.predict_sql('SELECT * FROM lin WHERE a < 3')
+    assert 'SUM' not in sql
+    rows = con.execute(sql).fetchall()
+    assert [row[-1] for row in rows] == pytest.approx([row[2] for row in rows])
+
+
+def test_logistic_regression_irls(con):
+    model = LogisticRegression('y', ['x']).fit('logit', con)
+    assert 1 < model.n_iter_ < model.max_iter
+    assert model.intercept_ == pytest.approx(0.5, abs=0.1)
+    assert model.coef_['x'] == pytest.approx(2.0, abs=0.15)
+
+    (accuracy,) = (
+        model.predict('logit', con)
+        .aggregate('avg((prediction = y)::DOUBLE)')
+        .fetchone()
+    )
+    assert accuracy > 0.75
+    probabilities = con.execute(model.predict_proba_sql('logit')).fetchall()
+    assert all(0 <= row[-1] <= 1 for row in probabilities)
+
+
+def test_logistic_regression_rejects_non_binary_target(con):
+    with pytest.raises(ValueError, match='0 and 1'):
+        LogisticRegression('y', ['a']).fit('lin', con)
+
+
+@pytest.mark.parametrize(
+    ('params', 'match'),
+    [({'max_iter': 0}, 'max_iter'), ({'tol': -1.0}, 'tol')],
+)
+def test_logistic_regression_rejects_bad_params(con, params, match):
+    with pytest.raises(ValueError, match=match):
+        LogisticRegression('y', ['x'], **params).fit('logit', con)
+
+
+def test_predict_before_fit():
+    with pytest.raises(NotFittedError):
+        LinearRegression('y').predict_sql('lin')
+
+
+def test_fit_uses_engine_pool_by_default():
+    model = LinearRegression('y', ['x']).fit(
+        'SELECT range AS x, 2 * range + 1 AS y FROM range(10)'
+    )
+    assert model.coef_ == pytest.approx({'x': 2.0})
@@ -0,0 +1,117 @@
+import duckdb
+import pytest
+
+from learn.learn_base import to_sql
+from learn.learn_linear import LinearRegression, LogisticRegression
+from learn.learn_model_selection import (
+    KFold,
+    cross_validate,
+    train_test_split,
+)
+from learn.learn_pipeline import Pipeline
+from learn.learn_preprocessing import StandardScaler
+
+
+@pytest.fixture
+def con():
+    c = duckdb.connect()
+    c.execute(
+        """
+        CREATE TABLE data AS
+        SELECT range AS id, range::DOUBLE AS x, 3 * range + sin(range) AS y
+        FROM range(1000)
+        """
+    )
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def manager_threads():
+    return 4
+
+
+@pytest.fixture
+def manager(manager):
+    with manager.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE cv AS
+            SELECT range::DOUBLE AS x, 3 * range + sin(range) AS y,
+                (range % 7 < 3)::INTEGER AS label
+            FROM range(1000)
+            """
+        )
+    return manager
+
+
+def _ids(con, query):
+    return {row[0] for row in con.execute(to_sql(query)).fetchall()}
+
+
+def test_train_test_split_is_deterministic_complement(con):
+    train, test = train_test_split('data', test_size=0.2, seed=7)
+    train_ids, test_ids = _ids(con, train), _ids(con, test)
+    assert train_ids.isdisjoint(test_ids)
+    assert len(train_ids | test_ids) == 1000
+    assert 120 < len(test_ids) < 280
+    again = train_test_split('data', test_size=0.2, seed=7)[1]
+    assert _ids(con, again) == test_ids
+    other = train_test_split('data', test_size=0.2, seed=8)[1]
+    assert _ids(con, other) != test_ids
+
+
+def test_train_test_split_by_key_columns(con):
+    _, test = train_test_split('SELECT * FROM data', key=['id'])
+    assert 'HASH("id", 0)' in to_sql(test)
+    with pytest.raises(ValueError):
+        train_test_split('data', test_size=1.5)
+
+
+def test_kfold_partitions_rows(con):
+    folds = list(KFold(4, seed=1).split('data'))
+    tests = [_ids(con, test) for _, test in folds]
+    assert sum(len(ids) for ids in tests) == 1000
+    assert set().union(*tests) == set(range(1000))
+    for (train, _), test_ids in zip(folds, tests, strict=True):
+        assert _ids(con, train) == set(range(1000)) - test_ids
+
+
+def test_kfold_views(con):
+    names = KFold(3).create_views('data', con, 'fold')
+    assert names[0] == ('fold_train_0', 'fold_test_0')
+    (tables,) = con.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE table_name LIKE 'fold%'"
+    ).fetchone()
+    assert tables == 0
+    counts = [
+        con.execute(f'SELECT count(*) FROM {test}').fetchone()[0]
+        for _, test in names
+    ]
+    assert sum(counts) == 1000
+    with pytest.raises(ValueError):
+        KFold(3).create_views('data', con, 'bad; DROP TABLE data')
+
+
+def test_cross_validate_runs_folds_on_pool(manager):
+    result = cross_validate(
+        Pipeline([StandardScaler(['x']), LinearRegression('y')]),
+        'cv',
+        cv=KFold(4),
+        manager=manager,
+    )
+    assert len(result.scores) == 4
+    assert result.mean > 0.99
+    coefs = [model.estimator.coef_['x'] for model in result.estimators]
+    assert len({round(c, 6) for c in coefs}) == 4
+    assert set(result.to_dict()) == {'scores', 'mean', 'fit_seconds'}
+
+
+def test_cross_validate_logistic_accuracy(manager):
+    result = cross_validate(
+        LogisticRegression('label', ['x'], max_iter=5),
+        'cv',
+        cv=3,
+        manager=manager,
+    )
+    assert all(0 <= score <= 1 for score in result.scores)
@@ -0,0 +1,128 @@
+import duckdb
+import pytest
+
+from learn.learn_base import NotFittedError
+from learn.learn_linear import LinearRegression, LogisticRegression
+from learn.learn_pipeline import Filter, Pipeline
+from learn.learn_preprocessing import (
+    OneHotEncoder,
+    SimpleImputer,
+    StandardScaler,
+)
+
+
+@pytest.fixture
+def con():
+    c = duckdb.connect()
+    c.execute(
+        """
+        CREATE TABLE data AS
+        SELECT
+            range::DOUBLE AS x,
+            CASE WHEN range % 5 = 0 THEN NULL ELSE range % 3 END AS b,
+            ['a', 'b', 'c'][range % 3 + 1] AS "cat",
+            2 * range + 1 AS y
+        FROM range(100)
+        """
+    )
+    yield c
+    c.close()
+
+
+def _pipeline():
+    return Pipeline(
+        [
+            SimpleImputer(['b']),
+            StandardScaler(['x', 'b']),
+            Filter('x > -1'),
+            OneHotEncoder(['cat']),
+            ('model', LinearRegression('y')),
+        ]
+    )
+
+
+def test_steps_are_named_and_validated():
+    pipeline = _pipeline()
+    assert list(pipeline.named_steps) == [
+        'simpleimputer',
+        'standardscaler',
+        'filter',
+        'onehotencoder',
+        'model',
+    ]
+    with pytest.raises(ValueError, match='last'):
+        Pipeline([LinearRegression('y'), StandardScaler()])
+    with pytest.raises(ValueError, match='Duplicate'):
+        Pipeline([('a', StandardScaler()), ('a', StandardScaler())])
+    with pytest.raises(TypeError):
+        Pipeline([object()])
+
+
+def test_transform_is_one_fused_select(con):
+    pipeline = _pipeline().fit('data', con)
+    sql = pipeline.transform_sql('data')
+    # Projections fused and the filter pushed onto the scan.
+    assert sql.count('SELECT') == 1
+    assert 'WHERE' in sql
+    assert pipeline.transform('data', con).columns == [
+        'x',
+        'b',
+        'cat_a',
+        'cat_b',
+        'cat_c',
+        'y',
+    ]
+
+
+def test_fused_transform_matches_step_by_step(con):
+    pipeline = _pipeline().fit('data', con)
+    steps = pipeline.named_steps
+    staged = steps['simpleimputer'].transform_sql('data')
+    staged = steps['standardscaler'].transform_sql(staged)
+    staged = f'SELECT * FROM ({staged}) WHERE x > -1'
+    staged = steps['onehotencoder'].transform_sql(staged)
+    expected = con.execute(staged).fetchall()
+    assert pipeline.transform('data', con).fetchall() == pytest.approx(
+        expected
+    )
+
+
+def test_filter_applies_before_later_fits(con):
+    pipeline = Pipeline([Filter('x >= 50'), StandardScaler(['x'])])
+    pipeline.fit('data', con)
+    assert pipeline.named_steps['standardscaler'].mean_ == {'x': 74.5}
+
+
+def test_predict_and_explain(con):
+    pipeline = _pipeline().fit('data', con)
+    rows = pipeline.predict('data', con).fetchall()
+    assert [row[-1] for row in rows] == pytest.approx(
+        [row[-2] for row in rows]
+    )
+    explained = pipeline.explain('data')
+    assert explained.startswith('SELECT')
+    assert 'prediction' in explained
+
+
+def test_materialized_fit_matches_lazy_fit(con):
+    def pipeline():
+        return Pipeline(
+            [
+                StandardScaler(['x']),
+                LogisticRegression('label', ['x'], max_iter=5),
+            ]
+        )
+
+    source = 'SELECT x, (x % 7 < 3)::INTEGER AS label FROM data'
+    lazy = pipeline().fit(source, con)
+    stored = pipeline().fit(source, con, materialize=True)
+    assert stored.estimator.coef_ == pytest.approx(lazy.estimator.coef_)
+    tables = con.execute(
+        'SELECT count(*) FROM duckdb_tables() WHERE temporary'
+    ).fetchone()
+    assert tables == (0,)
+
+
+def test_predict_without_estimator():
+    with pytest.raises(NotFittedError):
+        Pipeline([StandardScaler()]).predict_sql('data')
@@ -0,0 +1,120 @@
+import duckdb
+import pytest
+
+from learn.learn_base import NotFittedError, source_expression, to_sql
+from learn.learn_preprocessing import (
+    MinMaxScaler,
+    OneHotEncoder,
+    OrdinalEncoder,
+    SimpleImputer,
+    StandardScaler,
+)
+
+
+@pytest.fixture
+def con():
+    c = duckdb.connect()
+    c.execute(
+        """
+        CREATE TABLE data AS SELECT * FROM (VALUES
+            (1, 'a', 2.0),
+            (2, 'b', NULL),
+            (3, NULL, 4.0),
+            (4, 'a', 6.0)
+        ) v(x, "cat", y)
+        """
+    )
+    yield c
+    c.close()
+
+
+def test_source_expression_accepts_tables_and_queries():
+    assert to_sql(source_expression('main.data')) == 'main.data'
+    query = to_sql(source_expression('SELECT * FROM data WHERE x > 1;'))
+    assert query == '(SELECT * FROM data WHERE x > 1) AS _src'
+
+
+def test_standard_scaler_matches_duckdb(con):
+    scaler = StandardScaler().fit('data', con)
+    assert scaler.columns_ == ['x', 'y']
+    expected = con.execute(
+        'SELECT (x - avg(x) OVER ()) / stddev_pop(x) OVER () FROM data'
+    ).fetchall()
+    got = scaler.transform('data', con).fetchall()
+    assert [row[0] for row in got] == pytest.approx([e[0] for e in expected])
+    # Untouched columns pass through in place.
+    assert [row[1] for row in got] == ['a', 'b', None, 'a']
+    assert scaler.feature_names_out_ == ['x', 'cat', 'y']
+
+
+def test_standard_scaler_constant_column(con):
+    scaler = StandardScaler(['x']).fit('SELECT 5 AS x FROM range(3)', con)
+    assert scaler.scale_ == {'x': 1.0}
+    rows = scaler.transform('SELECT 5 AS x', con).fetchall()
+    assert rows == [(0.0,)]
+
+
+def test_fit_runs_one_aggregate_query(con):
+    sql = StandardScaler(['x', 'y']).fit_aggregate_sql('data')
+    assert sql.count('SELECT') == 1
+    assert 'STDDEV_POP' in sql
+
+
+def test_min_max_scaler_range(con):
+    scaler = MinMaxScaler(['x'], feature_range=(-1, 1)).fit('data', con)
+    rows = scaler.transform('data', con).fetchall()
+    assert [row[0] for row in rows] == pytest.approx([-1, -1 / 3, 1 / 3, 1])
+    with pytest.raises(ValueError):
+        MinMaxScaler(feature_range=(1, 1))
+
+
+def test_one_hot_encoder(con):
+    encoder = OneHotEncoder(['cat']).fit('data', con)
+    assert encoder.categories_ == {'cat': ['a', 'b']}
+    assert encoder.feature_names_out_ == ['x', 'cat_a', 'cat_b', 'y']
+    rows = encoder.transform('data', con).fetchall()
+    assert [row[1:3] for row in rows] == [(1, 0), (0, 1), (0, 0), (1, 0)]
+
+
+def test_ordinal_encoder_unknown_values(con):
+    encoder = OrdinalEncoder().fit('data', con)
+    assert encoder.columns_ == ['cat']
+    rows = encoder.transform(
+        "SELECT * FROM (VALUES (1, 'b', 1.0), (2, 'zzz', 1.0), "
+        '(3, NULL, 1.0)) v(x, "cat", y)',
+        con,
+    ).fetchall()
+    assert [row[1] for row in rows] == [1, -1, -1]
+
+
+@pytest.mark.parametrize(
+    ('strategy', 'fill'),
+    [('mean', 4.0), ('median', 4.0), ('constant', 0.5)],
+)
+def test_simple_imputer(con, strategy, fill):
+    imputer = SimpleImputer(['y'], strategy=strategy, fill_value=0.5)
+    rows = imputer.fit('data', con).transform('data', con).fetchall()
+    assert float(rows[1][2]) == fill
+    assert float(rows[0][2]) == 2.0
+
+
+def test_simple_imputer_most_frequent(con):
+    imputer = SimpleImputer(['cat'], strategy='most_frequent').fit('data', con)
+    assert imputer.statistics_ == {'cat': 'a'}
+    rows = imputer.transform('data', con).fetchall()
+    assert [row[1] for row in rows] == ['a', 'b', 'a', 'a']
+
+
+def test_transform_before_fit():
+    with pytest.raises(NotFittedError):
+        StandardScaler().transform_sql('data')
+
+
+def test_unknown_column(con):
+    with pytest.raises(ValueError, match='nope'):
+        StandardScaler(['nope']).fit('data', con)
+
+
+def test_fit_uses_engine_pool_by_default():
+    scaler = StandardScaler().fit('SELECT range AS r FROM range(5)')
+    assert scaler.mean_ == {'r': 2.0}
@@ -0,0 +1,135 @@
+import datetime as dt
+from decimal import Decimal
+
+import duckdb
+import numpy as np
+import pytest
+
+from learn.learn_linear import LinearRegression
+from learn.learn_pipeline import Filter, Pipeline
+from learn.learn_preprocessing import (
+    MinMaxScaler,
+    OneHotEncoder,
+    SimpleImputer,
+)
+from learn.learn_registry import (
+    INLINE_LIMIT,
+    ModelNotFoundError,
+    ModelRegistry,
+)
+
+
+@pytest.fixture
+def con():
+    c = duckdb.connect()
+    c.execute(
+        """
+        CREATE TABLE data AS
+        SELECT
+            range::DOUBLE AS x,
+            (range % 100)::VARCHAR AS "cat",
+            (range % 7)::DECIMAL(4, 1) AS d,
+            DATE '2024-01-01' + (range % 3)::INTEGER AS day,
+            2 * range AS y
+        FROM range(1000)
+        """
+    )
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path / 'models')
+
+
+def _pipeline(con):
+    return Pipeline(
+        [
+            ('median', SimpleImputer(['d'], strategy='median')),
+            ('mode', SimpleImputer(['day'], strategy='most_frequent')),
+            MinMaxScaler(['x'], feature_range=(-1, 1)),
+            Filter('x > -0.9'),
+            OneHotEncoder(['cat']),
+            ('model', LinearRegression('y')),
+        ]
+    ).fit('data', con)
+
+
+def test_round_trip_preserves_sql(con, registry):
+    pipeline = _pipeline(con)
+    info = registry.save(pipeline, name='demo')
+    assert info.kind == 'Pipeline'
+    assert info.to_dict()['name'] == 'demo'
+
+    loaded = ModelRegistry(registry.root).load(info.id)
+    assert loaded.predict_sql('data') == pipeline.predict_sql('data')
+    steps = loaded.named_steps
+    assert isinstance(steps['median'].statistics_['d'], Decimal)
+    assert steps['minmaxscaler'].feature_range == (-1, 1)
+
+
+def test_large_state_goes_to_binary_files(con, registry):
+    info = registry.save(_pipeline(con))
+    files = {path.suffix for path in info.path.iterdir()}
+    # 100 categories (Parquet) and 100+ coefficients (npy).
+    assert files == {'.json', '.parquet', '.npy'}
+    assert len(_pipeline(con).estimator.coef_) >= INLINE_LIMIT
+
+
+def test_ids_are_content_hashes(con, registry):
+    first = registry.save(_pipeline(con))
+    again = registry.save(_pipeline(con))
+    assert again.id == first.id
+    other = registry.save(LinearRegression('y', ['x']).fit('data', con))
+    assert other.id != first.id
+    assert [info.id for info in registry.list()] == [other.id, first.id]
+
+
+def test_load_is_cached(con, registry):
+    info = registry.save(LinearRegression('y', ['x']).fit('data', con))
+    assert registry.load(info.id) is registry.load(info.id)
+
+
+def test_delete_and_unknown_ids(con, registry):
+    info = registry.save(LinearRegression('y', ['x']).fit('data', con))
+    registry.delete(info.id)
+    with pytest.raises(ModelNotFoundError):
+        registry.load(info.id)
+    with pytest.raises(ModelNotFoundError):
+        registry.info('../etc')
+    assert registry.list() == []
+
+
+def test_rejects_unknown_objects(registry):
+    scaler = MinMaxScaler()
+    scaler.extra = object()
+    with pytest.raises(TypeError):
+        registry.save(scaler)
+
+
+def test_numpy_and_dates_round_trip(registry):
+    scaler = MinMaxScaler(['x'])
+    scaler.columns_ = ['x']
+    scaler.feature_names_in_ = ['x']
+    scaler.data_min_ = {'x': np.float64(1.5)}
+    scaler.data_max_ = {'x': 3.0}
+    scaler.fitted_at = dt.date(2024, 1, 2)
+    loaded = registry.load(registry.save(scaler).id)
+    assert loaded.data_min_ == {'x': 1.5}
+    assert loaded.fitted_at == dt.date(2024, 1, 2)
+
+
+def test_numeric_lists_keep_their_dtype_and_stay_mapped(registry):
+    """Int lists stay ints; loaded arrays are memory-mapped, not parsed."""
+    scaler = MinMaxScaler(['x'])
+    scaler.ids = list(range(INLINE_LIMIT))
+    scaler.weights = [i / 2 for i in range(INLINE_LIMIT)]
+    scaler.by_id = dict.fromkeys(range(INLINE_LIMIT), 1)
+    loaded = registry.load(registry.save(scaler).id)
+
+    assert isinstance(loaded.ids, np.memmap)
+    assert loaded.ids.dtype == np.int64 and loaded.weights.dtype == float
+    assert loaded.ids.tolist() == scaler.ids
+    assert loaded.by_id == scaler.by_id
+    assert type(next(iter(loaded.by_id.values()))) is int
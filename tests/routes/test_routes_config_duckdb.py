@@ -0,0 +1,141 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import _reload_settings, app
+from config.config_load_save import Config
+from engine.engine_pool import Engine
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Keep settings saved through the API out of the real config dir."""
+    monkeypatch.setattr(Config, '_config_dir', tmp_path)
+    monkeypatch.setattr(Config, '_config_path', tmp_path / 'settings.json')
+    monkeypatch.setattr(Config, '_data', {})
+    yield
+    Config.flush()
+
+
+@pytest.fixture(autouse=True)
+def restore_engine_config():
+    """Undo config changes made through the API after each test."""
+    original = Engine.config.to_dict()
+    yield
+    Engine.reconfigure(original)
+
+
+@pytest.mark.asyncio
+async def test_get_config_returns_current_settings():
+    """GET returns the active DuckDBConfig as a dict."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.get('/api/config')
+
+    assert response.status_code == 200
+    assert response.json() == Engine.config.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_put_config_updates_live_database():
+    """PUT pushes threads to the running engine, not just the object."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.put('/api/config', json={'threads': 1})
+
+    assert response.status_code == 200
+    assert response.json()['threads'] == 1
+    with Engine.cursor() as cur:
+        assert cur.execute("SELECT current_setting('threads')").fetchone() == (
+            1,
+        )
+
+
+@pytest.mark.asyncio
+async def test_put_config_rejects_invalid_memory_limit():
+    """Invalid memory sizes are rejected and leave config unchanged."""
+    before = Engine.config.memory_limit
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.put('/api/config', json={'memory_limit': 'lots'})
+
+    assert response.status_code == 422
+    assert Engine.config.memory_limit == before
+
+
+@pytest.mark.asyncio
+async def test_autotune_reports_derivation():
+    """The derived settings come with their sources and steps."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.get('/api/config/autotune')
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body['limits']['memory_source']
+    assert set(body['steps']) == set(body['in_use'])
+    assert body['in_use']['temp_directory'] is True
+
+
+@pytest.mark.asyncio
+async def test_patch_changes_only_sent_fields():
+    """PATCH keeps everything it wasn't given; unknown keys are 422."""
+    before = Engine.config.to_dict()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.patch(
+            '/api/config', json={'enable_progress_bar': False}
+        )
+        unknown = await ac.patch('/api/config', json={'thread': 2})
+        too_many = await ac.patch('/api/config', json={'threads': 10**6})
+
+    assert response.status_code == 200
+    assert response.json() == {**before, 'enable_progress_bar': False}
+    assert unknown.status_code == 422
+    assert too_many.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_if_match_rejects_stale_writers():
+    """Two writers with the same ETag: the second one gets 412."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        read = await ac.get('/api/config')
+        etag = read.headers['etag']
+        unchanged = await ac.get(
+            '/api/config', headers={'If-None-Match': etag}
+        )
+        first = await ac.patch(
+            '/api/config',
+            json={'enable_progress_bar': False},
+            headers={'If-Match': etag},
+        )
+        second = await ac.patch(
+            '/api/config',
+            json={'default_null_order': 'nulls_first'},
+            headers={'If-Match': etag},
+        )
+
+    assert unchanged.status_code == 304
+    assert first.status_code == 200
+    assert first.headers['etag'] != etag
+    assert second.status_code == 412
+    assert Engine.config.default_null_order == 'nulls_last'
+
+
+@pytest.mark.asyncio
+async def test_reload_after_put_resets_omitted_fields():
+    """A worker that saw an earlier PATCH drops it when PUT replaces it."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        await ac.patch(
+            '/api/config', json={'default_null_order': 'nulls_first'}
+        )
+        await ac.put('/api/config', json={'enable_progress_bar': False})
+    # Another worker still has the PATCHed setting when it reloads.
+    Engine.reconfigure({'default_null_order': 'nulls_first'})
+    Config.flush()
+    _reload_settings(Config.data)
+
+    assert Config.data['tenants']['default'] == {'enable_progress_bar': False}
+    assert Engine.config.default_null_order == 'nulls_last'
+    assert Engine.config.enable_progress_bar is False
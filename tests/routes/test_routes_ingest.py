@@ -0,0 +1,67 @@
+import orjson
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from engine.engine_pool import Engine
+
+
+def _events(response):
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_ingest_server_files_streams_progress(tmp_path):
+    """Each file yields a progress event followed by a summary."""
+    for i in range(2):
+        (tmp_path / f'f{i}.csv').write_text(f'a,b\n{i},x\n{i},y\n')
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/ingest',
+            json={
+                'table': 'ingest_api',
+                'sources': [str(tmp_path / '*.csv')],
+                'mode': 'replace',
+            },
+        )
+
+    assert response.status_code == 200
+    events = _events(response)
+    assert [e['event'] for e in events] == ['file', 'file', 'done']
+    assert events[-1]['rows'] == 4
+
+
+@pytest.mark.asyncio
+async def test_ingest_missing_files_returns_400(tmp_path):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/ingest',
+            json={'table': 't', 'sources': [str(tmp_path / 'none*.csv')]},
+        )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_ingest_upload_multipart():
+    """Uploaded parts are spooled to disk and loaded, whatever their name."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/ingest/upload',
+            data={'table': 'uploaded', 'mode': 'replace'},
+            files=[
+                ('files', ('one[1]*?.csv', b'k,v\n1,a\n', 'text/csv')),
+                (
+                    'files',
+                    ('two.ndjson', b'{"k": 2, "v": "b"}\n', 'text/plain'),
+                ),
+            ],
+        )
+
+    assert response.status_code == 200
+    done = _events(response)[-1]
+    assert (done['event'], done['rows'], done['files']) == ('done', 2, 2)
+    with Engine.cursor() as cur:
+        assert cur.execute('SELECT sum(k) FROM uploaded').fetchone() == (3,)
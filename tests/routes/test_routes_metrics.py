@@ -0,0 +1,69 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from config.config_load_save import Config
+from engine.engine_metrics import SLOW_QUERIES_KEY, SlowQueries
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Keep settings saved through the API out of the real config dir."""
+    monkeypatch.setattr(Config, '_config_dir', tmp_path)
+    monkeypatch.setattr(Config, '_config_path', tmp_path / 'settings.json')
+    monkeypatch.setattr(Config, '_data', {})
+    settings = SlowQueries.settings()
+    yield
+    Config.flush()
+    SlowQueries.configure(**settings)
+    SlowQueries.clear()
+
+
+@pytest.mark.asyncio
+async def test_metrics_cover_requests_queries_and_pools():
+    sql = {'sql': 'SELECT range AS x FROM range(5)', 'format': 'ndjson'}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        await ac.post('/api/query', json=sql)
+        await ac.get('/api/statements/nope')
+        response = await ac.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    text = response.text
+    assert (
+        'ducklearn_http_request_duration_seconds_count{method="POST",'
+        'route="/api/query",status="200"}'
+    ) in text
+    assert 'route="/api/statements/{statement_id}",status="404"' in text
+    assert 'ducklearn_queries_total{tenant="default",outcome="ok"}' in text
+    assert 'rows_streamed_total{tenant="default",format="ndjson"}' in text
+    assert 'ducklearn_pool_cursors_in_use{tenant="default"} 0' in text
+    assert 'ducklearn_cache_hit_ratio{tenant="default"}' in text
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_api():
+    sql = {'sql': 'SELECT count(*) AS n FROM range(1000)', 'format': 'ndjson'}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        enabled = await ac.put(
+            '/api/metrics/slow-queries',
+            json={'enabled': True, 'threshold_ms': 0},
+        )
+        await ac.post('/api/query', json=sql)
+        logged = await ac.get('/api/metrics/slow-queries')
+        other = await ac.get('/api/metrics/slow-queries?tenant=other')
+        cleared = await ac.delete('/api/metrics/slow-queries')
+        invalid = await ac.put(
+            '/api/metrics/slow-queries', json={'capacity': 0}
+        )
+
+    assert enabled.json()['enabled'] is True
+    assert Config.data[SLOW_QUERIES_KEY]['threshold_ms'] == 0
+    [entry] = logged.json()['queries']
+    assert entry['tenant'] == 'default' and entry['rows'] == 1
+    assert 'range(1000)' in entry['sql'] and entry['profile']['children']
+    assert other.json()['queries'] == []
+    assert cleared.status_code == 204 and SlowQueries.entries() == []
+    assert invalid.status_code == 422
@@ -0,0 +1,151 @@
+import asyncio
+
+import orjson
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from engine.engine_pool import Engine
+from engine.engine_scheduler import Scheduler
+from learn.learn_linear import LinearRegression
+from learn.learn_pipeline import Pipeline
+from learn.learn_preprocessing import StandardScaler
+from learn.learn_registry import Models
+from learn.learn_serving import Online
+
+
+@pytest.fixture
+def model_id(tmp_path, monkeypatch):
+    """A stored pipeline predicting y = 2x + 1 from `models_src`."""
+    monkeypatch.setattr(Models, 'root', tmp_path / 'models')
+    with Engine.cursor() as cursor:
+        cursor.execute(
+            'CREATE OR REPLACE TABLE models_src AS '
+            'SELECT range::DOUBLE AS x, 2 * range + 1 AS y FROM range(100)'
+        )
+        pipeline = Pipeline([StandardScaler(['x']), LinearRegression('y')])
+        pipeline.fit('models_src', cursor)
+    return Models.save(pipeline, name='line').id
+
+
+@pytest.mark.asyncio
+async def test_list_and_get_models(model_id):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        listed = await ac.get('/api/models')
+        info = await ac.get(f'/api/models/{model_id}')
+        missing = await ac.get('/api/models/m_0000')
+    assert [m['id'] for m in listed.json()] == [model_id]
+    assert info.json()['name'] == 'line'
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_predict_streams_ndjson(model_id):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            f'/api/models/{model_id}/predict',
+            json={
+                'source': 'SELECT * FROM models_src WHERE x < 3',
+                'format': 'ndjson',
+            },
+        )
+    assert response.status_code == 200
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [round(row['prediction'], 6) for row in rows] == [1, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_predict_into_table(model_id):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            f'/api/models/{model_id}/predict',
+            json={
+                'source': 'models_src',
+                'mode': 'table',
+                'target': 'models_scored',
+            },
+        )
+        no_target = await ac.post(
+            f'/api/models/{model_id}/predict',
+            json={'source': 'models_src', 'mode': 'table'},
+        )
+    assert response.json()['rows'] == 100
+    assert no_target.status_code == 400
+    with Engine.cursor() as cursor:
+        (worst,) = cursor.execute(
+            'SELECT max(abs(prediction - y)) FROM models_scored'
+        ).fetchone()
+    assert worst < 1e-6
+
+
+@pytest.mark.asyncio
+async def test_online_requests_are_coalesced(model_id, monkeypatch):
+    monkeypatch.setattr(Online, 'window', 0.05)
+    before = Online.batches_run
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        responses = await asyncio.gather(
+            *(
+                ac.post(
+                    f'/api/models/{model_id}/predict/online',
+                    json={'rows': [{'x': float(x)}]},
+                )
+                for x in range(20)
+            )
+        )
+    predictions = [r.json()['predictions'][0] for r in responses]
+    assert predictions == pytest.approx([2 * x + 1 for x in range(20)])
+    assert Online.batches_run - before < 20
+
+
+@pytest.mark.asyncio
+async def test_online_bad_rows(model_id):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            f'/api/models/{model_id}/predict/online',
+            json={'rows': [{'nope': 1}]},
+        )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_online_bad_row_fails_only_its_request(model_id, monkeypatch):
+    """Rows are validated before coalescing; good neighbours still score."""
+    monkeypatch.setattr(Online, 'window', 0.05)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        good, bad, coerced = await asyncio.gather(
+            *(
+                ac.post(
+                    f'/api/models/{model_id}/predict/online',
+                    json={'rows': [row]},
+                )
+                for row in ({'x': 1.0}, {'x': [1]}, {'x': '2', 'extra': 'a'})
+            )
+        )
+    assert good.json()['predictions'] == pytest.approx([3])
+    assert bad.status_code == 400 and "'x'" in bad.json()['detail']
+    assert coerced.json()['predictions'] == pytest.approx([5])
+
+
+@pytest.mark.asyncio
+async def test_table_mode_past_its_timeout_returns_504(model_id, monkeypatch):
+    """Table-mode scoring holds a watched cursor, so timeouts interrupt."""
+    monkeypatch.setitem(Scheduler.timeouts, 'batch', 0.2)
+    source = (
+        'SELECT a::DOUBLE AS x, b AS y '
+        'FROM range(100000000000) t(a), range(10) u(b) WHERE a + b < 0'
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            f'/api/models/{model_id}/predict',
+            json={'source': source, 'mode': 'table', 'target': 'slow_out'},
+        )
+    assert response.status_code == 504
+    assert Scheduler.running('batch') == 0
+    assert Engine.pool().in_use == 0
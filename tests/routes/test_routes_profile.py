@@ -0,0 +1,35 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from engine.engine_pool import Engine
+
+
+@pytest.mark.asyncio
+async def test_profile_table_and_refresh():
+    with Engine.cursor() as cur:
+        cur.execute(
+            'CREATE OR REPLACE TABLE profile_api AS '
+            'SELECT range AS a, range % 3 AS b FROM range(100)'
+        )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        first = await ac.get('/api/profile/profile_api')
+        second = await ac.get('/api/profile/profile_api')
+        forced = await ac.get('/api/profile/profile_api?refresh=true')
+
+    assert first.status_code == 200
+    body = first.json()
+    assert body['rows'] == 100
+    assert [c['name'] for c in body['columns']] == ['a', 'b']
+    assert body['columns'][1]['distinct'] == 3
+    assert second.json()['refresh'] == 'cached'
+    assert forced.json()['refresh'] == 'full'
+
+
+@pytest.mark.asyncio
+async def test_profile_unknown_table_returns_404():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.get('/api/profile/no_such_table')
+    assert response.status_code == 404
@@ -0,0 +1,168 @@
+import orjson
+import pyarrow as pa
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from engine.engine_cache import Cache
+from engine.engine_executor import Executor
+from engine.engine_pool import Engine
+from engine.engine_scheduler import CLIENT_HEADER, Scheduler
+
+
+@pytest.mark.asyncio
+async def test_query_streams_arrow_ipc_batches():
+    """Arrow responses decode into the full result, split into batches."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/query',
+            json={
+                'sql': 'SELECT range AS i FROM range(2500)',
+                'batch_rows': 1000,
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith(
+        'application/vnd.apache.arrow.stream'
+    )
+    reader = pa.ipc.open_stream(response.content)
+    batches = list(reader)
+    table = pa.Table.from_batches(batches)
+    assert table.num_rows == 2500
+    assert table.column('i').to_pylist() == list(range(2500))
+    assert len(batches) >= 2
+    assert Engine.pool().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_query_ndjson_fallback():
+    """NDJSON responses carry one JSON object per row."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/query',
+            json={
+                'sql': "SELECT 1 AS a, 'x' AS b, 2.5::DECIMAL(4,1) AS c",
+                'format': 'ndjson',
+            },
+        )
+
+    assert response.status_code == 200
+    lines = response.content.splitlines()
+    assert [orjson.loads(line) for line in lines] == [
+        {'a': 1, 'b': 'x', 'c': '2.5'}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_query_error_returns_400_and_releases_cursor():
+    """Bad SQL is reported before streaming and frees its cursor."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post('/api/query', json={'sql': 'SELEC 1'})
+
+    assert response.status_code == 400
+    assert Engine.pool().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_query_cannot_change_settings():
+    """SET would let a tenant lift its own memory_limit: 403."""
+
+    def current_limit():
+        with Engine.cursor() as cursor:
+            sql = "SELECT current_setting('memory_limit')"
+            return cursor.execute(sql).fetchall()
+
+    limit = current_limit()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/query', json={'sql': "SET GLOBAL memory_limit = '1TB'"}
+        )
+
+    assert response.status_code == 403
+    assert current_limit() == limit
+    assert Engine.pool().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_query_returns_429_when_queue_is_full():
+    """Requests beyond the admission capacity are rejected with 429."""
+    slots = [Executor.admit() for _ in range(Executor.capacity)]
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url='http://test'
+        ) as ac:
+            response = await ac.post('/api/query', json={'sql': 'SELECT 1'})
+    finally:
+        for slot in slots:
+            slot.release()
+
+    assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_hit_cache_until_table_is_written():
+    """Normalized SQL is served from cache; writes invalidate it."""
+    Cache.invalidate()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+
+        async def rows(sql):
+            response = await ac.post(
+                '/api/query', json={'sql': sql, 'format': 'ndjson'}
+            )
+            assert response.status_code == 200
+            return [
+                orjson.loads(line) for line in response.content.splitlines()
+            ]
+
+        await rows('CREATE OR REPLACE TABLE cache_t AS SELECT 1 AS v')
+        hits = Cache.hits
+        assert await rows('SELECT v FROM cache_t AS a') == [{'v': 1}]
+        assert await rows('select   V from CACHE_T b') == [{'v': 1}]
+        assert Cache.hits == hits + 1
+
+        await rows('INSERT INTO cache_t VALUES (2)')
+        after = await rows('SELECT v FROM cache_t AS a')
+        assert sorted(row['v'] for row in after) == [1, 2]
+        assert Cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_heavy_query_past_its_timeout_returns_504(monkeypatch):
+    """A query costed as batch is interrupted at the batch timeout."""
+    monkeypatch.setitem(Scheduler.timeouts, 'batch', 0.2)
+    sql = (
+        'SELECT count(*) FROM range(100000000000) t(a), range(10) u(b) '
+        'WHERE a + b < 0'
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post('/api/query', json={'sql': sql})
+
+    assert response.status_code == 504
+    assert 'batch' in response.json()['detail']
+    assert Scheduler.running('batch') == 0
+    assert Engine.pool().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_client_over_its_limit_gets_429(monkeypatch):
+    """Per-client limits count against the client header."""
+    monkeypatch.setattr(Scheduler, 'client_limit', 0)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/api/query',
+            json={'sql': 'SELECT 1'},
+            headers={CLIENT_HEADER: 'analyst'},
+        )
+
+    assert response.status_code == 429
+    assert 'analyst' in response.json()['detail']
+    assert Executor.admitted == 0
@@ -0,0 +1,110 @@
+import orjson
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from engine.engine_pool import Engine
+from engine.engine_scheduler import Scheduler
+
+
+@pytest.mark.asyncio
+async def test_register_execute_and_bulk_insert():
+    """Register statements, bulk insert through them, then look up."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        await ac.post(
+            '/api/query',
+            json={'sql': 'CREATE OR REPLACE TABLE stmt_t (k INT, v TEXT)'},
+        )
+        insert = await ac.post(
+            '/api/statements', json={'sql': 'INSERT INTO stmt_t VALUES (?, ?)'}
+        )
+        assert insert.status_code == 201
+        assert insert.json()['bulk_insert'] is True
+
+        many = await ac.post(
+            f'/api/statements/{insert.json()["id"]}/execute_many',
+            json={'batches': [[1, 'a'], [2, 'b'], [3, 'c']]},
+        )
+        assert many.json()['applied'] == 3
+
+        lookup = await ac.post(
+            '/api/statements',
+            json={'sql': 'SELECT v FROM stmt_t WHERE k = $1'},
+        )
+        response = await ac.post(
+            f'/api/statements/{lookup.json()["id"]}/execute',
+            json={'params': [2], 'format': 'ndjson'},
+        )
+
+    assert response.status_code == 200
+    assert [orjson.loads(x) for x in response.content.splitlines()] == [
+        {'v': 'b'}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unknown_statement_returns_404():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post('/api/statements/s_nope/execute', json={})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_wrong_parameter_count_returns_400():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        stmt = await ac.post('/api/statements', json={'sql': 'SELECT ?'})
+        response = await ac.post(
+            f'/api/statements/{stmt.json()["id"]}/execute', json={'params': []}
+        )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_execute_many_past_its_timeout_returns_504(monkeypatch):
+    """execute_many runs on a watched cursor and maps errors like /query."""
+    monkeypatch.setitem(Scheduler.timeouts, 'batch', 0.2)
+    sql = (
+        'SELECT count(*) FROM range(100000000000) t(a), range(10) u(b) '
+        'WHERE a + b < ?'
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        stmt = await ac.post('/api/statements', json={'sql': sql})
+        response = await ac.post(
+            f'/api/statements/{stmt.json()["id"]}/execute_many',
+            json={'batches': [[0]]},
+        )
+        short = await ac.post(
+            f'/api/statements/{stmt.json()["id"]}/execute_many',
+            json={'batches': [[]]},
+        )
+
+    assert response.status_code == 504
+    assert short.status_code == 400
+    assert Scheduler.running('batch') == 0
+    assert Engine.pool().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_past_its_timeout_returns_504(monkeypatch):
+    """execute maps errors through the same helper as /query."""
+    monkeypatch.setitem(Scheduler.timeouts, 'interactive', 0.2)
+    sql = (
+        'SELECT count(*) FROM range(100000000000) t(a), range(10) u(b) '
+        'WHERE a + b < ?'
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        stmt = await ac.post('/api/statements', json={'sql': sql})
+        response = await ac.post(
+            f'/api/statements/{stmt.json()["id"]}/execute',
+            json={'params': [0]},
+        )
+
+    assert response.status_code == 504
+    assert 'interactive' in response.json()['detail']
+    assert Scheduler.running('interactive') == 0
+    assert Engine.pool().in_use == 0
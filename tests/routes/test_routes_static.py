@@ -0,0 +1,68 @@
+import gzip
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import create_app
+from routes.routes_static import IMMUTABLE_CACHE, _accepted_encodings
+
+SCRIPT = b'console.log("duck");' * 100
+
+
+@pytest.fixture
+def build(tmp_path):
+    """A SvelteKit-like build with precompressed siblings."""
+    immutable = tmp_path / '_app' / 'immutable'
+    immutable.mkdir(parents=True)
+    (tmp_path / 'index.html').write_text('<!doctype html><p>DuckLearn</p>')
+    (immutable / 'entry.abc123.js').write_bytes(SCRIPT)
+    (immutable / 'entry.abc123.js.gz').write_bytes(gzip.compress(SCRIPT))
+    (immutable / 'entry.abc123.js.br').write_bytes(b'not really brotli')
+    return tmp_path
+
+
+def _client(app):
+    transport = ASGITransport(app=app)
+    return AsyncClient(transport=transport, base_url='http://test')
+
+
+def test_accepted_encodings():
+    assert _accepted_encodings('gzip, br;q=0.5, zstd;q=0') == {'gzip', 'br'}
+    assert _accepted_encodings('') == set()
+
+
+@pytest.mark.asyncio
+async def test_precompressed_variant_is_chosen(build):
+    app = create_app(mode='production', static_dir=build)
+    path = '/_app/immutable/entry.abc123.js'
+    async with _client(app) as ac:
+        as_br = await ac.get(path, headers={'Accept-Encoding': 'br, gzip'})
+        as_gzip = await ac.get(path, headers={'Accept-Encoding': 'gzip'})
+        plain = await ac.get(path, headers={'Accept-Encoding': 'identity'})
+
+    assert as_br.headers['content-encoding'] == 'br'
+    assert as_gzip.headers['content-encoding'] == 'gzip'
+    assert as_gzip.content == SCRIPT  # httpx decodes gzip
+    assert 'content-encoding' not in plain.headers
+    assert plain.content == SCRIPT
+    for response in (as_br, as_gzip, plain):
+        assert response.headers['content-type'].startswith('text/javascript')
+        assert response.headers['cache-control'] == IMMUTABLE_CACHE
+        assert 'Accept-Encoding' in response.headers['vary']
+    assert as_gzip.headers['etag'] != plain.headers['etag']
+
+
+@pytest.mark.asyncio
+async def test_html_is_revalidated_with_etag(build):
+    app = create_app(mode='production', static_dir=build)
+    async with _client(app) as ac:
+        first = await ac.get('/')
+        again = await ac.get(
+            '/', headers={'If-None-Match': first.headers['etag']}
+        )
+        api = await ac.get('/api/config')
+
+    assert first.status_code == 200 and 'DuckLearn' in first.text
+    assert first.headers['cache-control'] == 'no-cache'
+    assert again.status_code == 304
+    assert api.status_code == 200  # API routes win over the mount
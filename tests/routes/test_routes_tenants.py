@@ -0,0 +1,71 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+from config.config_load_save import Config
+from engine.engine_tenants import TENANT_HEADER, Tenants
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Keep settings saved through the API out of the real config dir."""
+    monkeypatch.setattr(Config, '_config_dir', tmp_path)
+    monkeypatch.setattr(Config, '_config_path', tmp_path / 'settings.json')
+    monkeypatch.setattr(Config, '_data', {})
+    yield
+    Config.flush()
+
+
+@pytest.fixture
+def tenant(monkeypatch):
+    """A 'team' tenant with room for exactly 50MB more."""
+    budget = Tenants.allocated() + 100 * 1000**2
+    monkeypatch.setattr(Tenants, '_budget', budget)
+    Tenants.add('team', {'memory_limit': '50MB', 'threads': 1})
+    yield 'team'
+    if 'team' in Tenants:
+        Tenants.remove('team')
+
+
+@pytest.mark.asyncio
+async def test_header_and_path_route_to_the_tenant(tenant):
+    create = {'sql': 'CREATE TABLE team_only AS SELECT 42 AS x'}
+    select = {'sql': 'SELECT x FROM team_only', 'format': 'ndjson'}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        created = await ac.post(
+            '/api/query', json=create, headers={TENANT_HEADER: tenant}
+        )
+        by_path = await ac.post(f'/t/{tenant}/api/query', json=select)
+        default = await ac.post('/api/query', json=select)
+        config = await ac.get(f'/t/{tenant}/api/config')
+
+    assert created.status_code == 200
+    assert by_path.status_code == 200
+    assert by_path.text.strip() == '{"x":42}'
+    assert default.status_code == 400
+    assert config.json()['memory_limit'] == '50MB'
+
+
+@pytest.mark.asyncio
+async def test_quota_and_unknown_tenant(tenant):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        too_big = await ac.post(
+            '/api/tenants',
+            json={'name': 'big', 'config': {'memory_limit': '1GB'}},
+        )
+        raised = await ac.put(
+            f'/t/{tenant}/api/config', json={'memory_limit': '200MB'}
+        )
+        listing = await ac.get('/api/tenants')
+        unknown = await ac.get('/t/nobody/api/config')
+        deleted = await ac.delete(f'/api/tenants/{tenant}')
+
+    assert too_big.status_code == 409
+    assert raised.status_code == 409
+    names = [t['name'] for t in listing.json()['tenants']]
+    assert names == ['default', 'team']
+    assert unknown.status_code == 404
+    assert deleted.status_code == 204
+    assert 'team' not in Tenants
@@ -2,9 +2,7 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 # Import your actual FastAPI app
-from app import app
-
-
+from app import app, create_app
 
 
 @pytest.mark.asyncio
@@ -29,9 +27,6 @@ async def test_hello_route_invalid_method_returns_405():
     assert response.json()['detail'] == 'Method Not Allowed'
 
 
-
-
-
 @pytest.mark.asyncio
 async def test_undefined_route_returns_404():
     """Requesting a non-existent route should return 404."""
@@ -61,3 +56,42 @@ async def test_cors_preflight_options_request():
         response.headers['access-control-allow-origin']
         == 'http://localhost:5173'
     )
+
+
+def test_create_app_modes(tmp_path):
+    """Production needs a frontend build; unknown modes are rejected."""
+    assert app.state.mode == 'development'
+    with pytest.raises(RuntimeError, match='No frontend build'):
+        create_app(mode='production', static_dir=tmp_path)
+    with pytest.raises(ValueError, match='Unknown mode'):
+        create_app(mode='staging')
+
+
+@pytest.mark.asyncio
+async def test_cors_origins_from_argument_and_gzip_in_production(tmp_path):
+    """Production gzips API JSON and only allows configured origins."""
+    (tmp_path / 'index.html').write_text('<p>DuckLearn</p>')
+    prod = create_app(
+        mode='production',
+        static_dir=tmp_path,
+        cors_origins=['https://duck.example'],
+    )
+    transport = ASGITransport(app=prod)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        allowed = await ac.options(
+            '/api/config',
+            headers={
+                'Origin': 'https://duck.example',
+                'Access-Control-Request-Method': 'GET',
+            },
+        )
+        schema = await ac.get(
+            '/openapi.json', headers={'Accept-Encoding': 'gzip'}
+        )
+
+    assert (
+        allowed.headers['access-control-allow-origin']
+        == 'https://duck.example'
+    )
+    assert schema.headers['content-encoding'] == 'gzip'
+    assert schema.json()['info']['title'] == 'DuckLearn'
@@ -0,0 +1,86 @@
+import pytest
+from benchmarks.bench_load import (
+    Level,
+    Session,
+    Stats,
+    find_knee,
+    parse_mix,
+    percentile,
+    run_level,
+)
+from benchmarks.bench_suite import CASES, compare, run_suite
+from httpx import ASGITransport, AsyncClient
+
+from app import create_app
+
+
+def _report(scale='small', **throughput):
+    return {
+        'scale': scale,
+        'results': {
+            name: {'throughput': value, 'unit': 'rows'}
+            for name, value in throughput.items()
+        },
+    }
+
+
+def test_compare_flags_cases_slower_than_tolerance():
+    baseline = _report(query_arrow=1000.0, linear_fit=1000.0, gone=1.0)
+    report = _report(query_arrow=650.0, linear_fit=750.0, new=1.0)
+    regressions = compare(report, baseline, tolerance=0.3)
+    assert len(regressions) == 1
+    assert regressions[0].startswith('query_arrow: 650 rows/s, 35% below')
+
+
+def test_compare_refuses_other_scales():
+    with pytest.raises(ValueError, match='scale'):
+        compare(_report('medium'), _report('small'))
+
+
+def test_run_suite_reports_every_case():
+    names = [name for name in CASES if not name.startswith('config_')]
+    report = run_suite('smoke', names, repeats=1)
+    assert report['rows'] == 2_000
+    assert set(report['results']) == set(names)
+    for result in report['results'].values():
+        assert result['items'] > 0
+        assert result['throughput'] > 0
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_parse_mix_checks_operations():
+    assert parse_mix(['query=3', 'score']) == {'query': 3.0, 'score': 1.0}
+    with pytest.raises(ValueError, match='Unknown operation'):
+        parse_mix(['nope=1'])
+
+
+def _level(concurrency, throughput):
+    stats = Stats(100, 0, throughput, 1.0, 2.0, 3.0)
+    return Level(concurrency, 1.0, stats, {})
+
+
+def test_knee_is_last_level_that_still_scaled():
+    levels = [_level(1, 100), _level(2, 190), _level(4, 200), _level(8, 300)]
+    assert find_knee(levels) == 2
+    assert find_knee([]) is None
+
+
+@pytest.mark.asyncio
+async def test_run_level_reports_latency_per_operation():
+    app = create_app('development')
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://t') as client:
+        level = await run_level(
+            Session(client), 3, {'config_read': 1}, duration=0.2
+        )
+    assert level.concurrency == 3
+    assert level.total.requests > 0
+    assert level.total.errors == 0
+    stats = level.operations['config_read']
+    assert stats.p50_ms <= stats.p95_ms <= stats.p99_ms
@@ -0,0 +1,68 @@
+import subprocess
+
+import duckdb
+
+from cli import main
+
+
+def test_cli_ingest_loads_files_into_database(tmp_path, capsys):
+    """`ingest` loads files into the given database and reports progress."""
+    (tmp_path / 'a.csv').write_text('x\n1\n2\n')
+    (tmp_path / 'b.csv').write_text('x\n3\n')
+    db = tmp_path / 'cli.duckdb'
+
+    code = main(['ingest', 'nums', str(tmp_path / '*.csv'), '--db', str(db)])
+
+    assert code == 0
+    out = capsys.readouterr().out
+    assert '[2/2]' in out
+    with duckdb.connect(str(db)) as con:
+        assert con.execute('SELECT sum(x) FROM nums').fetchone() == (6,)
+
+
+def test_cli_ingest_reports_missing_files(tmp_path, capsys):
+    code = main(
+        [
+            'ingest',
+            't',
+            str(tmp_path / 'nope.csv'),
+            '--db',
+            str(tmp_path / 'x.db'),
+        ]
+    )
+    assert code == 2
+    assert 'No files match' in capsys.readouterr().out
+
+
+def test_cli_serve_rejects_an_impossible_split(capsys):
+    code = main(['serve', '--workers', '4', '--threads', '2'])
+    assert code == 2
+    assert 'cannot be shared' in capsys.readouterr().out
+
+
+def test_cli_serve_stops_a_writer_that_failed_to_start(
+    tmp_path, monkeypatch, capsys
+):
+    """A writer that never listens is still terminated, not orphaned."""
+    started = []
+
+    class DeadWriter:
+        def __init__(self, *args, **kwargs):
+            self.terminated = False
+            started.append(self)
+
+        def poll(self):
+            return 1
+
+        def terminate(self):
+            self.terminated = True
+
+        def wait(self):
+            return 1
+
+    monkeypatch.setattr(subprocess, 'Popen', DeadWriter)
+    code = main(['serve', '--workers', '2', '--db', str(tmp_path / 'w.db')])
+
+    assert code == 1
+    assert 'did not start' in capsys.readouterr().out
+    assert [p.terminated for p in started] == [True]
@@ -0,0 +1,70 @@
+"""Importing DuckLearn must stay cheap and free of side effects.
+
+Workers are autoscaled and the CLI runs often, so each import is timed
+in a fresh interpreter (`python -X importtime`) against a budget.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ('duckdb', 'sqlglot', 'pyarrow')
+
+# Cumulative import time budgets in seconds; generous for slow CI.
+BUDGETS = {
+    'cli': 0.25,
+    'config.config_load_save': 0.5,
+    'app': 3.0,
+}
+
+
+def _import(module: str, home: Path, code: str = '') -> tuple[float, str]:
+    """Import `module` in a clean interpreter; returns (seconds, stdout)."""
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join([str(ROOT / 'src'), str(ROOT)]),
+        'HOME': str(home),
+        'XDG_CONFIG_HOME': str(home / 'config'),
+        'XDG_CACHE_HOME': str(home / 'cache'),
+    }
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}\n{code}'],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [f.strip() for f in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6, result.stdout
+    raise AssertionError(f'{module} not in -X importtime output')
+
+
+@pytest.mark.parametrize('module', BUDGETS)
+def test_import_stays_within_budget(module, tmp_path):
+    seconds, _ = _import(module, tmp_path)
+    assert seconds < BUDGETS[module], f'import {module} took {seconds:.3f}s'
+
+
+@pytest.mark.parametrize('module', ['cli', 'config', 'config.config_duckdb'])
+def test_heavy_imports_are_deferred(module, tmp_path):
+    check = f'import sys; print(sorted(set({HEAVY!r}) & set(sys.modules)))'
+    _, out = _import(module, tmp_path, check)
+    assert out.strip() == '[]'
+
+
+def test_importing_the_app_has_no_side_effects(tmp_path):
+    """No prints, no settings.json, no hardware probing until startup."""
+    check = (
+        'from engine.engine_pool import Engine\n'
+        'from config.config_load_save import Config\n'
+        'assert Engine._config is None and not Config.loaded'
+    )
+    _, out = _import('app', tmp_path, check)
+    assert out == ''
+    assert not (tmp_path / 'config').exists()